@@ -0,0 +1,127 @@
+import re
+from pathlib import Path
+from pydub import AudioSegment  # type: ignore
+from utils.constants import (
+    TRANSCRIPT_CHUNK_MS,
+    TRANSCRIPT_CHUNK_OVERLAP_MS,
+    TRANSCRIPT_SILENCE_WINDOW_MS,
+    TRANSCRIPT_OVERLAP_MAX_WORDS
+)
+
+# Resolución con la que se busca el punto más silencioso, en milisegundos
+FRAME_MS = 100
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def merge_transcripts(texts: list[str], max_overlap_words: int = TRANSCRIPT_OVERLAP_MAX_WORDS) -> str:
+    """
+    Une las transcripciones de fragmentos solapados eliminando el texto repetido.
+
+    Para cada par de fragmentos consecutivos busca la secuencia más larga de
+    palabras con la que termina el anterior y empieza el siguiente (ignorando
+    mayúsculas y puntuación) y la quita del siguiente.
+
+    Args:
+        texts (list[str]): Transcripciones en orden.
+        max_overlap_words (int): Longitud máxima del solapamiento buscado.
+
+    Returns:
+        str: Transcripción completa.
+    """
+    merged: list[str] = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+
+        tail = [_normalize_word(w) for w in merged[-max_overlap_words:]]
+        head = [_normalize_word(w) for w in words[:max_overlap_words]]
+        overlap = 0
+        # Solapamientos de una sola palabra son demasiado ambiguos
+        for size in range(min(len(tail), len(head)), 1, -1):
+            if tail[-size:] == head[:size]:
+                overlap = size
+                break
+
+        merged.extend(words[overlap:])
+    return " ".join(merged)
+
+
+class AudioChunker:
+    """
+    Divide un audio largo en fragmentos solapados cortados en pausas.
+
+    Cada corte se hace en el tramo más silencioso de la ventana anterior a la
+    duración objetivo, y cada fragmento repite `overlap` ms del anterior para
+    que ninguna palabra quede partida entre dos peticiones de transcripción.
+
+    Attributes:
+        chunk_ms (int): Duración objetivo de cada fragmento.
+        overlap_ms (int): Audio compartido entre fragmentos consecutivos.
+        silence_window_ms (int): Ventana en la que se busca la pausa.
+    """
+
+    def __init__(self, chunk_ms: int = TRANSCRIPT_CHUNK_MS, overlap_ms: int = TRANSCRIPT_CHUNK_OVERLAP_MS,
+                 silence_window_ms: int = TRANSCRIPT_SILENCE_WINDOW_MS) -> None:
+        self.chunk_ms = chunk_ms
+        self.overlap_ms = overlap_ms
+        self.silence_window_ms = silence_window_ms
+
+    @staticmethod
+    def _quietest_point(audio: AudioSegment, start: int, end: int) -> int:
+        """Devuelve el centro del tramo de FRAME_MS con menos energía en [start, end)"""
+        best_pos, best_rms = end, None
+        for pos in range(start, max(start + 1, end - FRAME_MS + 1), FRAME_MS):
+            rms = audio[pos:pos + FRAME_MS].rms
+            if best_rms is None or rms < best_rms:
+                best_pos, best_rms = pos + FRAME_MS // 2, rms
+        return best_pos
+
+    def plan(self, audio: AudioSegment) -> list[tuple[int, int]]:
+        """
+        Calcula los límites de cada fragmento.
+
+        Args:
+            audio (AudioSegment): Audio completo.
+
+        Returns:
+            list[tuple[int, int]]: (inicio, fin) en ms de cada fragmento, incluido el solapamiento.
+        """
+        length = len(audio)
+        bounds: list[tuple[int, int]] = []
+        start = 0
+        while length - start > self.chunk_ms:
+            target = start + self.chunk_ms
+            # Nunca retroceder más de medio fragmento para garantizar el avance
+            window_start = max(start + self.chunk_ms // 2,
+                               target - self.silence_window_ms)
+            cut = self._quietest_point(audio, window_start, target)
+            bounds.append((max(0, start - self.overlap_ms) if start else 0, cut))
+            start = cut
+        bounds.append((max(0, start - self.overlap_ms) if start else 0, length))
+        return bounds
+
+    def split(self, audio_path: str, output_dir: str | Path) -> list[str]:
+        """
+        Divide un archivo de audio en fragmentos MP3 mono.
+
+        Args:
+            audio_path (str): Ruta del audio original.
+            output_dir (str | Path): Directorio donde se escriben los fragmentos.
+
+        Returns:
+            list[str]: Rutas de los fragmentos en orden.
+        """
+        audio = AudioSegment.from_file(audio_path)
+        output_dir = Path(output_dir)
+        chunk_paths = []
+        for index, (start, end) in enumerate(self.plan(audio)):
+            chunk_path = output_dir / f"chunk_{index:04d}.mp3"
+            # Mono y bitrate bajo: suficiente para voz y muy por debajo del límite de subida
+            audio[start:end].set_channels(1).export(
+                chunk_path, format="mp3", bitrate="64k")
+            chunk_paths.append(str(chunk_path))
+        return chunk_paths
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+
+# Parámetros de ITU-R BS.1770: bloques de 400 ms con un 75 % de solapamiento
+BLOCK_SECONDS = 0.4
+STEP_SECONDS = 0.1
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# Bloques analizados a la vez: acota la memoria de la FFT en clips largos
+BLOCKS_PER_BATCH = 64
+
+
+def pcm_samples(raw_data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """
+    Convierte PCM entero en muestras de coma flotante en [-1, 1].
+
+    Args:
+        raw_data (bytes): PCM intercalado, como `AudioSegment.raw_data`.
+        sample_width (int): Bytes por muestra (1, 2 o 4).
+        channels (int): Número de canales.
+
+    Returns:
+        np.ndarray: Matriz (muestras, canales).
+    """
+    if sample_width == 1:
+        # El PCM de 8 bits es sin signo
+        samples = (np.frombuffer(raw_data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    else:
+        dtype = {2: np.int16, 4: np.int32}[sample_width]
+        samples = np.frombuffer(raw_data, dtype=dtype).astype(np.float32) / float(2 ** (8 * sample_width - 1))
+    return samples.reshape(-1, channels)
+
+
+def _biquad_power(b: tuple[float, float, float], a: tuple[float, float, float], w: np.ndarray) -> np.ndarray:
+    z = np.exp(-1j * w)
+    return np.abs((b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)) ** 2
+
+
+def k_weighting(frame_rate: int, n_fft: int) -> np.ndarray:
+    """
+    Respuesta en potencia del filtro K de BS.1770 en los bins de una FFT real.
+
+    Los dos filtros (estantería de +4 dB y paso alto de RLB) se diseñan para
+    `frame_rate`, de modo que la medida vale también para 24 kHz, la
+    frecuencia de los clips de TTS.
+    """
+    w = 2 * math.pi * np.fft.rfftfreq(n_fft, 1 / frame_rate) / frame_rate
+
+    # Estantería alta (+4 dB sobre ~1.7 kHz), mismo diseño que libebur128
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / frame_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = _biquad_power(
+        ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+        w)
+
+    # Paso alto de RLB (~38 Hz)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / frame_rate)
+    a0 = 1 + k / q + k * k
+    high_pass = _biquad_power((1.0, -2.0, 1.0), (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0), w)
+
+    return shelf * high_pass
+
+
+def integrated_loudness(samples: np.ndarray, frame_rate: int) -> float:
+    """
+    Sonoridad integrada aproximada en LUFS (ITU-R BS.1770).
+
+    El filtro K se aplica como respuesta en frecuencia sobre la FFT de cada
+    bloque de 400 ms en lugar de filtrar la señal en el tiempo: con numpy es
+    vectorizable y la diferencia para voz es de décimas de LU. Después se
+    aplican las puertas absoluta (-70 LUFS) y relativa (-10 LU).
+
+    Args:
+        samples (np.ndarray): Matriz (muestras, canales) en [-1, 1].
+        frame_rate (int): Frecuencia de muestreo.
+
+    Returns:
+        float: Sonoridad en LUFS, o -inf si el clip es silencio.
+    """
+    block = int(BLOCK_SECONDS * frame_rate)
+    step = int(STEP_SECONDS * frame_rate)
+    if len(samples) == 0:
+        return -math.inf
+    if len(samples) < block:
+        # Clips más cortos que un bloque: se miden enteros
+        block = len(samples)
+
+    weights = k_weighting(frame_rate, block)
+    # Parseval con rfft: los bins intermedios representan también su frecuencia negativa
+    weights[1:(block + 1) // 2] *= 2
+    windows = np.lib.stride_tricks.sliding_window_view(samples, block, axis=0)[::step]
+
+    powers = []
+    for start in range(0, len(windows), BLOCKS_PER_BATCH):
+        spectrum = np.fft.rfft(windows[start:start + BLOCKS_PER_BATCH], axis=-1)
+        # Potencia media de cada bloque sumada en los canales
+        power = (np.abs(spectrum) ** 2 * weights).sum(axis=-1) / block ** 2
+        powers.append(power.sum(axis=-1))
+    power = np.concatenate(powers)
+
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > ABSOLUTE_GATE_LUFS]
+    if len(gated) == 0:
+        return -math.inf
+    relative_gate = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE_LU
+    gated = power[loudness > max(ABSOLUTE_GATE_LUFS, relative_gate)]
+    return -0.691 + 10 * math.log10(gated.mean())
@@ -0,0 +1,205 @@
+import math
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import IO, Iterable
+from pydub import AudioSegment  # type: ignore
+from audio.loudness import integrated_loudness, pcm_samples
+from utils.constants import (PAUSE_DURATION, LEAD_IN_DURATION, MIX_TARGET_LUFS, MIX_MAX_GAIN_DB,
+                             MIX_PEAK_CEILING_DB, MIX_CODEC, MIX_BITRATE, MIX_CODECS)
+
+# Tamaño de los bloques de PCM que se escriben en el codificador
+CHUNK_SIZE = 64 * 1024
+
+# Formatos PCM de ffmpeg según el ancho de muestra de pydub
+PCM_FORMATS = {1: "u8", 2: "s16le", 4: "s32le"}
+
+
+class PodcastAssembler:
+    """
+    Ensambla el podcast final en una sola pasada y con memoria acotada.
+
+    En lugar de acumular un `AudioSegment` cada vez más grande, decodifica los
+    clips de uno en uno y escribe su PCM, junto con los silencios generados,
+    directamente en la entrada estándar de un único proceso de ffmpeg que
+    codifica el archivo de salida. Cada clip se mide al decodificarlo y se
+    ajusta su ganancia hasta `target_lufs`, de modo que todas las voces suenan
+    al mismo nivel.
+
+    Attributes:
+        pause_duration (int): Silencio tras cada clip, en milisegundos.
+        lead_in (int): Silencio inicial, en milisegundos.
+        converter (str): Ejecutable de ffmpeg (por defecto el configurado en pydub).
+        codec (str): Códec de salida, una clave de MIX_CODECS.
+        bitrate (str): Bitrate de salida (por defecto el del códec).
+        target_lufs (float | None): Sonoridad de cada clip; None no normaliza.
+        max_gain_db (float): Ganancia máxima aplicada a un clip.
+        peak_ceiling_db (float): Pico de muestra máximo tras normalizar, en dBFS.
+        gains (list[float]): Ganancia en dB aplicada a cada clip del último ensamblado.
+    """
+
+    def __init__(self, pause_duration: int = PAUSE_DURATION, lead_in: int = LEAD_IN_DURATION,
+                 converter: str | None = None, codec: str = MIX_CODEC, bitrate: str | None = MIX_BITRATE,
+                 target_lufs: float | None = MIX_TARGET_LUFS, max_gain_db: float = MIX_MAX_GAIN_DB,
+                 peak_ceiling_db: float = MIX_PEAK_CEILING_DB) -> None:
+        if codec not in MIX_CODECS:
+            raise ValueError(f"Unsupported codec '{codec}', use one of: {', '.join(MIX_CODECS)}")
+        self.pause_duration = pause_duration
+        self.lead_in = lead_in
+        self.converter = converter or AudioSegment.converter
+        self.codec = codec
+        self.bitrate = bitrate or MIX_CODECS[codec]["bitrate"]
+        self.target_lufs = target_lufs
+        self.max_gain_db = max_gain_db
+        self.peak_ceiling_db = peak_ceiling_db
+        self.gains: list[float] = []
+
+    @property
+    def extension(self) -> str:
+        """Extensión del archivo final según el códec"""
+        return MIX_CODECS[self.codec]["extension"]
+
+    def settings(self) -> str:
+        """Ajustes que cambian el resultado de la mezcla, para la huella del checkpoint"""
+        return f"{self.pause_duration}|{self.lead_in}|{self.codec}|{self.bitrate}|" \
+               f"{self.target_lufs}|{self.max_gain_db}|{self.peak_ceiling_db}"
+
+    @staticmethod
+    def _target_format(first_clip: AudioSegment) -> tuple[int, int, int]:
+        """
+        Formato de salida: el mismo que produciría pydub al sumar el silencio
+        inicial (11025 Hz, mono, 16 bits) con el primer clip.
+        """
+        silence = AudioSegment.silent(duration=0)
+        return (
+            max(silence.frame_rate, first_clip.frame_rate),
+            max(silence.channels, first_clip.channels),
+            max(silence.sample_width, first_clip.sample_width)
+        )
+
+    @staticmethod
+    def _silence_bytes(duration: int, frame_rate: int, channels: int, sample_width: int) -> Iterable[bytes]:
+        """Genera `duration` ms de silencio en bloques de como mucho CHUNK_SIZE bytes"""
+        frame_size = channels * sample_width
+        remaining = int(frame_rate * duration / 1000.0) * frame_size
+        # El PCM de 8 bits es sin signo: el silencio es 0x80, no 0x00
+        fill = b"\x80" if sample_width == 1 else b"\x00"
+        block = fill * (CHUNK_SIZE - CHUNK_SIZE % frame_size)
+        while remaining > 0:
+            size = min(remaining, len(block))
+            yield block[:size]
+            remaining -= size
+
+    def _encoder_command(self, output_path: str, frame_rate: int, channels: int, sample_width: int) -> list[str]:
+        codec = MIX_CODECS[self.codec]
+        command = [
+            self.converter, "-y", "-loglevel", "error",
+            "-f", PCM_FORMATS[sample_width], "-ar", str(frame_rate), "-ac", str(channels),
+            "-i", "pipe:0",
+            "-c:a", codec["encoder"], "-b:a", self.bitrate
+        ]
+        if self.codec == "opus":
+            # libopus solo acepta algunas frecuencias; 48 kHz es la nativa
+            command += ["-ar", "48000"]
+        elif self.codec == "aac":
+            # Índice al principio del archivo: se puede reproducir mientras se descarga
+            command += ["-movflags", "+faststart"]
+        return command + ["-f", codec["format"], output_path]
+
+    def normalize(self, clip: AudioSegment) -> tuple[AudioSegment, float]:
+        """
+        Ajusta la ganancia de un clip para acercarlo a `target_lufs`.
+
+        La ganancia se limita a `max_gain_db` y a lo que permite el pico del
+        clip sin superar `peak_ceiling_db`. Los clips en silencio no se tocan.
+
+        Returns:
+            tuple: (clip ajustado, ganancia aplicada en dB)
+        """
+        if self.target_lufs is None:
+            return clip, 0.0
+        loudness = integrated_loudness(
+            pcm_samples(clip.raw_data, clip.sample_width, clip.channels), clip.frame_rate)
+        if not math.isfinite(loudness):
+            return clip, 0.0
+        gain = min(self.target_lufs - loudness, self.max_gain_db, self.peak_ceiling_db - clip.max_dBFS)
+        if abs(gain) < 0.05:
+            return clip, 0.0
+        return clip.apply_gain(gain), gain
+
+    @staticmethod
+    def _write(stream: IO[bytes], data: bytes) -> None:
+        view = memoryview(data)
+        for start in range(0, len(view), CHUNK_SIZE):
+            stream.write(view[start:start + CHUNK_SIZE])
+
+    def assemble(self, clip_paths: list[str], output_path: str | Path) -> str:
+        """
+        Une los clips con pausas entre ellos, normaliza la sonoridad de cada
+        uno y codifica el resultado una sola vez.
+
+        Args:
+            clip_paths (list[str]): Rutas de los clips en el orden del guion.
+            output_path (str | Path): Ruta del archivo final.
+
+        Returns:
+            str: Ruta del archivo final.
+
+        Raises:
+            ValueError: Si no hay clips que ensamblar.
+            RuntimeError: Si ffmpeg falla al codificar.
+        """
+        if not clip_paths:
+            raise ValueError("No audio clips to assemble")
+
+        output_path = str(output_path)
+        encoder = None
+        target = None
+        self.gains = []
+        # stderr va a un archivo: con un PIPE que nadie lee, ffmpeg se bloquearía
+        # al llenarlo y este proceso al escribir en su stdin
+        with tempfile.TemporaryFile() as errors:
+            try:
+                try:
+                    for clip_path in clip_paths:
+                        # Solo un clip decodificado en memoria a la vez
+                        clip = AudioSegment.from_file(clip_path)
+
+                        if encoder is None:
+                            target = self._target_format(clip)
+                            encoder = subprocess.Popen(
+                                self._encoder_command(output_path, *target),
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.DEVNULL,
+                                stderr=errors
+                            )
+                            for block in self._silence_bytes(self.lead_in, *target):
+                                encoder.stdin.write(block)
+
+                        frame_rate, channels, sample_width = target
+                        clip = clip.set_frame_rate(frame_rate).set_channels(
+                            channels).set_sample_width(sample_width)
+                        clip, gain = self.normalize(clip)
+                        self.gains.append(round(gain, 2))
+                        self._write(encoder.stdin, clip.raw_data)
+                        del clip
+
+                        for block in self._silence_bytes(self.pause_duration, *target):
+                            encoder.stdin.write(block)
+
+                    encoder.stdin.close()
+                except BrokenPipeError:
+                    # ffmpeg terminó antes de tiempo: su código de salida y stderr explican por qué
+                    pass
+
+                if encoder.wait() != 0:
+                    errors.seek(0)
+                    raise RuntimeError(
+                        f"Encoding failed: {errors.read().decode(errors='ignore')}")
+            except BaseException:
+                if encoder is not None and encoder.poll() is None:
+                    encoder.kill()
+                    encoder.wait()
+                raise
+
+        return output_path
@@ -1,30 +1,114 @@
+import asyncio
 import os
 import re
+import subprocess
+import tempfile
+import time
 import moviepy.editor as mp  # type: ignore
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from moviepy.config import get_setting  # type: ignore
 from pathlib import Path
-from utils.constants import TRANSCRIPT_MODEL
+from audio.audio_chunker import AudioChunker, merge_transcripts
+from utils.constants import (
+    TRANSCRIPT_MODEL,
+    TRANSCRIPT_CHUNK_MIN_BYTES,
+    TRANSCRIPT_MAX_WORKERS,
+    EXTRACT_AUDIO_BITRATE,
+    EXTRACT_AUDIO_SAMPLE_RATE,
+    EXTRACT_AUDIO_COPY_FORMATS
+)
+from utils import metrics
+from utils.openai_client import OpenAIClientFactory
+
+# Extensiones que se transcriben directamente, sin extraer audio
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.aac', '.ogg'}
+
+# Códec del primer flujo de audio en la salida de `ffmpeg -i`
+AUDIO_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+\S*: Audio: (\w+)")
 
 
 class VideoProcessor:
-    def __init__(self, openai_api_key, transcript_model=TRANSCRIPT_MODEL) -> None:
+    def __init__(self, openai_api_key, transcript_model=TRANSCRIPT_MODEL,
+                 transcript_path: str | Path = "assets/docs/transcript/video") -> None:
         """
         Inicializa el procesador de video con la API key de OpenAI
 
         Args:
             openai_api_key (str): API key de OpenAI
+            transcript_model (str): Modelo de transcripción
+            transcript_path (str | Path): Directorio donde se guardan las transcripciones
         """
-        self.client = OpenAI(api_key=openai_api_key)
-        self.transcript_path = Path("assets/docs/transcript/video")
+        self.client = OpenAIClientFactory.get_client(openai_api_key, "transcript")
+        self.async_client = OpenAIClientFactory.get_async_client(
+            openai_api_key, "transcript")
+        self.transcript_path = Path(transcript_path)
         self.transcript_model = transcript_model
+        # Audios mayores que este tamaño se transcriben por fragmentos en paralelo
+        self.chunk_min_bytes = TRANSCRIPT_CHUNK_MIN_BYTES
+        self.max_workers = TRANSCRIPT_MAX_WORKERS
+        self.chunker = AudioChunker()
+        # Mismo ffmpeg que usa moviepy
+        self.ffmpeg = get_setting("FFMPEG_BINARY")
+        # Duración en segundos de cada etapa del último procesamiento
+        self.timings: dict[str, float] = {}
 
         # Crear el directorio si no existe
         self.transcript_path.mkdir(parents=True, exist_ok=True)
 
+    def probe_audio_codec(self, video_path):
+        """
+        Obtiene el códec del primer flujo de audio de un archivo
+
+        Args:
+            video_path (str): Ruta al archivo de video
+
+        Returns:
+            str | None: Nombre del códec o None si no se pudo determinar
+        """
+        try:
+            result = subprocess.run(
+                [self.ffmpeg, "-hide_banner", "-i", str(video_path)],
+                capture_output=True, text=True, errors="ignore"
+            )
+        except OSError as e:
+            print(f"No se pudo analizar {video_path}: {e}")
+            return None
+        # Sin archivo de salida ffmpeg termina con error, pero ya ha listado los flujos
+        match = AUDIO_STREAM_PATTERN.search(result.stderr)
+        return match.group(1) if match else None
+
+    def _copy_audio_stream(self, video_path, output_path):
+        """Copia el flujo de audio sin recodificar. Devuelve False si ffmpeg falla"""
+        result = subprocess.run(
+            [self.ffmpeg, "-y", "-loglevel", "error", "-i", str(video_path),
+             "-vn", "-map", "0:a:0", "-c:a", "copy", str(output_path)],
+            capture_output=True, text=True, errors="ignore"
+        )
+        if result.returncode != 0:
+            print(f"No se pudo copiar el audio: {result.stderr.strip()}")
+            return False
+        return True
+
+    def _encode_audio(self, video_path, output_path):
+        """Recodifica el audio a MP3 mono de baja tasa de bits"""
+        video = mp.VideoFileClip(video_path)
+        audio = video.audio
+        audio.write_audiofile(
+            output_path,
+            fps=EXTRACT_AUDIO_SAMPLE_RATE,
+            bitrate=EXTRACT_AUDIO_BITRATE,
+            ffmpeg_params=["-ac", "1"]
+        )
+        video.close()
+
     def extract_audio(self, video_path, output_path=None):
         """
         Extrae el audio de un video
 
+        Si el códec del audio lo acepta la API de transcripción, el flujo se
+        copia tal cual en un contenedor adecuado, sin decodificar el video.
+        Solo en otro caso se recodifica a MP3 mono de baja tasa de bits.
+
         Args:
             video_path (str): Ruta al archivo de video
             output_path (str, optional): Ruta donde guardar el audio
@@ -34,34 +118,147 @@ class VideoProcessor:
         """
         # Use regex to remove invalid characters
         safe_name = re.sub(r'[^\w\s-]', '', Path(video_path).stem)
+
+        start = time.perf_counter()
+        codec = self.probe_audio_codec(video_path)
+        self.timings["probe"] = time.perf_counter() - start
+        metrics.observe("extract", "probe", self.timings["probe"], calls=1)
+
+        copy_ext = EXTRACT_AUDIO_COPY_FORMATS.get(codec)
         if output_path is None:
-            output_path = str(Path(video_path).parent / f"{safe_name}.mp3")
+            output_path = str(Path(video_path).parent /
+                              f"{safe_name}{copy_ext or '.mp3'}")
+
+        # Solo se copia si el contenedor pedido admite el códec original
+        if copy_ext is not None and Path(output_path).suffix.lower() == copy_ext:
+            print(f"Copiando audio ({codec}) de {video_path} a {output_path}")
+            start = time.perf_counter()
+            copied = self._copy_audio_stream(video_path, output_path)
+            self.timings["copy"] = time.perf_counter() - start
+            metrics.observe("extract", "copy", self.timings["copy"], calls=1,
+                            errors=int(not copied), bytes_out=metrics.file_size(output_path))
+            if copied:
+                return output_path
+            # La copia falló: recodificar a MP3
+            output_path = str(Path(output_path).with_suffix(".mp3"))
 
         print(f"Extrayendo audio de {video_path} a {output_path}")
-        video = mp.VideoFileClip(video_path)
-        audio = video.audio
-        audio.write_audiofile(output_path)
-        video.close()
+        start = time.perf_counter()
+        self._encode_audio(video_path, output_path)
+        self.timings["encode"] = time.perf_counter() - start
+        metrics.observe("extract", "encode", self.timings["encode"], calls=1,
+                        bytes_out=metrics.file_size(output_path))
 
         return output_path
 
+    def report_timings(self):
+        """Muestra la duración de cada etapa del último procesamiento"""
+        report = ", ".join(f"{stage}: {seconds:.2f}s" for stage, seconds in self.timings.items())
+        print(f"Tiempos por etapa: {report}")
+
+    def _should_chunk(self, audio_path) -> bool:
+        try:
+            return os.path.getsize(audio_path) > self.chunk_min_bytes
+        except OSError:
+            return False
+
+    def _transcribe_file(self, audio_path):
+        """Transcribe un archivo en una sola petición"""
+        with metrics.timer("transcribe", "whisper", bytes_out=metrics.file_size(audio_path)) as values, \
+                open(audio_path, "rb") as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                model=self.transcript_model,
+                file=audio_file
+            )
+            values["bytes_in"] = len(transcript.text.encode("utf-8"))
+        return transcript.text
+
+    async def _transcribe_file_async(self, audio_path):
+        """Transcribe un archivo en una sola petición con el cliente asíncrono"""
+        with metrics.timer("transcribe", "whisper", bytes_out=metrics.file_size(audio_path)) as values, \
+                open(audio_path, "rb") as audio_file:
+            transcript = await self.async_client.audio.transcriptions.create(
+                model=self.transcript_model,
+                file=audio_file
+            )
+            values["bytes_in"] = len(transcript.text.encode("utf-8"))
+        return transcript.text
+
+    def transcribe_chunked(self, audio_path):
+        """
+        Transcribe un audio largo por fragmentos en paralelo
+
+        El audio se corta en pausas con un pequeño solapamiento, cada fragmento
+        se transcribe en una petición independiente y los textos se unen
+        eliminando las palabras repetidas en los solapamientos.
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+
+        Returns:
+            str: Texto transcrito
+        """
+        with tempfile.TemporaryDirectory() as chunk_dir:
+            chunk_paths = self.chunker.split(audio_path, chunk_dir)
+            print(f"Transcribiendo {len(chunk_paths)} fragmentos de {audio_path}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map() conserva el orden de los fragmentos
+                texts = list(executor.map(metrics.in_current_context(self._transcribe_file), chunk_paths))
+        return merge_transcripts(texts)
+
+    async def transcribe_chunked_async(self, audio_path):
+        """
+        Versión asíncrona de `transcribe_chunked`
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+
+        Returns:
+            str: Texto transcrito
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def transcribe(chunk_path):
+            async with semaphore:
+                return await self._transcribe_file_async(chunk_path)
+
+        with tempfile.TemporaryDirectory() as chunk_dir:
+            chunk_paths = await asyncio.to_thread(self.chunker.split, audio_path, chunk_dir)
+            print(f"Transcribiendo {len(chunk_paths)} fragmentos de {audio_path}")
+            texts = await asyncio.gather(*(transcribe(path) for path in chunk_paths))
+        return merge_transcripts(list(texts))
+
     def transcribe_audio(self, audio_path):
         """
         Transcribe un archivo de audio usando la API de OpenAI
 
+        Los archivos mayores que `chunk_min_bytes` se transcriben por fragmentos.
+
         Args:
             audio_path (str): Ruta al archivo de audio
 
         Returns:
             str: Texto transcrito
         """
+        if self._should_chunk(audio_path):
+            return self.transcribe_chunked(audio_path)
         print(f"Transcribiendo audio de {audio_path}")
-        with open(audio_path, "rb") as audio_file:
-            transcript = self.client.audio.transcriptions.create(
-                model=self.transcript_model,
-                file=audio_file
-            )
-        return transcript.text
+        return self._transcribe_file(audio_path)
+
+    async def transcribe_audio_async(self, audio_path):
+        """
+        Versión asíncrona de `transcribe_audio` basada en `AsyncOpenAI`
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+
+        Returns:
+            str: Texto transcrito
+        """
+        if self._should_chunk(audio_path):
+            return await self.transcribe_chunked_async(audio_path)
+        print(f"Transcribiendo audio de {audio_path}")
+        return await self._transcribe_file_async(audio_path)
 
     def process_video(self, video_path):
         """
@@ -73,18 +270,22 @@ class VideoProcessor:
         Returns:
             tuple: (ruta del archivo de transcripción, texto transcrito)
         """
+        self.timings = {}
         # Extraer audio del video
         audio_path = self.extract_audio(video_path)
 
         try:
             # Transcribir el audio
+            start = time.perf_counter()
             transcript = self.transcribe_audio(audio_path)
+            self.timings["transcribe"] = time.perf_counter() - start
             # Guardar transcripción
             transcript_path = self.save_transcript(transcript, video_path)
         finally:
             # Limpiar el archivo de audio temporal
             os.remove(audio_path)
 
+        self.report_timings()
         return transcript_path, transcript
 
     def process_audio(self, audio_path):
@@ -116,13 +317,40 @@ class VideoProcessor:
         """
         # Determinar si es un archivo de audio o video
         file_ext = Path(file_path).suffix.lower()
-        audio_extensions = {'.mp3', '.wav', '.m4a', '.aac', '.ogg'}
 
-        if file_ext in audio_extensions:
+        if file_ext in AUDIO_EXTENSIONS:
             return self.process_audio(file_path)
         else:
             return self.process_video(file_path)
 
+    async def process_media_async(self, file_path):
+        """
+        Versión asíncrona de `process_media`. La extracción de audio y el guardado
+        se ejecutan en un hilo para no bloquear el bucle de eventos.
+
+        Args:
+            file_path (str): Ruta al archivo de video o audio
+
+        Returns:
+            tuple: (ruta del archivo de transcripción, texto transcrito)
+        """
+        if Path(file_path).suffix.lower() in AUDIO_EXTENSIONS:
+            transcript = await self.transcribe_audio_async(file_path)
+        else:
+            self.timings = {}
+            audio_path = await asyncio.to_thread(self.extract_audio, file_path)
+            try:
+                start = time.perf_counter()
+                transcript = await self.transcribe_audio_async(audio_path)
+                self.timings["transcribe"] = time.perf_counter() - start
+            finally:
+                os.remove(audio_path)
+            self.report_timings()
+
+        transcript_path = await asyncio.to_thread(
+            self.save_transcript, transcript, file_path)
+        return transcript_path, transcript
+
     def save_transcript(self, transcript, video_name):
         """
         Guarda la transcripción en un archivo
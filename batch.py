@@ -0,0 +1,181 @@
+import argparse
+import csv
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from utils.constants import BATCH_OUTPUT_DIR, BATCH_CONCURRENCY, DEFAULT_NUM_EXCHANGES
+
+# Valores aceptados en la columna "type" del manifiesto
+INPUT_TYPES = {
+    "pdf": "PDF",
+    "url": "URL",
+    "youtube": "URL",
+    "video": "Video/Audio",
+    "audio": "Video/Audio",
+    "media": "Video/Audio",
+    "video/audio": "Video/Audio"
+}
+
+
+def infer_input_type(source: str) -> str:
+    """Deduce el tipo de entrada a partir de la fuente"""
+    if re.match(r"https?://", source):
+        return "URL"
+    if Path(source).suffix.lower() == ".pdf":
+        return "PDF"
+    return "Video/Audio"
+
+
+def load_manifest(manifest_path: str | Path) -> list[dict]:
+    """
+    Lee un manifiesto CSV o JSONL de episodios.
+
+    Cada fila necesita una columna `source` (ruta a un PDF, URL de YouTube o
+    archivo de video/audio) y admite opcionalmente `id`, `type` y `num_exchanges`.
+
+    Args:
+        manifest_path (str | Path): Ruta del manifiesto (.csv o .jsonl).
+
+    Returns:
+        list[dict]: Episodios con id, source, type y num_exchanges.
+
+    Raises:
+        ValueError: Si una fila no tiene fuente, su tipo no es válido o su id
+            (ya saneado) repite el de otra fila.
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        if manifest_path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    episodes = []
+    seen_ids: set[str] = set()
+    for index, row in enumerate(rows):
+        source = str(row.get("source") or "").strip()
+        if not source:
+            raise ValueError(f"Fila {index + 1}: falta la columna 'source'")
+
+        input_type = str(row.get("type") or "").strip()
+        if input_type:
+            if input_type.lower() not in INPUT_TYPES:
+                raise ValueError(f"Fila {index + 1}: tipo desconocido '{input_type}'")
+            input_type = INPUT_TYPES[input_type.lower()]
+        else:
+            input_type = infer_input_type(source)
+
+        # El id nombra el directorio del episodio: mantenerlo estable permite reanudar
+        episode_id = str(row.get("id") or "").strip() or f"{index + 1:03d}_{Path(source).stem or 'episode'}"
+        episode_id = re.sub(r"[^\w-]", "_", episode_id)
+        # Dos filas con el mismo id compartirían directorio y checkpoint
+        if episode_id in seen_ids:
+            raise ValueError(f"Fila {index + 1}: id duplicado '{episode_id}'")
+        seen_ids.add(episode_id)
+
+        episodes.append({
+            "id": episode_id,
+            "source": source,
+            "type": input_type,
+            "num_exchanges": int(row.get("num_exchanges") or DEFAULT_NUM_EXCHANGES)
+        })
+    return episodes
+
+
+class BatchRunner:
+    """
+    Genera varios episodios sin interfaz a partir de un manifiesto.
+
+    Cada episodio se ejecuta con `PodIA.run_episode` en su propio directorio
+    dentro de `output_dir`, de modo que volver a lanzar el mismo lote sobre el
+    mismo directorio solo repite lo que falló o faltó.
+
+    Attributes:
+        podia (PodIA): Instancia que ejecuta el pipeline.
+        output_dir (Path): Directorio del lote.
+        concurrency (int): Episodios generados a la vez.
+    """
+
+    def __init__(self, podia, output_dir: str | Path, concurrency: int = BATCH_CONCURRENCY) -> None:
+        self.podia = podia
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.concurrency = max(1, concurrency)
+
+    def run_episode(self, episode: dict) -> dict:
+        """Genera un episodio y devuelve su entrada del informe"""
+        print(f"▶ {episode['id']}: {episode['source']}")
+        report = {**episode, "run_dir": str(self.output_dir / episode["id"])}
+        start = time.perf_counter()
+        try:
+            result = self.podia.run_episode(
+                episode["type"], episode["source"], run_dir=report["run_dir"],
+                num_exchanges=episode["num_exchanges"])
+            report.update(status="ok", podcast=result["podcast"], timings=result.get("timings", {}),
+                          script_tokens=result.get("script_tokens", []), metrics=result.get("metrics", {}))
+            print(f"✅ {episode['id']}: {result['podcast']}")
+        except Exception as e:
+            report.update(status="failed", error=str(e))
+            print(f"❌ {episode['id']}: {e}")
+        report["seconds"] = round(time.perf_counter() - start, 2)
+        return report
+
+    def run(self, episodes: list[dict]) -> dict:
+        """
+        Genera todos los episodios y escribe `report.json` en el directorio del lote.
+
+        Args:
+            episodes (list[dict]): Episodios leídos con `load_manifest`.
+
+        Returns:
+            dict: Informe con el resultado y los tiempos de cada episodio.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # map() mantiene el orden del manifiesto en el informe
+            results = list(executor.map(self.run_episode, episodes))
+
+        report = {
+            "total": len(results),
+            "succeeded": sum(1 for r in results if r["status"] == "ok"),
+            "failed": sum(1 for r in results if r["status"] == "failed"),
+            "concurrency": self.concurrency,
+            "seconds": round(time.perf_counter() - start, 2),
+            "episodes": results
+        }
+        report_path = self.output_dir / "report.json"
+        report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Lote terminado: {report['succeeded']}/{report['total']} episodios en {report['seconds']}s. "
+              f"Informe: {report_path}")
+        return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Genera episodios de PodIA en lote a partir de un manifiesto CSV o JSONL.")
+    parser.add_argument("manifest", help="Ruta del manifiesto (.csv o .jsonl) con una columna 'source'")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help=f"Episodios generados a la vez (por defecto {BATCH_CONCURRENCY})")
+    parser.add_argument("-o", "--output-dir", default=None,
+                        help="Directorio del lote; reutilícelo para reanudar un lote interrumpido")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    episodes = load_manifest(args.manifest)
+    output_dir = args.output_dir or Path(BATCH_OUTPUT_DIR) / datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    from utils.env_loader import load_environment_variables
+    load_environment_variables()
+    from podia import PodIA
+
+    report = BatchRunner(PodIA(), output_dir, args.concurrency).run(episodes)
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
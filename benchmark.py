@@ -0,0 +1,572 @@
+import argparse
+import json
+import random
+import tempfile
+import textwrap
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from utils.constants import (BENCHMARK_OUTPUT_DIR, BENCHMARK_EPISODES, BENCHMARK_CONCURRENCY, BENCHMARK_PAGES,
+                             BENCHMARK_LATENCY, BENCHMARK_JITTER, BENCHMARK_ERROR_RATE, BENCHMARK_TOLERANCE,
+                             DEFAULT_NUM_EXCHANGES, RUNS_DIR)
+from utils.openai_client import OpenAIClientFactory
+
+# Etapas de `PodIA.run_episode`, en orden
+STAGES = ("extract", "summary", "script_and_audio")
+
+# Clave de API que usa PodIA durante el benchmark: nunca sale de la máquina
+BENCHMARK_API_KEY = "podia-benchmark"
+
+# Trama MPEG-1 Layer III de 128 kbps a 44.1 kHz; con el resto a cero se decodifica como silencio
+_MP3_FRAME = b"\xff\xfb\x90\xc4" + bytes(413)
+_MP3_FRAMES_PER_WORD = 15  # Cada trama dura ~26 ms: unos 0.4 s de audio por palabra
+
+# Vocabulario de los textos de prueba (ASCII para no depender de codificaciones en el PDF)
+_WORDS = ("energia", "modelo", "datos", "sistema", "red", "proceso", "resultado", "analisis", "clima",
+          "ciudad", "agua", "memoria", "tiempo", "luz", "sonido", "equipo", "historia", "ciencia",
+          "mercado", "problema", "solucion", "estudio", "metodo", "valor", "cambio", "medida")
+
+
+def fake_text(seed: Any, words: int) -> str:
+    """Texto de relleno determinista de `words` palabras agrupadas en frases"""
+    rng = random.Random(str(seed))
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(6, 14))
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+
+def silent_mp3(words: int) -> bytes:
+    """MP3 silencioso con una duración proporcional al número de palabras"""
+    return _MP3_FRAME * (max(1, words) * _MP3_FRAMES_PER_WORD)
+
+
+def write_sample_pdf(path: str | Path, pages: list[str]) -> Path:
+    """
+    Escribe un PDF de texto con una página por elemento de `pages`.
+
+    Se genera a mano para no añadir una dependencia solo para el benchmark.
+
+    Args:
+        path (str | Path): Ruta del PDF.
+        pages (list[str]): Texto de cada página (ASCII).
+
+    Returns:
+        Path: Ruta del PDF escrito.
+    """
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))}] /Count {len(pages)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for i, text in enumerate(pages):
+        lines = textwrap.wrap(text, 90)
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td\n" + "\n".join(f"({line}) Tj T*" for line in escaped) + "\nET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>")
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(data))
+    return path
+
+
+class FakeOpenAIServer:
+    """
+    Servidor HTTP local que imita los endpoints de OpenAI que usa PodIA.
+
+    Responde a `/v1/chat/completions` (también en streaming),
+    `/v1/audio/speech` y `/v1/audio/transcriptions` con contenido sintético
+    distinto en cada petición, para que ninguna caché acierte por casualidad.
+    Cada respuesta espera `latency` ± `jitter` segundos y una fracción
+    `error_rate` de las peticiones falla con `error_status`.
+
+    Attributes:
+        latency (float): Segundos de espera antes de responder.
+        jitter (float): Variación aleatoria máxima de la espera.
+        error_rate (float): Fracción de peticiones que fallan.
+        error_status (int): Código HTTP de las peticiones que fallan (500, 429...).
+        words (int): Palabras de cada respuesta de chat.
+        requests (dict[str, int]): Peticiones recibidas por endpoint.
+        errors (int): Errores inyectados.
+    """
+
+    def __init__(self, latency: float = BENCHMARK_LATENCY, jitter: float = BENCHMARK_JITTER,
+                 error_rate: float = BENCHMARK_ERROR_RATE, error_status: int = 500, words: int = 60,
+                 seed: int | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.words = words
+        self.host = host
+        self.port = port
+        self.requests: dict[str, int] = {}
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _next_request(self, path: str) -> tuple[int, float, bool]:
+        """Cuenta la petición y decide su número, su espera y si debe fallar"""
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            number = sum(self.requests.values())
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            self.errors += int(failed)
+        return number, delay, failed
+
+    def _chat_completion(self, number: int, body: dict) -> tuple[dict, str, dict]:
+        content = f"Respuesta simulada {number}. {fake_text(number, self.words)}"
+        prompt_words = sum(len(str(message.get("content") or "").split()) for message in body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_words,
+            "completion_tokens": len(content.split()),
+            "total_tokens": prompt_words + len(content.split()),
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+        base = {"id": f"chatcmpl-fake{number}", "created": int(time.time()), "model": body.get("model", "")}
+        return base, content, usage
+
+    def start(self) -> str:
+        """Arranca el servidor y devuelve su URL base"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, como la API real: el pool compartido reutiliza las conexiones
+            protocol_version = "HTTP/1.1"
+
+            def _read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    body = bytearray()
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return bytes(body)
+                        body += self.rfile.read(size)
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                self._send(status, json.dumps(payload).encode("utf-8"))
+
+            def _send_stream(self, base: dict, content: str, usage: dict, include_usage: bool) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def event(choices: list, **extra: Any) -> None:
+                    chunk = {**base, "object": "chat.completion.chunk", "choices": choices, **extra}
+                    data = f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+
+                for i, word in enumerate(content.split(" ")):
+                    delta = {"role": "assistant", "content": word} if i == 0 else {"content": " " + word}
+                    event([{"index": 0, "delta": delta, "finish_reason": None}])
+                event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                if include_usage:
+                    event([], usage=usage)
+                done = b"data: [DONE]\n\n"
+                self.wfile.write(f"{len(done):x}\r\n".encode("ascii") + done + b"\r\n0\r\n\r\n")
+
+            def do_POST(self) -> None:
+                raw = self._read_body()
+                path = self.path.split("?")[0]
+                number, delay, failed = server._next_request(path)
+                time.sleep(delay)
+
+                if failed:
+                    self._send_json(server.error_status, {"error": {
+                        "message": "Error simulado por el benchmark", "type": "server_error", "code": None}})
+                elif path.endswith("/chat/completions"):
+                    body = json.loads(raw)
+                    base, content, usage = server._chat_completion(number, body)
+                    if body.get("stream"):
+                        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                        self._send_stream(base, content, usage, include_usage)
+                    else:
+                        self._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [{
+                            "index": 0, "finish_reason": "stop", "logprobs": None,
+                            "message": {"role": "assistant", "content": content}}]})
+                elif path.endswith("/audio/speech"):
+                    words = len(str(json.loads(raw).get("input", "")).split())
+                    self._send(200, silent_mp3(words), "audio/mpeg")
+                elif path.endswith("/audio/transcriptions"):
+                    self._send_json(200, {"text": fake_text(number, server.words * 5)})
+                else:
+                    self._send_json(404, {"error": {"message": f"Ruta no simulada: {path}", "type": "not_found"}})
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="podia-fake-openai", daemon=True).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        """Detiene el servidor"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentil `q` (0-100) con interpolación lineal, 0 si no hay valores"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(values: list[float]) -> dict[str, float]:
+    """Número de muestras, p50, p95, media y máximo de unos tiempos en segundos"""
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "max": round(max(values, default=0.0), 4)
+    }
+
+
+def merge_metrics(snapshots: list[dict]) -> dict[str, dict[str, dict[str, float]]]:
+    """Suma las métricas de varios episodios (el máximo se combina como máximo)"""
+    merged: dict[str, dict[str, dict[str, float]]] = {}
+    for snapshot in snapshots:
+        for stage, operations in snapshot.items():
+            for operation, series in operations.items():
+                target = merged.setdefault(stage, {}).setdefault(operation, dict.fromkeys(series, 0))
+                for name, value in series.items():
+                    target[name] = max(target[name], value) if name == "max_seconds" else target[name] + value
+    return merged
+
+
+def compare(report: dict, baseline: dict, tolerance: float = BENCHMARK_TOLERANCE) -> list[str]:
+    """
+    Compara un informe con otro de referencia.
+
+    Args:
+        report (dict): Informe actual.
+        baseline (dict): Informe de referencia.
+        tolerance (float): Empeoramiento relativo permitido (0.2 = 20 %).
+
+    Returns:
+        list[str]: Descripción de cada regresión; vacía si no hay ninguna.
+    """
+    regressions = []
+    for stage, expected in baseline.get("stages", {}).items():
+        current = report.get("stages", {}).get(stage)
+        if not current or not current["count"]:
+            continue
+        if expected["p95"] and current["p95"] > expected["p95"] * (1 + tolerance):
+            regressions.append(f"{stage}: p95 {current['p95']:.3f}s frente a {expected['p95']:.3f}s")
+        if expected.get("peak_memory_mb") and current.get("peak_memory_mb", 0) > expected["peak_memory_mb"] * (1 + tolerance):
+            regressions.append(f"{stage}: memoria {current['peak_memory_mb']:.1f} MB "
+                               f"frente a {expected['peak_memory_mb']:.1f} MB")
+    if report["throughput_per_min"] < baseline.get("throughput_per_min", 0) * (1 - tolerance):
+        regressions.append(f"throughput {report['throughput_per_min']:.2f} episodios/min "
+                           f"frente a {baseline['throughput_per_min']:.2f}")
+    if report["failed"] > baseline.get("failed", 0):
+        regressions.append(f"{report['failed']} episodios fallidos frente a {baseline.get('failed', 0)}")
+    return regressions
+
+
+class Benchmark:
+    """
+    Mide el pipeline completo de PodIA sin API real.
+
+    Arranca `FakeOpenAIServer`, apunta a él los clientes de una clave de API
+    propia y genera `episodes` episodios con `PodIA.run_episode` a partir de
+    PDFs sintéticos. La instancia de PodIA recibe esa clave y guarda sus datos
+    en `workdir`, de modo que no toca los `assets/` del proyecto ni cambia el
+    directorio actual, la clave global o las variables de entorno. Los tiempos de cada etapa salen del `metrics.json` de cada
+    ejecución y la memoria pico de cada etapa se mide con `tracemalloc`.
+    La memoria es la de todo el proceso: solo se atribuye bien a cada
+    etapa con `concurrency=1`.
+
+    Attributes:
+        server (FakeOpenAIServer): Servidor que sustituye a la API.
+        workdir (Path): Directorio de trabajo de la ejecución.
+        episodes (int): Episodios a generar.
+        concurrency (int): Episodios generados a la vez.
+        pages (int): Páginas del PDF de cada episodio.
+        num_exchanges (int): Intercambios del guion de cada episodio.
+        track_memory (bool): Mide la memoria pico (tracemalloc ralentiza el proceso).
+    """
+
+    def __init__(self, server: FakeOpenAIServer, workdir: str | Path, episodes: int = BENCHMARK_EPISODES,
+                 concurrency: int = BENCHMARK_CONCURRENCY, pages: int = BENCHMARK_PAGES,
+                 num_exchanges: int = DEFAULT_NUM_EXCHANGES, track_memory: bool = True) -> None:
+        self.server = server
+        self.workdir = Path(workdir).resolve()
+        self.episodes = max(1, episodes)
+        self.concurrency = max(1, concurrency)
+        self.pages = max(1, pages)
+        self.num_exchanges = num_exchanges
+        self.track_memory = track_memory
+        self._local = threading.local()
+
+    def _memory_mark(self) -> int:
+        """Memoria actual; reinicia el pico para medir desde aquí"""
+        if not self.track_memory:
+            return 0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+
+    def _memory_since(self, mark: int) -> float:
+        """MB de memoria pico por encima de `mark`"""
+        if not self.track_memory:
+            return 0.0
+        _, peak = tracemalloc.get_traced_memory()
+        return max(0, peak - mark) / (1024 * 1024)
+
+    def _measured(self, stage: str, fn: Callable) -> Callable:
+        """Envuelve una etapa para anotar su memoria pico en el episodio del hilo actual"""
+        def run(*args: Any, **kwargs: Any) -> Any:
+            mark = self._memory_mark()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.memory[stage] = self._memory_since(mark)
+                # Lo que venga después de la última etapa medida es guion y audio
+                self._local.mark = self._memory_mark()
+        return run
+
+    def _create_podia(self, podia_module):
+        podia = podia_module.PodIA(api_key=BENCHMARK_API_KEY, data_dir=self.workdir)
+        podia.extract_stage = self._measured("extract", podia.extract_stage)
+        podia.summary_stage = self._measured("summary", podia.summary_stage)
+        return podia
+
+    def run_episode(self, podia, index: int, source: Path) -> dict:
+        """Genera un episodio y devuelve sus tiempos y su memoria por etapa"""
+        episode_id = f"{index + 1:03d}"
+        run_dir = podia.data_dir / RUNS_DIR / f"benchmark-{episode_id}"
+        self._local.memory = memory = {}
+        self._local.mark = self._memory_mark()
+        report: dict[str, Any] = {"id": episode_id}
+
+        start = time.perf_counter()
+        try:
+            podia.run_episode("PDF", str(source), run_dir=run_dir, num_exchanges=self.num_exchanges)
+            memory["script_and_audio"] = self._memory_since(self._local.mark)
+            report["status"] = "ok"
+        except Exception as e:
+            report.update(status="failed", error=str(e))
+        report["seconds"] = time.perf_counter() - start
+
+        try:
+            report["metrics"] = json.loads((run_dir / "metrics.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            report["metrics"] = {}
+        # Solo cuentan las etapas que terminaron bien
+        report["stages"] = {
+            stage: report["metrics"][stage]["stage"]["seconds"] for stage in STAGES
+            if "stage" in report["metrics"].get(stage, {}) and not report["metrics"][stage]["stage"]["errors"]}
+        report["memory_mb"] = memory
+        return report
+
+    def run(self) -> dict:
+        """
+        Ejecuta el benchmark.
+
+        Returns:
+            dict: Informe con la configuración, el throughput, la latencia
+                (p50/p95/media/máximo) y la memoria pico de cada etapa, las
+                métricas de cada operación y las peticiones que recibió el servidor.
+        """
+        # PodIA carga gradio: se importa solo al ejecutar el benchmark
+        import podia as podia_module
+        self.workdir.mkdir(parents=True, exist_ok=True)
+
+        self.server.start()
+        # Clave propia: solo sus clientes apuntan al servidor falso y usan otro pool HTTP
+        OpenAIClientFactory.set_base_url(BENCHMARK_API_KEY, self.server.base_url)
+        if self.track_memory:
+            tracemalloc.start()
+        try:
+            podia = self._create_podia(podia_module)
+            sources = [
+                write_sample_pdf(self.workdir / "inputs" / f"episode_{i + 1:03d}.pdf",
+                                 [fake_text(f"{i}-{page}", 350) for page in range(self.pages)])
+                for i in range(self.episodes)]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                results = list(executor.map(
+                    lambda args: self.run_episode(podia, *args), enumerate(sources)))
+            seconds = time.perf_counter() - start
+        finally:
+            if self.track_memory:
+                tracemalloc.stop()
+            OpenAIClientFactory.set_base_url(BENCHMARK_API_KEY, None)
+            self.server.stop()
+
+        return self.report(results, seconds)
+
+    def report(self, results: list[dict], seconds: float) -> dict:
+        succeeded = [result for result in results if result["status"] == "ok"]
+        stages = {}
+        for stage in (*STAGES, "episode"):
+            if stage == "episode":
+                samples = [result["seconds"] for result in succeeded]
+            else:
+                samples = [result["stages"][stage] for result in results if stage in result["stages"]]
+            stages[stage] = latency_summary(samples)
+            memory = [result["memory_mb"][stage] for result in results if stage in result["memory_mb"]]
+            if stage == "episode":
+                memory = [max(result["memory_mb"].values(), default=0.0) for result in succeeded]
+            stages[stage]["peak_memory_mb"] = round(max(memory, default=0.0), 2)
+
+        operations = {}
+        for stage, series_by_operation in merge_metrics([result["metrics"] for result in results]).items():
+            for operation, series in series_by_operation.items():
+                if operation in ("stage", "cache") or not series["calls"]:
+                    continue
+                operations[f"{stage}/{operation}"] = {
+                    "calls": series["calls"],
+                    "errors": series["errors"],
+                    "retries": series["retries"],
+                    "mean_seconds": round(series["seconds"] / series["calls"], 4),
+                    "max_seconds": series["max_seconds"]
+                }
+
+        return {
+            "config": {
+                "episodes": self.episodes,
+                "concurrency": self.concurrency,
+                "pages": self.pages,
+                "num_exchanges": self.num_exchanges,
+                "latency": self.server.latency,
+                "jitter": self.server.jitter,
+                "error_rate": self.server.error_rate,
+                "error_status": self.server.error_status,
+                "track_memory": self.track_memory
+            },
+            "episodes": len(results),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "errors": sorted({result["error"] for result in results if "error" in result}),
+            "seconds": round(seconds, 3),
+            "throughput_per_min": round(len(succeeded) / seconds * 60, 3) if seconds else 0.0,
+            "stages": stages,
+            "operations": operations,
+            "server": {"requests": dict(self.server.requests), "errors": self.server.errors}
+        }
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['succeeded']}/{report['episodes']} episodios en {report['seconds']}s "
+          f"({report['throughput_per_min']} episodios/min)")
+    print(f"{'Etapa':<18}{'n':>4}{'p50 (s)':>10}{'p95 (s)':>10}{'media (s)':>11}{'pico (MB)':>11}")
+    for stage, values in report["stages"].items():
+        print(f"{stage:<18}{values['count']:>4}{values['p50']:>10.3f}{values['p95']:>10.3f}"
+              f"{values['mean']:>11.3f}{values['peak_memory_mb']:>11.2f}")
+    for operation, values in report["operations"].items():
+        print(f"  {operation:<22} {values['calls']} llamadas, {values['mean_seconds']:.3f}s de media, "
+              f"{values['errors']} errores, {values['retries']} reintentos")
+    for error in report["errors"]:
+        print(f"❌ {error}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Mide el pipeline de PodIA contra un servidor local que imita la API de OpenAI.")
+    parser.add_argument("-n", "--episodes", type=int, default=BENCHMARK_EPISODES,
+                        help=f"Episodios a generar (por defecto {BENCHMARK_EPISODES})")
+    parser.add_argument("-c", "--concurrency", type=int, default=BENCHMARK_CONCURRENCY,
+                        help=f"Episodios generados a la vez (por defecto {BENCHMARK_CONCURRENCY})")
+    parser.add_argument("--pages", type=int, default=BENCHMARK_PAGES,
+                        help=f"Páginas del PDF de cada episodio (por defecto {BENCHMARK_PAGES})")
+    parser.add_argument("--num-exchanges", type=int, default=DEFAULT_NUM_EXCHANGES,
+                        help="Intercambios del guion de cada episodio")
+    parser.add_argument("--latency", type=float, default=BENCHMARK_LATENCY,
+                        help="Segundos que tarda en responder el servidor falso")
+    parser.add_argument("--jitter", type=float, default=BENCHMARK_JITTER,
+                        help="Variación aleatoria (±) de la latencia en segundos")
+    parser.add_argument("--error-rate", type=float, default=BENCHMARK_ERROR_RATE,
+                        help="Fracción de peticiones que responden con error")
+    parser.add_argument("--error-status", type=int, default=500,
+                        help="Código HTTP de los errores simulados (500, 429...)")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla de la latencia y los errores")
+    parser.add_argument("--no-memory", action="store_true", help="No medir la memoria (tracemalloc ralentiza)")
+    parser.add_argument("-o", "--output", default=None,
+                        help=f"Ruta del informe JSON (por defecto en {BENCHMARK_OUTPUT_DIR})")
+    parser.add_argument("--baseline", default=None,
+                        help="Informe de referencia; el proceso termina con error si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help="Empeoramiento relativo permitido frente a la referencia")
+    parser.add_argument("--workdir", default=None,
+                        help="Directorio de trabajo (por defecto uno temporal que se borra al terminar)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    output = Path(args.output or Path(BENCHMARK_OUTPUT_DIR) / f"{datetime.now():%Y%m%d-%H%M%S}.json").resolve()
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+
+    server = FakeOpenAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                              error_status=args.error_status, seed=args.seed)
+    with tempfile.TemporaryDirectory(prefix="podia-benchmark-") as workdir:
+        report = Benchmark(server, args.workdir or workdir, episodes=args.episodes,
+                           concurrency=args.concurrency, pages=args.pages,
+                           num_exchanges=args.num_exchanges, track_memory=not args.no_memory).run()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print_report(report)
+    print(f"Informe: {output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"⚠️ Regresión: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def digest_text(*parts: str) -> str:
+    """SHA-256 de varios textos, usado como huella de las entradas de una etapa"""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class RunCheckpoint:
+    """
+    Puntos de control de una ejecución del pipeline.
+
+    Cada etapa (extracción, resumen, cada turno del guion, cada clip de voz y
+    la mezcla final) guarda su salida dentro de `run_dir` y la registra en
+    `manifest.json` junto con el SHA-256 del archivo y la huella (`source`) de
+    las entradas que la produjeron. Al repetir la ejecución, una etapa solo se
+    reutiliza si su archivo existe, no ha cambiado y se generó a partir de las
+    mismas entradas; en cualquier otro caso se vuelve a calcular.
+
+    Attributes:
+        run_dir (Path): Directorio de la ejecución.
+        manifest_path (Path): Ruta del manifiesto.
+    """
+
+    def __init__(self, run_dir: str | Path) -> None:
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.run_dir / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+        self._manifest = self._load()
+
+    def _load(self) -> dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault("stages", {})
+        return manifest
+
+    def _save(self) -> None:
+        tmp_path = self.manifest_path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(self._manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def file_digest(path: str | Path) -> str:
+        """Devuelve el SHA-256 del contenido de un archivo"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def path_for(self, filename: str) -> Path:
+        """Ruta dentro del directorio de la ejecución, creando los subdirectorios"""
+        path = self.run_dir / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def record(self, stage: str, path: str | Path, source: str = "") -> None:
+        """
+        Registra la salida de una etapa completada.
+
+        Args:
+            stage (str): Nombre de la etapa.
+            path (str | Path): Archivo producido, dentro de `run_dir`.
+            source (str): Huella de las entradas de la etapa.
+        """
+        path = Path(path)
+        entry = {
+            "file": path.resolve().relative_to(self.run_dir.resolve()).as_posix(),
+            "sha256": self.file_digest(path),
+            "source": source,
+            "completed_at": time.time()
+        }
+        with self._lock:
+            self._manifest["stages"][stage] = entry
+            self._save()
+
+    def get(self, stage: str, source: str = "") -> Path | None:
+        """
+        Devuelve la salida de una etapa si sigue siendo válida.
+
+        Args:
+            stage (str): Nombre de la etapa.
+            source (str): Huella de las entradas actuales de la etapa.
+
+        Returns:
+            Path | None: Archivo de la etapa o None si falta, ha cambiado o es de otras entradas.
+        """
+        with self._lock:
+            entry = self._manifest["stages"].get(stage)
+        if entry is None or entry["source"] != source:
+            return None
+
+        path = self.run_dir / entry["file"]
+        try:
+            if self.file_digest(path) != entry["sha256"]:
+                print(f"Checkpoint inválido para {stage}: el archivo ha cambiado")
+                return None
+        except FileNotFoundError:
+            return None
+        return path
+
+    def save_text(self, stage: str, text: str, filename: str, source: str = "") -> Path:
+        """Escribe la salida de texto de una etapa y la registra"""
+        path = self.path_for(filename)
+        tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+        self.record(stage, path, source)
+        return path
+
+    def load_text(self, stage: str, source: str = "") -> str | None:
+        """Devuelve el texto guardado por una etapa o None si no es válido"""
+        path = self.get(stage, source)
+        if path is None:
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def completed_stages(self) -> list[str]:
+        """Nombres de las etapas registradas en el manifiesto"""
+        with self._lock:
+            return list(self._manifest["stages"])
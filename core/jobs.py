@@ -0,0 +1,238 @@
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+from utils.constants import JOBS_DB_PATH, JOBS_MAX_WORKERS
+
+# Estados posibles de un trabajo
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Una etapa recibe el trabajo y los resultados de las etapas anteriores
+StageFn = Callable[[dict[str, Any], dict[str, Any]], Any]
+
+
+class JobStore:
+    """
+    Almacén persistente de trabajos en SQLite.
+
+    Cada trabajo guarda su entrada, la configuración con la que se encoló,
+    su estado y el resultado de cada etapa completada, de modo que tras un
+    reinicio puede continuar desde la última con la misma configuración.
+
+    Attributes:
+        db_path (Path): Ruta de la base de datos.
+    """
+
+    def __init__(self, db_path: str | Path = JOBS_DB_PATH) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                input_type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                results TEXT NOT NULL DEFAULT '{}',
+                config TEXT NOT NULL DEFAULT '{}',
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Bases de datos creadas antes de guardar la configuración de cada trabajo
+        columns = {row["name"] for row in self._execute("PRAGMA table_info(jobs)")}
+        if "config" not in columns:
+            self._execute("ALTER TABLE jobs ADD COLUMN config TEXT NOT NULL DEFAULT '{}'")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una conexión por operación: sqlite3 no comparte conexiones entre hilos
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, query: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    return conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+
+    def create(self, input_type: str, content: str, config: dict[str, Any] | None = None) -> str:
+        """Registra un trabajo nuevo en cola y devuelve su id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, input_type, content, status, config, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, input_type, content, QUEUED, json.dumps(config or {}, ensure_ascii=False), now, now))
+        return job_id
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Devuelve el trabajo como diccionario o None si no existe"""
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["results"] = json.loads(job["results"])
+        job["config"] = json.loads(job["config"])
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Actualiza columnas de un trabajo"""
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?",
+                      (*fields.values(), job_id))
+
+    def save_stage(self, job_id: str, stage: str, output: Any) -> None:
+        """Guarda el resultado de una etapa completada"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT results FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                    results = json.loads(row["results"])
+                    results[stage] = output
+                    conn.execute(
+                        "UPDATE jobs SET results = ?, stage = ?, updated_at = ? WHERE id = ?",
+                        (json.dumps(results, ensure_ascii=False), stage, time.time(), job_id))
+            finally:
+                conn.close()
+
+    def unfinished(self) -> list[str]:
+        """Ids de los trabajos en cola o interrumpidos, del más antiguo al más reciente"""
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING))
+        return [row["id"] for row in rows]
+
+
+class JobQueue:
+    """
+    Cola de trabajos con un pool de hilos.
+
+    Cada trabajo recorre las etapas en orden y persiste el resultado de cada
+    una antes de pasar a la siguiente. Las etapas que ya tienen resultado se
+    saltan, por lo que `start()` reanuda los trabajos interrumpidos desde la
+    última etapa completada.
+
+    Attributes:
+        store (JobStore): Almacén de los trabajos. Si no se inyecta, el de
+            `store_path` se abre al usarlo por primera vez.
+        stages (list): Pares (nombre, función) ejecutados en orden.
+        max_workers (int): Trabajos ejecutados en paralelo.
+    """
+
+    def __init__(self, store: JobStore | None, stages: list[tuple[str, StageFn]],
+                 max_workers: int = JOBS_MAX_WORKERS, store_path: str | Path = JOBS_DB_PATH) -> None:
+        self._store = store
+        self._store_path = store_path
+        self.stages = stages
+        self.max_workers = max(1, max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> JobStore:
+        # Quien no usa trabajos (lotes, benchmark, tests) no crea la base de datos
+        with self._lock:
+            if self._store is None:
+                self._store = JobStore(self._store_path)
+            return self._store
+
+    def start(self) -> list[str]:
+        """
+        Arranca el pool y vuelve a encolar los trabajos pendientes.
+
+        Returns:
+            list[str]: Ids de los trabajos reanudados.
+        """
+        with self._lock:
+            if self._executor is not None:
+                return []
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="podia-job")
+        resumed = self.store.unfinished()
+        for job_id in resumed:
+            self._executor.submit(self._run, job_id)
+        if resumed:
+            print(f"Reanudando {len(resumed)} trabajos pendientes")
+        return resumed
+
+    def submit(self, input_type: str, content: str, config: dict[str, Any] | None = None) -> str:
+        """
+        Encola un trabajo nuevo.
+
+        Args:
+            input_type (str): Tipo de entrada ("PDF", "URL" o "Video/Audio").
+            content (str): Ruta del archivo o URL.
+            config (dict, optional): Configuración que las etapas leen de `job["config"]`.
+
+        Returns:
+            str: Id del trabajo.
+        """
+        if self._executor is None:
+            self.start()
+        job_id = self.store.create(input_type, content, config)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def retry(self, job_id: str) -> bool:
+        """
+        Vuelve a encolar un trabajo fallido; continúa desde la última etapa completada.
+
+        Returns:
+            bool: False si el trabajo no existe o no ha fallado.
+        """
+        job = self.store.get(job_id)
+        if job is None or job["status"] != FAILED:
+            return False
+        if self._executor is None:
+            self.start()
+        self.store.update(job_id, status=QUEUED, error=None)
+        self._executor.submit(self._run, job_id)
+        return True
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        """Devuelve el estado actual de un trabajo"""
+        return self.store.get(job_id)
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in (DONE, FAILED):
+            return
+
+        self.store.update(job_id, status=RUNNING, error=None)
+        results = job["results"]
+        try:
+            for name, stage in self.stages:
+                if name in results:
+                    continue
+                print(f"Trabajo {job_id}: etapa {name}")
+                results[name] = stage(job, results)
+                self.store.save_stage(job_id, name, results[name])
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status=FAILED, error=str(e))
+            return
+
+        self.store.update(job_id, status=DONE)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene el pool. Los trabajos sin terminar se reanudan en el próximo `start()`"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,94 @@
+import re
+from collections import deque
+from utils.constants import SCRIPT_MEMORY_WINDOW_TURNS, SCRIPT_MEMORY_SUMMARY_TOKENS
+from utils.tokens import count_tokens
+
+
+def _first_sentence(text: str) -> str:
+    """Primera frase de un turno sin la etiqueta [Nombre] inicial"""
+    text = re.sub(r"^\s*\[[^\]]*\]\s*", "", text).strip()
+    return re.split(r"(?<=[.!?])\s+", text, maxsplit=1)[0]
+
+
+class ConversationMemory:
+    """
+    Memoria acotada de la conversación de un guion.
+
+    Guarda literalmente los últimos `window_turns` turnos y resume los
+    anteriores en un resumen deslizante (la primera frase de cada turno)
+    que nunca supera `summary_tokens`. Así el contexto enviado en cada turno
+    no crece con la longitud del guion.
+
+    Attributes:
+        window_turns (int): Turnos recientes que se conservan completos.
+        summary_tokens (int): Tamaño máximo del resumen de turnos antiguos.
+        model (str | None): Modelo cuyo tokenizador se usa para medir.
+    """
+
+    def __init__(self, window_turns: int = SCRIPT_MEMORY_WINDOW_TURNS,
+                 summary_tokens: int = SCRIPT_MEMORY_SUMMARY_TOKENS, model: str | None = None) -> None:
+        self.window_turns = max(1, window_turns)
+        self.summary_tokens = summary_tokens
+        self.model = model
+        self.recent: deque[tuple[str, str]] = deque()
+        self.summary: deque[str] = deque()
+        self._summary_size = 0
+
+    def add(self, speaker: str, text: str) -> None:
+        """Agrega un turno; el más antiguo de la ventana pasa al resumen"""
+        self.recent.append((speaker, text))
+        while len(self.recent) > self.window_turns:
+            old_speaker, old_text = self.recent.popleft()
+            self._summarize(old_speaker, old_text)
+
+    def _summarize(self, speaker: str, text: str) -> None:
+        line = f"- {speaker}: {_first_sentence(text)}"
+        self.summary.append(line)
+        self._summary_size += count_tokens(line, self.model)
+        while self.summary and self._summary_size > self.summary_tokens:
+            self._summary_size -= count_tokens(self.summary.popleft(), self.model)
+
+    def clear(self) -> None:
+        """Olvida toda la conversación"""
+        self.recent.clear()
+        self.summary.clear()
+        self._summary_size = 0
+
+    def context(self, max_tokens: int, skip_latest: bool = True) -> str:
+        """
+        Contexto de la conversación para el prompt de un turno.
+
+        Si no cabe en `max_tokens`, los turnos recientes más antiguos se
+        reducen a su línea de resumen y después se descartan las líneas más
+        antiguas del resumen.
+
+        Args:
+            max_tokens (int): Tokens disponibles para el contexto.
+            skip_latest (bool): Omite el último turno, que el prompt ya incluye.
+
+        Returns:
+            str: Contexto listo para el prompt, vacío si no hay nada que enviar.
+        """
+        recent = list(self.recent)[:-1] if skip_latest else list(self.recent)
+        summary = list(self.summary)
+
+        while summary or recent:
+            context = self._render(summary, recent)
+            if count_tokens(context, self.model) <= max_tokens:
+                return context
+            if recent:
+                speaker, text = recent.pop(0)
+                summary.append(f"- {speaker}: {_first_sentence(text)}")
+            else:
+                summary.pop(0)
+        return ""
+
+    @staticmethod
+    def _render(summary: list[str], recent: list[tuple[str, str]]) -> str:
+        parts = []
+        if summary:
+            parts.append("Resumen de la conversación hasta ahora:\n" + "\n".join(summary))
+        if recent:
+            parts.append("Turnos más recientes:\n" + "\n\n".join(
+                f"{speaker}: {text}" for speaker, text in recent))
+        return "\n\n".join(parts)
@@ -0,0 +1,68 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from core.checkpoint import RunCheckpoint
+from core.script import ScriptGenerator
+from core.voice import VoiceGenerator
+from utils import metrics
+from utils.constants import DEFAULT_NUM_EXCHANGES
+
+
+class PodcastPipeline:
+    """
+    Genera el guion y el audio del podcast de forma solapada.
+
+    Cada turno se encola para TTS en cuanto `ScriptGenerator` lo produce, así
+    la síntesis de voz avanza mientras el modelo sigue escribiendo el diálogo.
+    La latencia total pasa a ser aproximadamente max(guion, audio) en lugar de
+    la suma de ambos.
+
+    Attributes:
+        script_generator (ScriptGenerator): Productor de los turnos del guion.
+        voice_generator (VoiceGenerator): Consumidor que sintetiza cada turno.
+    """
+
+    def __init__(self, script_generator: ScriptGenerator, voice_generator: VoiceGenerator) -> None:
+        self.script_generator = script_generator
+        self.voice_generator = voice_generator
+
+    def run(self, summary: str, num_exchanges: int = DEFAULT_NUM_EXCHANGES,
+            checkpoint: RunCheckpoint | None = None) -> tuple[str, Path | str]:
+        """
+        Genera el guion y el podcast final a partir de un resumen.
+
+        Args:
+            summary (str): Resumen del tema a discutir.
+            num_exchanges (int): Número de intercambios del guion.
+            checkpoint (RunCheckpoint, optional): Guarda turnos, clips y mezcla, y
+                reutiliza los que sigan siendo válidos de un intento anterior.
+
+        Returns:
+            tuple: (guion en JSON, ruta del podcast final o "" si falla el audio)
+        """
+        self.voice_generator.checkpoint = checkpoint
+        try:
+            self.voice_generator.prepare_output_dir()
+            futures: List[Future] = []
+
+            with ThreadPoolExecutor(max_workers=self.voice_generator.max_workers) as executor:
+                def enqueue_turn(speaker: str, text: str) -> None:
+                    entry = ScriptGenerator.parse_turn(speaker, text)
+                    futures.append(executor.submit(
+                        metrics.in_current_context(self.voice_generator.synthesize_entry), len(futures), entry))
+
+                script = self.script_generator.generate_script(
+                    summary, num_exchanges, on_turn=enqueue_turn, checkpoint=checkpoint)
+
+                # Results are collected in submission order, i.e. script order
+                audio_files: List[Dict[str, str]] = [
+                    audio_file for audio_file in (future.result() for future in futures) if audio_file]
+
+            if not audio_files:
+                return script, ""
+
+            # concatenate_audio_files() devuelve "" si falla la mezcla, y Path("") sería "."
+            final_path = self.voice_generator.concatenate_audio_files(audio_files)
+            return script, Path(final_path) if final_path else ""
+        finally:
+            self.voice_generator.checkpoint = None
@@ -1,16 +1,34 @@
-from openai import OpenAI
-from typing import List, Tuple
+from openai import AsyncOpenAI, OpenAI
+from typing import Callable, Generator, Iterator, List, NamedTuple, Tuple
 from core.characters.anfitrion import Anfitrion
 from core.characters.participante1 import Participante1
-from utils.constants import SCRIPT_MODEL, DEFAULT_NUM_EXCHANGES
+from core.checkpoint import RunCheckpoint, digest_text
+from core.memory import ConversationMemory
+from utils import metrics
+from utils.constants import SCRIPT_MODEL, DEFAULT_NUM_EXCHANGES, SCRIPT_PROMPT_MAX_TOKENS
+from utils.openai_client import OpenAIClientFactory
+from utils.tokens import count_tokens
+
+INITIAL_ERROR_MESSAGE = "Error: No se pudo generar el guion del podcast."
+
+
+class Turn(NamedTuple):
+    """Un turno pendiente de generar dentro del guion."""
+    speaker: str
+    prompt: str
+    label: str
+    # Si falla, se registra el error y el diálogo continúa sin este turno
+    recoverable: bool = False
 
 
 class ScriptGenerator:
     def __init__(self, api_key: str) -> None:
         """Inicializa OpenAI y los personajes del podcast."""
-        # Crear instancias separadas de OpenAI para cada personaje
-        self.anfitrion_ai = OpenAI(api_key=api_key)
-        self.participante_ai = OpenAI(api_key=api_key)
+        # Cada personaje tiene su cliente, pero ambos comparten el pool HTTP
+        self.anfitrion_ai: OpenAI = OpenAIClientFactory.get_client(api_key, "script")
+        self.participante_ai: OpenAI = OpenAIClientFactory.get_client(api_key, "script")
+        self.async_ai: AsyncOpenAI = OpenAIClientFactory.get_async_client(
+            api_key, "script")
 
         self.anfitrion = Anfitrion()
         self.participante = Participante1()
@@ -18,123 +36,342 @@ class ScriptGenerator:
         self.anfitrion_messages: List[str] = []
         self.participante_messages: List[str] = []
         self.model = SCRIPT_MODEL
+        self.memory = ConversationMemory(model=self.model)
+        self.token_usage: List[dict] = []
+        self.on_turn: Callable[[str, str], None] | None = None
+        self.checkpoint: RunCheckpoint | None = None
 
     def update_model(self, new_model: str) -> None:
         """Updates the script generation model being used"""
         self.model = new_model
         print(f"Updated script model to: {new_model}")
 
-    def _initial_anfitrion_response(self, summary: str) -> str:
-        try:
-            # * Anfitrion
-
-            # Personalizamos el prompt inicial del anfitrión en base al resumen del tema a discutir
-            host_init_prompt = self.anfitrion.anfitrion_init(summary)
-
-            # Generar respuesta inicial del anfitrión en base al prompt personalizado
-            host_response = self._generate_anfitrion_response(host_init_prompt)
-
-            # Agregar la respuesta inicial del anfitrión a la conversación
-            self.conversation.append(("Anfitrion", host_response))
-
-            # Agregar la respuesta inicial del anfitrión a la lista de mensajes del anfitrión
-            self.anfitrion_messages.append(host_response)
-
-            # Imprimir la respuesta inicial del anfitrión
-            print(f"Anfitrion inicial: {host_response}")
-
-            return host_response
-
-        except Exception as e:
-            print(f"Error: {e}")
-            return "Error: No se pudo generar el guion del podcast."
+    def _system_prompt(self, speaker: str) -> str:
+        """Persona del personaje, memorizada y enviada solo como mensaje de sistema"""
+        if speaker == "Anfitrion":
+            return self.anfitrion.anfitrion_prompt()
+        return self.participante.participante1_prompt()
+
+    # La persona va primero y es idéntica en todos los turnos de un personaje:
+    # ese prefijo común es el que aprovecha la caché de prompts del proveedor
+    def _anfitrion_messages(self, prompt: str) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self._system_prompt("Anfitrion")},
+            {"role": "user", "content": prompt}]
+
+    def _participante_messages(self, prompt: str) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self._system_prompt("Participante")},
+            {"role": "user", "content": prompt}]
+
+    def _complete(self, client: OpenAI, speaker: str, messages: list[dict[str, str]]) -> str:
+        """Pide un turno completo y registra su tiempo, tamaño y tokens."""
+        with metrics.timer("script", "chat", bytes_out=metrics.message_bytes(messages)) as values:
+            response = client.chat.completions.create(
+                model=self.model,  # Use the instance model
+                messages=messages
+            )
+            content = str(response.choices[0].message.content)
+            values["bytes_in"] = len(content.encode("utf-8"))
+            self._record_usage(speaker, response, values)
+        return content
+
+    async def _complete_async(self, speaker: str, messages: list[dict[str, str]]) -> str:
+        """Versión asíncrona de `_complete`."""
+        with metrics.timer("script", "chat", bytes_out=metrics.message_bytes(messages)) as values:
+            response = await self.async_ai.chat.completions.create(
+                model=self.model,  # Use the instance model
+                messages=messages
+            )
+            content = str(response.choices[0].message.content)
+            values["bytes_in"] = len(content.encode("utf-8"))
+            self._record_usage(speaker, response, values)
+        return content
 
     def _generate_anfitrion_response(self, prompt: str) -> str:
         """Genera una respuesta usando la instancia de OpenAI del anfitrión."""
-        response = self.anfitrion_ai.chat.completions.create(
-            model=self.model,  # Use the instance model
-            messages=[
-                {"role": "system", "content": self.anfitrion.anfitrion_prompt()},
-                {"role": "user", "content": prompt}]
-        )
-        return str(response.choices[0].message.content)
-
-    def _initial_participante_response(self, summary: str, previous_response: str) -> str:
-
-        try:
-            # * Participante
-
-            # Personalizamos el prompt inicial del participante en base al resumen del tema a discutir y la respuesta del anfitrión
-            guest_init_prompt = self.participante.participante1_init(
-                summary, previous_response)
-
-            # Generar respuesta inicial del participante en base al prompt personalizado
-            guest_response = self._generate_participante_response(
-                guest_init_prompt)
-
-            # Agregar la respuesta inicial del participante a la conversación
-            self.conversation.append(("Participante", guest_response))
-
-            # Agregar la respuesta inicial del participante a la lista de mensajes del participante
-            self.participante_messages.append(guest_response)
-
-            print(f"Participante inicial: {guest_response}")
-            return guest_response
-
-        except Exception as e:
-            print(f"Error: {e}")
-            return "Error: No se pudo generar el guion del podcast."
+        return self._complete(self.anfitrion_ai, "Anfitrion", self._anfitrion_messages(prompt))
 
     def _generate_participante_response(self, prompt: str) -> str:
         """Genera una respuesta usando la instancia de OpenAI del participante."""
-        response = self.participante_ai.chat.completions.create(
-            model=self.model,  # Use the instance model
-            messages=[
-                {"role": "system", "content": self.participante.participante1_prompt()},
-                {"role": "user", "content": prompt}]
-        )
-        return str(response.choices[0].message.content)
-
-    def generate_script(self, summary: str, num_exchanges: int = DEFAULT_NUM_EXCHANGES) -> str:
-        """Genera un guion de podcast completo."""
-
-        # Generar respuesta inicial del anfitrión
-        host_response = self._initial_anfitrion_response(summary)
-
-        # Generar respuesta inicial del participante
-        guest_response = self._initial_participante_response(
-            summary, host_response)
+        return self._complete(self.participante_ai, "Participante", self._participante_messages(prompt))
+
+    async def _generate_anfitrion_response_async(self, prompt: str) -> str:
+        """Genera una respuesta del anfitrión con el cliente asíncrono."""
+        return await self._complete_async("Anfitrion", self._anfitrion_messages(prompt))
+
+    async def _generate_participante_response_async(self, prompt: str) -> str:
+        """Genera una respuesta del participante con el cliente asíncrono."""
+        return await self._complete_async("Participante", self._participante_messages(prompt))
+
+    def _stream_response(self, speaker: str, prompt: str) -> Iterator[str]:
+        """Genera un turno con `stream=True` y devuelve los fragmentos de texto según llegan."""
+        client = self.anfitrion_ai if speaker == "Anfitrion" else self.participante_ai
+        messages = (self._anfitrion_messages(prompt) if speaker == "Anfitrion"
+                    else self._participante_messages(prompt))
+        with metrics.timer("script", "chat_stream", bytes_out=metrics.message_bytes(messages)) as values:
+            stream = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                # El último fragmento trae el uso de tokens de la petición
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                if chunk.usage is not None:
+                    self._record_usage(speaker, chunk, values)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    values["bytes_in"] = values.get("bytes_in", 0) + len(
+                        chunk.choices[0].delta.content.encode("utf-8"))
+                    yield chunk.choices[0].delta.content
+
+    def _record_usage(self, speaker: str, response, values: dict[str, float] | None = None) -> None:
+        """Registra los tokens de prompt del turno y cuántos sirvió la caché del proveedor"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        if values is not None:
+            metrics.record_usage(values, usage)
+        details = getattr(usage, "prompt_tokens_details", None)
+        entry = {
+            "speaker": speaker,
+            "prompt_tokens": int(usage.prompt_tokens or 0),
+            "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0)
+        }
+        self.token_usage.append(entry)
+        print(f"Tokens de prompt ({speaker}): {entry['prompt_tokens']} "
+              f"({entry['cached_tokens']} en caché)")
+
+    def _reset_conversation(self) -> None:
+        """Empieza una conversación nueva: nada de una ejecución anterior llega a la siguiente."""
+        self.conversation = []
+        self.anfitrion_messages = []
+        self.participante_messages = []
+        self.memory = ConversationMemory(model=self.model)
+        self.token_usage = []
+
+    def _add_turn(self, speaker: str, text: str) -> None:
+        """Agrega un turno a la conversación y lo notifica a `on_turn` si existe."""
+        self.conversation.append((speaker, text))
+        self.memory.add(speaker, text)
+        if speaker == "Anfitrion":
+            self.anfitrion_messages.append(text)
+        else:
+            self.participante_messages.append(text)
+
+        if self.on_turn is not None:
+            self.on_turn(speaker, text)
+
+    def _dialogue_turns(self, summary: str, num_exchanges: int) -> Generator[Turn, str, None]:
+        """
+        Describe el orden de los turnos del guion.
+
+        Produce un `Turn` por intervención y recibe con `send()` el texto
+        generado, de modo que el mismo flujo sirve para la ruta síncrona y
+        para la asíncrona.
+        """
+        # * Anfitrion
+        # Personalizamos el prompt inicial del anfitrión en base al resumen del tema a discutir
+        host_response = yield Turn(
+            "Anfitrion", self.anfitrion.anfitrion_init(summary), "Anfitrion inicial", recoverable=True)
+
+        # * Participante
+        # Personalizamos el prompt inicial del participante en base al resumen del tema a discutir y la respuesta del anfitrión
+        guest_response = yield Turn(
+            "Participante", self.participante.participante1_init(summary, host_response),
+            "Participante inicial", recoverable=True)
 
         # Generar el resto del diálogo
         for i in range(num_exchanges):
             print(f"Intercambio {i + 1} de {num_exchanges}")
 
             # Respuesta del anfitrión
-            host_prompt = f"{self.anfitrion.anfitrion_prompt(
-            )}\n\nÚltima respuesta del participante: {guest_response}"
-            host_response = self._generate_anfitrion_response(host_prompt)
-            self.conversation.append(("Anfitrion", host_response))
-            self.anfitrion_messages.append(host_response)
-            print(f"Anfitrion: {host_response}")
+            host_prompt = self._with_memory(
+                f"Última respuesta del participante: {guest_response}")
+            host_response = yield Turn("Anfitrion", host_prompt, "Anfitrion")
 
             # Si no es el último intercambio, generar respuesta del participante
             if i < num_exchanges - 1:
-                guest_prompt = f"{self.participante.participante1_prompt(
-                )}\n\nÚltima respuesta del anfitrión: {host_response}\n"
-                guest_response = self._generate_participante_response(
-                    guest_prompt)
-                self.conversation.append(("Participante", guest_response))
-                self.participante_messages.append(guest_response)
-                print(f"Participante: {guest_response}")
-
-        # Agregar la despedida del anfitrión
-        despedida_prompt = f"{self.anfitrion.anfitrion_prompt()}\n\n{
-            self.anfitrion.anfitrion_despedida()}"
-        despedida_response = self._generate_anfitrion_response(
-            despedida_prompt)
-        self.conversation.append(("Anfitrion", despedida_response))
-        self.anfitrion_messages.append(despedida_response)
-        print(f"Anfitrion despedida: {despedida_response}")
+                guest_prompt = self._with_memory(
+                    f"Última respuesta del anfitrión: {host_response}\n")
+                guest_response = yield Turn("Participante", guest_prompt, "Participante")
+
+        # Agregar la despedida del anfitrión, que necesita la conversación para resumirla
+        despedida_prompt = self._with_memory(
+            self.anfitrion.anfitrion_despedida(), skip_latest=False)
+        yield Turn("Anfitrion", despedida_prompt, "Anfitrion despedida")
+
+    def _with_memory(self, prompt: str, skip_latest: bool = True) -> str:
+        """
+        Antepone el contexto de la conversación a `prompt` sin superar
+        `SCRIPT_PROMPT_MAX_TOKENS`. La persona no se repite aquí: ya va en el
+        mensaje de sistema.
+        """
+        budget = SCRIPT_PROMPT_MAX_TOKENS - count_tokens(prompt, self.model)
+        context = self.memory.context(budget, skip_latest=skip_latest) if budget > 0 else ""
+        return f"{context}\n\n{prompt}" if context else prompt
+
+    def _turn_source(self, summary: str, turn: Turn) -> str:
+        # El prompt incluye la respuesta anterior: si cambia un turno, cambian los siguientes
+        return digest_text(self.model, self._system_prompt(turn.speaker), summary, turn.speaker, turn.prompt)
+
+    def _load_turn(self, index: int, summary: str, turn: Turn) -> str | None:
+        """Devuelve el turno guardado en el checkpoint si sigue siendo válido"""
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint.load_text(f"script_turn_{index:03d}", self._turn_source(summary, turn))
+
+    def _save_turn(self, index: int, summary: str, turn: Turn, response: str) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.save_text(
+                f"script_turn_{index:03d}", str(response),
+                f"script/turn_{index:03d}.txt", self._turn_source(summary, turn))
+
+    def _complete_turn(self, turn: Turn, response: str | None, error: Exception | None) -> str:
+        """Registra el resultado de un turno y devuelve el texto que verá el siguiente."""
+        if error is not None:
+            if not turn.recoverable:
+                raise error
+            print(f"Error: {error}")
+            return INITIAL_ERROR_MESSAGE
+
+        self._add_turn(turn.speaker, str(response))
+        print(f"{turn.label}: {response}")
+        return str(response)
+
+    def generate_script(self, summary: str, num_exchanges: int = DEFAULT_NUM_EXCHANGES,
+                        on_turn: Callable[[str, str], None] | None = None,
+                        checkpoint: RunCheckpoint | None = None) -> str:
+        """
+        Genera un guion de podcast completo.
+
+        Args:
+            summary (str): Resumen del tema a discutir.
+            num_exchanges (int): Número de intercambios entre anfitrión y participante.
+            on_turn (Callable, optional): Se llama con (personaje, texto) en cuanto
+                se genera cada turno, antes de pasar al siguiente.
+            checkpoint (RunCheckpoint, optional): Guarda cada turno y reutiliza los
+                ya generados en una ejecución anterior.
+        """
+        self._reset_conversation()
+        self.on_turn = on_turn
+        self.checkpoint = checkpoint
+        try:
+            turns = self._dialogue_turns(summary, num_exchanges)
+            turn = next(turns)
+            index = 0
+            while True:
+                response, error = self._load_turn(index, summary, turn), None
+                if response is None:
+                    generate = (self._generate_anfitrion_response if turn.speaker == "Anfitrion"
+                                else self._generate_participante_response)
+                    try:
+                        response = generate(turn.prompt)
+                    except Exception as e:
+                        error = e
+                    if error is None:
+                        self._save_turn(index, summary, turn, response)
+                text = self._complete_turn(turn, response, error)
+                index += 1
+                try:
+                    turn = turns.send(text)
+                except StopIteration:
+                    break
+        finally:
+            self.on_turn = None
+            self.checkpoint = None
+
+        return self._format_script()
+
+    async def generate_script_async(self, summary: str, num_exchanges: int = DEFAULT_NUM_EXCHANGES,
+                                    on_turn: Callable[[str, str], None] | None = None,
+                                    checkpoint: RunCheckpoint | None = None) -> str:
+        """
+        Versión asíncrona de `generate_script` basada en `AsyncOpenAI`.
+
+        Args:
+            summary (str): Resumen del tema a discutir.
+            num_exchanges (int): Número de intercambios entre anfitrión y participante.
+            on_turn (Callable, optional): Se llama con (personaje, texto) en cuanto
+                se genera cada turno, antes de pasar al siguiente.
+            checkpoint (RunCheckpoint, optional): Guarda cada turno y reutiliza los
+                ya generados en una ejecución anterior.
+        """
+        self._reset_conversation()
+        self.on_turn = on_turn
+        self.checkpoint = checkpoint
+        try:
+            turns = self._dialogue_turns(summary, num_exchanges)
+            turn = next(turns)
+            index = 0
+            while True:
+                response, error = self._load_turn(index, summary, turn), None
+                if response is None:
+                    generate = (self._generate_anfitrion_response_async if turn.speaker == "Anfitrion"
+                                else self._generate_participante_response_async)
+                    try:
+                        response = await generate(turn.prompt)
+                    except Exception as e:
+                        error = e
+                    if error is None:
+                        self._save_turn(index, summary, turn, response)
+                text = self._complete_turn(turn, response, error)
+                index += 1
+                try:
+                    turn = turns.send(text)
+                except StopIteration:
+                    break
+        finally:
+            self.on_turn = None
+            self.checkpoint = None
+
+        return self._format_script()
+
+    def stream_script(self, summary: str, num_exchanges: int = DEFAULT_NUM_EXCHANGES,
+                      checkpoint: RunCheckpoint | None = None) -> Generator[Tuple[int, str, str], None, str]:
+        """
+        Genera el guion devolviendo el texto de cada turno a medida que llega.
+
+        Produce tuplas (índice del turno, personaje, fragmento). Los turnos
+        recuperados del checkpoint llegan en un único fragmento. Al terminar,
+        el valor de retorno del generador es el guion en JSON, igual que el de
+        `generate_script`.
+
+        Args:
+            summary (str): Resumen del tema a discutir.
+            num_exchanges (int): Número de intercambios entre anfitrión y participante.
+            checkpoint (RunCheckpoint, optional): Guarda cada turno y reutiliza los
+                ya generados en una ejecución anterior.
+        """
+        self._reset_conversation()
+        self.checkpoint = checkpoint
+        try:
+            turns = self._dialogue_turns(summary, num_exchanges)
+            turn = next(turns)
+            index = 0
+            while True:
+                response, error = self._load_turn(index, summary, turn), None
+                if response is not None:
+                    yield index, turn.speaker, response
+                else:
+                    parts = []
+                    try:
+                        for delta in self._stream_response(turn.speaker, turn.prompt):
+                            parts.append(delta)
+                            yield index, turn.speaker, delta
+                    except Exception as e:
+                        error = e
+                    if error is None:
+                        response = "".join(parts)
+                        self._save_turn(index, summary, turn, response)
+                text = self._complete_turn(turn, response, error)
+                index += 1
+                try:
+                    turn = turns.send(text)
+                except StopIteration:
+                    break
+        finally:
+            self.checkpoint = None
 
         return self._format_script()
 
@@ -150,38 +387,50 @@ class ScriptGenerator:
         """Devuelve la conversación completa."""
         return self.conversation
 
-    def _format_script(self) -> str:
-        """Formatea la conversación en un formato JSON legible."""
-        import json
+    @staticmethod
+    def parse_turn(speaker: str, text: str) -> dict[str, str]:
+        """Convierte un turno en una entrada del guion con personaje y mensaje."""
+        # Extract character name from text if present
+        if '[' in text and ']' in text:
+            name_start = text.find('[') + 1
+            name_end = text.find(']')
+            name = text[name_start:name_end]
+            message = text[name_end + 1:].strip()
+        else:
+            name = speaker
+            message = text.strip()
+
+        return {
+            "character": name,
+            "message": message
+        }
 
+    def script_preview(self, speaker: str | None = None, partial: str = "") -> dict:
+        """
+        Guion generado hasta ahora como diccionario.
+
+        Args:
+            speaker (str, optional): Personaje del turno que se está generando.
+            partial (str): Texto recibido de ese turno, que se añade al final.
+        """
         # Create a list to store the dialogue entries
-        dialogue = []
-
-        for speaker, text in self.conversation:
-            # Extract character name from text if present
-            if '[' in text and ']' in text:
-                name_start = text.find('[') + 1
-                name_end = text.find(']')
-                name = text[name_start:name_end]
-                message = text[name_end + 1:].strip()
-            else:
-                name = speaker
-                message = text.strip()
-
-            # Add the entry to dialogue
-            dialogue.append({
-                "character": name,
-                "message": message
-            })
+        dialogue = [self.parse_turn(speaker, text)
+                    for speaker, text in self.conversation]
+        if speaker is not None and partial:
+            dialogue.append(self.parse_turn(speaker, partial))
 
         # Create the final JSON structure with the theme as the title
-        script_json = {
+        return {
             "title": "GUION DEL PODCAST",
             "dialogue": dialogue
         }
 
+    def _format_script(self) -> str:
+        """Formatea la conversación en un formato JSON legible."""
+        import json
+
         # Return formatted JSON with proper indentation
-        return json.dumps(script_json, ensure_ascii=False, indent=2)
+        return json.dumps(self.script_preview(), ensure_ascii=False, indent=2)
 
 
 # ? Dev Purpose
@@ -1,42 +1,157 @@
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from openai import AsyncOpenAI, OpenAI
+from utils import metrics
+from utils.openai_client import OpenAIClientFactory
 from utils.env_loader import OPENAI_API_KEY, load_environment_variables
-from utils.constants import SUMMARY_MODEL
+from utils.constants import (
+    SUMMARY_MODEL,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAX_WORKERS,
+    SUMMARY_PROMPT_VERSION,
+    SUMMARY_CACHE_DIR,
+    SUMMARY_CACHE_TTL,
+    SUMMARY_CACHE_MAX_ENTRIES
+)
+from utils.tokens import split_into_chunks
+
+
+class SummaryCache:
+    """
+    Caché persistente de resúmenes en disco.
+
+    Cada resumen se guarda en un JSON cuyo nombre es el hash de
+    (hash del texto, modelo, versión del prompt). Las entradas caducan tras
+    `ttl` segundos y, por encima de `max_entries`, se eliminan las usadas hace
+    más tiempo.
+
+    Attributes:
+        cache_dir (Path): Directorio de la caché.
+        ttl (float): Vida máxima de una entrada en segundos.
+        max_entries (int): Número máximo de resúmenes guardados.
+    """
+
+    def __init__(self, cache_dir: str | Path = SUMMARY_CACHE_DIR, ttl: float = SUMMARY_CACHE_TTL,
+                 max_entries: int = SUMMARY_CACHE_MAX_ENTRIES) -> None:
+        # El directorio se crea con el primer resumen guardado
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str = SUMMARY_PROMPT_VERSION) -> str:
+        """Devuelve la clave de caché de un resumen"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        raw = "\0".join([text_hash, model, prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Devuelve el resumen cacheado o None si no existe o ha caducado"""
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+
+            if time.time() - entry["created_at"] > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+
+            # Marcar como usado recientemente
+            os.utime(path)
+            return entry["summary"]
+
+    def put(self, key: str, summary: str, model: str) -> None:
+        """Guarda un resumen y aplica la política de expulsión"""
+        path = self._entry_path(key)
+        entry = {"created_at": time.time(), "model": model, "summary": summary}
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda entry: entry[0])
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Vacía la caché por completo"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
 
 
 class SummaryGenerator:
     """
     Clase para generar resúmenes estructurados utilizando OpenAI GPT.
 
+    Los textos largos se resumen en dos fases: cada fragmento se resume en
+    paralelo (map) y las notas resultantes se combinan en el resumen final con
+    la estructura de 6 partes (reduce).
+
     Attributes:
         client (OpenAI): Cliente de OpenAI para realizar las peticiones a la API.
+        async_client (AsyncOpenAI): Cliente asíncrono para las rutas `*_async`.
+        chunk_tokens (int): Tamaño máximo en tokens de cada fragmento.
+        max_workers (int): Fragmentos que se resumen a la vez.
+        cache (SummaryCache): Caché de resúmenes ya generados.
+        use_cache (bool): Si es False, siempre se llama a la API.
     """
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, cache: SummaryCache | None = None, use_cache: bool = True) -> None:
         """
         Inicializa el generador de resúmenes.
 
         Args:
             api_key (str): Clave de API de OpenAI.
+            cache (SummaryCache, optional): Caché a usar (por defecto en SUMMARY_CACHE_DIR).
+            use_cache (bool): Permite desactivar la caché.
         """
         if not api_key:
             raise ValueError("API key cannot be empty")
-        self.client = OpenAI(api_key=api_key)
+        self.client: OpenAI = OpenAIClientFactory.get_client(api_key, "summary")
+        self.async_client: AsyncOpenAI = OpenAIClientFactory.get_async_client(
+            api_key, "summary")
         self.model = SUMMARY_MODEL
+        self.chunk_tokens = SUMMARY_CHUNK_TOKENS
+        self.max_workers = SUMMARY_MAX_WORKERS
+        self.cache = cache if cache is not None else SummaryCache()
+        self.use_cache = use_cache
 
     def update_model(self, new_model: str) -> None:
         """Updates the summary model being used"""
         self.model = new_model
         print(f"Updated summary model to: {new_model}")
 
-    def generate_summary(self, text: str) -> str:
+    def _build_messages(self, text: str) -> list[dict[str, str]]:
         """
-        Genera un resumen estructurado del texto proporcionado.
+        Construye los mensajes de la petición de resumen.
 
         Args:
             text (str): Texto a analizar y resumir.
 
         Returns:
-            str: Resumen estructurado que incluye tema principal, puntos clave y resumen para debate.
+            list: Mensajes de sistema y usuario para la API de chat.
         """
         prompt = f"""
         You’re a skilled podcast producer with a knack for transforming complex texts into engaging and entertaining summaries. You understand what captivates an audience and how to structure information for maximum impact. Your specialty is crafting summaries that not only inform but also spark lively discussions among listeners.
@@ -57,14 +172,157 @@ class SummaryGenerator:
         {text}
         """
 
-        response = self.client.chat.completions.create(
-            model=self.model,  # Use the instance model
-            messages=[
-                {"role": "system", "content": "Eres un asistente experto en análisis y resumen de textos enfocado en generar resúmenes interesantes y estructurados para debates."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return str(response.choices[0].message.content)
+        return [
+            {"role": "system", "content": "Eres un asistente experto en análisis y resumen de textos enfocado en generar resúmenes interesantes y estructurados para debates."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _build_chunk_messages(self, chunk: str, index: int, total: int) -> list[dict[str, str]]:
+        """
+        Construye los mensajes de la fase map para un fragmento del texto.
+
+        Args:
+            chunk (str): Fragmento a resumir.
+            index (int): Posición del fragmento (empezando en 1).
+            total (int): Número total de fragmentos.
+
+        Returns:
+            list: Mensajes de sistema y usuario para la API de chat.
+        """
+        prompt = f"""
+        You are reading part {index} of {total} of a longer document that will become a podcast.
+
+        Write detailed notes about this part only: its topics, main ideas, key points or arguments, and any notable quotes or references (copy quotes literally). Do not add an introduction or a conclusion; the notes will be merged with the notes of the other parts.
+
+        Ur response must be in Spanish language.
+
+        Text:
+        {chunk}
+        """
+
+        return [
+            {"role": "system", "content": "Eres un asistente experto en análisis de textos que toma notas precisas y completas."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _complete(self, messages: list[dict[str, str]]) -> str:
+        with metrics.timer("summary", "chat", bytes_out=metrics.message_bytes(messages)) as values:
+            response = self.client.chat.completions.create(
+                model=self.model,  # Use the instance model
+                messages=messages
+            )
+            content = str(response.choices[0].message.content)
+            values["bytes_in"] = len(content.encode("utf-8"))
+            metrics.record_usage(values, getattr(response, "usage", None))
+        return content
+
+    async def _complete_async(self, messages: list[dict[str, str]]) -> str:
+        with metrics.timer("summary", "chat", bytes_out=metrics.message_bytes(messages)) as values:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,  # Use the instance model
+                messages=messages
+            )
+            content = str(response.choices[0].message.content)
+            values["bytes_in"] = len(content.encode("utf-8"))
+            metrics.record_usage(values, getattr(response, "usage", None))
+        return content
+
+    @staticmethod
+    def _merge_notes(notes: list[str]) -> str:
+        """Une las notas de la fase map en el texto que recibe la fase reduce."""
+        return "\n\n".join(
+            f"Notas de la parte {i} de {len(notes)}:\n{note}" for i, note in enumerate(notes, start=1))
+
+    def _summarize(self, text: str) -> str:
+        """Resume el texto con una sola petición o, si es largo, con map-reduce."""
+        chunks = split_into_chunks(text, self.chunk_tokens, self.model)
+        if len(chunks) == 1:
+            return self._complete(self._build_messages(text))
+
+        # Map: resumir los fragmentos en paralelo, conservando el orden
+        print(f"Resumiendo {len(chunks)} fragmentos en paralelo")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            notes = list(executor.map(
+                metrics.in_current_context(lambda args: self._complete(self._build_chunk_messages(*args))),
+                [(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, start=1)]))
+
+        # Reduce: si las notas siguen sin caber se vuelven a dividir
+        merged = self._merge_notes(notes)
+        if len(merged) >= len(text):
+            # Las notas no acortan el texto: evitar una recursión infinita
+            return self._complete(self._build_messages(merged))
+        return self._summarize(merged)
+
+    def generate_summary(self, text: str, use_cache: bool | None = None) -> str:
+        """
+        Genera un resumen estructurado del texto proporcionado.
+
+        Args:
+            text (str): Texto a analizar y resumir.
+            use_cache (bool, optional): Sobrescribe `self.use_cache` para esta llamada.
+
+        Returns:
+            str: Resumen estructurado que incluye tema principal, puntos clave y resumen para debate.
+        """
+        use_cache = self.use_cache if use_cache is None else use_cache
+        key = SummaryCache.make_key(text, self.model)
+        if use_cache:
+            cached = self.cache.get(key)
+            metrics.cache_result("summary", cached is not None)
+            if cached is not None:
+                print("Resumen obtenido de la caché")
+                return cached
+
+        summary = self._summarize(text)
+        if use_cache:
+            self.cache.put(key, summary, self.model)
+        return summary
+
+    async def _summarize_async(self, text: str) -> str:
+        """Versión asíncrona de `_summarize`."""
+        chunks = split_into_chunks(text, self.chunk_tokens, self.model)
+        if len(chunks) == 1:
+            return await self._complete_async(self._build_messages(text))
+
+        print(f"Resumiendo {len(chunks)} fragmentos en paralelo")
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def summarize_chunk(chunk: str, index: int) -> str:
+            async with semaphore:
+                return await self._complete_async(
+                    self._build_chunk_messages(chunk, index, len(chunks)))
+
+        notes = await asyncio.gather(
+            *(summarize_chunk(chunk, i) for i, chunk in enumerate(chunks, start=1)))
+        merged = self._merge_notes(list(notes))
+        if len(merged) >= len(text):
+            return await self._complete_async(self._build_messages(merged))
+        return await self._summarize_async(merged)
+
+    async def generate_summary_async(self, text: str, use_cache: bool | None = None) -> str:
+        """
+        Versión asíncrona de `generate_summary` basada en `AsyncOpenAI`.
+
+        Args:
+            text (str): Texto a analizar y resumir.
+            use_cache (bool, optional): Sobrescribe `self.use_cache` para esta llamada.
+
+        Returns:
+            str: Resumen estructurado que incluye tema principal, puntos clave y resumen para debate.
+        """
+        use_cache = self.use_cache if use_cache is None else use_cache
+        key = SummaryCache.make_key(text, self.model)
+        if use_cache:
+            cached = self.cache.get(key)
+            metrics.cache_result("summary", cached is not None)
+            if cached is not None:
+                print("Resumen obtenido de la caché")
+                return cached
+
+        summary = await self._summarize_async(text)
+        if use_cache:
+            self.cache.put(key, summary, self.model)
+        return summary
 
 
 # Para propósitos de desarrollo
@@ -1,19 +1,40 @@
+import asyncio
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Literal, Union
-from openai import OpenAI
-from pydub import AudioSegment  # type: ignore
+from openai import RateLimitError
+from audio.podcast_assembler import PodcastAssembler
+from core.checkpoint import RunCheckpoint, digest_text
 from core.characters.anfitrion import Anfitrion
 from core.characters.participante1 import Participante1
-from utils.constants import VOICE_MODEL, PAUSE_DURATION
+from utils import metrics
+from utils.clip_cache import ClipCache
+from utils.openai_client import OpenAIClientFactory
+from utils.constants import (
+    VOICE_MODEL,
+    PAUSE_DURATION,
+    TTS_MAX_WORKERS,
+    TTS_MAX_RETRIES,
+    TTS_RETRY_BACKOFF
+)
 
 
 class VoiceGenerator:
-    def __init__(self, api_key: str, model: str = VOICE_MODEL, podcast_number: str = "1"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = VOICE_MODEL, podcast_number: str = "1",
+                 max_workers: int = TTS_MAX_WORKERS, clip_cache: ClipCache | None = None):
+        self.client = OpenAIClientFactory.get_client(api_key, "voice")
+        self.async_client = OpenAIClientFactory.get_async_client(api_key, "voice")
+        self.clip_cache = clip_cache if clip_cache is not None else ClipCache()
         self.model = model
         self.pause_duration = PAUSE_DURATION
+        self.assembler = PodcastAssembler(pause_duration=self.pause_duration)
         self.tittle = podcast_number
+        self.max_workers = max(1, max_workers)
+        self.max_retries = TTS_MAX_RETRIES
+        self.retry_backoff = TTS_RETRY_BACKOFF
+        self.checkpoint: RunCheckpoint | None = None
 
         # Initialize character instances with type hints
         self.characters: Dict[str, Union[Anfitrion, Participante1]] = {
@@ -27,51 +48,168 @@ class VoiceGenerator:
         print(f"Updated voice model to: {new_model}")
 
     def _get_voice_for_character(self, character_name: str) -> Literal['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']:
-        """Get the character's configured voice"""
+        """Get the character's configured voice, by role key or by the name used in the script"""
         if character_name in self.characters:
             return self.characters[character_name].voice
+        for character in self.characters.values():
+            if character.name == character_name:
+                return character.voice
         return 'alloy'  # default voice
 
+    def update_concurrency(self, max_workers: int) -> None:
+        """Updates how many dialogue lines are synthesized in parallel"""
+        self.max_workers = max(1, max_workers)
+        print(f"Updated TTS concurrency to: {self.max_workers}")
+
+    def _create_speech(self, text: str, voice_model: Literal['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']):
+        """Call the TTS API, retrying with exponential backoff when rate-limited"""
+        with metrics.timer("voice", "tts", bytes_out=len(text.encode("utf-8"))) as values:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.client.audio.speech.create(
+                        model=self.model,
+                        voice=voice_model,
+                        input=text
+                    )
+                    return response
+                except RateLimitError:
+                    if attempt == self.max_retries:
+                        raise
+                    values["retries"] = attempt + 1
+                    delay = self.retry_backoff * (2 ** attempt)
+                    print(f"Rate limit reached, retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+
+    async def _create_speech_async(self, text: str, voice_model: Literal['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']):
+        """Async variant of _create_speech built on AsyncOpenAI"""
+        with metrics.timer("voice", "tts", bytes_out=len(text.encode("utf-8"))) as values:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self.async_client.audio.speech.create(
+                        model=self.model,
+                        voice=voice_model,
+                        input=text
+                    )
+                    return response
+                except RateLimitError:
+                    if attempt == self.max_retries:
+                        raise
+                    values["retries"] = attempt + 1
+                    delay = self.retry_backoff * (2 ** attempt)
+                    print(f"Rate limit reached, retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+
+    def _load_clip(self, filename: str, cache_key: str) -> bool:
+        """True if the run checkpoint already holds a valid clip for this line"""
+        return self.checkpoint is not None and self.checkpoint.get(f"tts/{filename}", cache_key) is not None
+
+    def _save_clip(self, filename: str, output_path: Path, cache_key: str) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.record(f"tts/{filename}", output_path, cache_key)
+
+    def _reuse_clip(self, filename: str, output_path: Path, cache_key: str) -> bool:
+        """True if the clip was restored from the run checkpoint or the clip cache (blocking file I/O)"""
+        if self._load_clip(filename, cache_key):
+            return True
+        cached = self.clip_cache.fetch(cache_key, output_path)
+        metrics.cache_result("voice", cached)
+        if cached:
+            self._save_clip(filename, output_path, cache_key)
+        return cached
+
+    def _store_clip(self, response, filename: str, output_path: Path, cache_key: str) -> None:
+        """Write a synthesized clip and record it in the clip cache and the checkpoint (blocking file I/O)"""
+        response.write_to_file(str(output_path))
+        # The audio size is only known once the clip is on disk
+        metrics.observe("voice", "tts", bytes_in=metrics.file_size(output_path))
+        self.clip_cache.put(cache_key, output_path)
+        self._save_clip(filename, output_path, cache_key)
+
     def generate_speech(self, text: str, voice_model: Literal['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'], filename: str) -> str:
         """Generate speech from text using OpenAI's TTS API"""
         try:
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=voice_model,
-                input=text
-            )
+            output_path = self.output_dir / filename
+
+            # Reuse the clip if this exact line was already synthesized
+            cache_key = ClipCache.make_key(self.model, voice_model, text)
+            if self._reuse_clip(filename, output_path, cache_key):
+                return str(output_path)
+
+            response = self._create_speech(text, voice_model)
+            self._store_clip(response, filename, output_path, cache_key)
+            return str(output_path)
 
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return ""
+
+    async def generate_speech_async(self, text: str, voice_model: Literal['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'], filename: str) -> str:
+        """Async variant of generate_speech built on AsyncOpenAI"""
+        try:
             output_path = self.output_dir / filename
-            response.write_to_file(str(output_path))
+
+            # File copies and checkpoint hashing run in a thread: the event loop
+            # is shared by every UI session
+            cache_key = ClipCache.make_key(self.model, voice_model, text)
+            if await asyncio.to_thread(self._reuse_clip, filename, output_path, cache_key):
+                return str(output_path)
+
+            response = await self._create_speech_async(text, voice_model)
+            await asyncio.to_thread(self._store_clip, response, filename, output_path, cache_key)
             return str(output_path)
 
         except Exception as e:
             print(f"Error generating speech: {e}")
             return ""
 
+    def synthesize_entry(self, index: int, entry: Dict[str, str]) -> Dict[str, str] | None:
+        """Generate the audio file for a single dialogue entry"""
+        character = entry["character"]
+        message = entry["message"]
+
+        # Select voice based on character
+        voice = self._get_voice_for_character(character)
+
+        # Generate audio file
+        filename = f"{index+1}_{character}.mp3"
+        audio_path = self.generate_speech(message, voice, filename)
+
+        if not audio_path:
+            return None
+        return {
+            "character": character,
+            "audio_path": audio_path,
+            "message": message
+        }
+
+    async def synthesize_entry_async(self, index: int, entry: Dict[str, str]) -> Dict[str, str] | None:
+        """Async variant of synthesize_entry"""
+        character = entry["character"]
+        message = entry["message"]
+        voice = self._get_voice_for_character(character)
+
+        filename = f"{index+1}_{character}.mp3"
+        audio_path = await self.generate_speech_async(message, voice, filename)
+
+        if not audio_path:
+            return None
+        return {
+            "character": character,
+            "audio_path": audio_path,
+            "message": message
+        }
+
     def process_script(self, script_json: str) -> List[Dict[str, str]]:
         """Process the script and generate audio files for each dialogue"""
         try:
             script_data = json.loads(script_json)
-            audio_files = []
-
-            for i, entry in enumerate(script_data["dialogue"]):
-                character = entry["character"]
-                message = entry["message"]
-
-                # Select voice based on character
-                voice = self._get_voice_for_character(character)
+            dialogue = script_data["dialogue"]
 
-                # Generate audio file
-                filename = f"{i+1}_{character}.mp3"
-                audio_path = self.generate_speech(message, voice, filename)
-
-                if audio_path:
-                    audio_files.append({
-                        "character": character,
-                        "audio_path": audio_path,
-                        "message": message
-                    })
+            # Synthesize the lines in parallel; map() keeps the script order
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = executor.map(
+                    metrics.in_current_context(self.synthesize_entry), range(len(dialogue)), dialogue)
+                audio_files = [result for result in results if result]
 
             return audio_files
 
@@ -79,53 +217,105 @@ class VoiceGenerator:
             print(f"Error processing script: {e}")
             return []
 
-    def concatenate_audio_files(self, audio_files: List[Dict[str, str]]) -> str:
-        """Concatenate all audio files with natural pauses between them"""
+    async def process_script_async(self, script_json: str) -> List[Dict[str, str]]:
+        """Async variant of process_script, bounded by max_workers concurrent requests"""
         try:
-            # Create a blank audio segment
-            final_audio = AudioSegment.silent(
-                duration=500)  # Start with 0.5s silence
-
-            # Add each audio file with a pause between them
-            for audio_file in audio_files:
-                # Load the audio file
-                current_audio = AudioSegment.from_mp3(audio_file['audio_path'])
+            script_data = json.loads(script_json)
+            semaphore = asyncio.Semaphore(self.max_workers)
 
-                # Add the current audio to the final audio
-                final_audio += current_audio
+            async def bounded(index: int, entry: Dict[str, str]) -> Dict[str, str] | None:
+                async with semaphore:
+                    return await self.synthesize_entry_async(index, entry)
 
-                # Add a pause after the dialogue
-                final_audio += AudioSegment.silent(
-                    duration=self.pause_duration)
+            # gather() returns results in script order
+            results = await asyncio.gather(
+                *(bounded(i, entry) for i, entry in enumerate(script_data["dialogue"])))
+            return [result for result in results if result]
 
-            # Save the final concatenated audio
-            output_path = self.output_dir / "podcast_final.mp3"
-            final_audio.export(str(output_path))
+        except Exception as e:
+            print(f"Error processing script: {e}")
+            return []
 
-            return str(output_path)
+    def concatenate_audio_files(self, audio_files: List[Dict[str, str]]) -> str:
+        """Concatenate all audio files with natural pauses between them"""
+        try:
+            output_path = self.output_dir / f"podcast_final{self.assembler.extension}"
+            clip_paths = [audio_file['audio_path'] for audio_file in audio_files]
+
+            # The mix is only reused if it was built from these exact clips
+            source = ""
+            if self.checkpoint is not None:
+                source = digest_text(self.assembler.settings(), *(
+                    RunCheckpoint.file_digest(path) for path in clip_paths))
+                if self.checkpoint.get("mix", source) is not None:
+                    return str(output_path)
+
+            # Stream every clip and pause straight into a single encoder pass
+            with metrics.timer("mix", "assemble") as values:
+                final_path = self.assembler.assemble(clip_paths, output_path)
+                values["bytes_out"] = metrics.file_size(final_path)
+            if self.checkpoint is not None:
+                self.checkpoint.record("mix", final_path, source)
+            return final_path
 
         except Exception as e:
             print(f"Error concatenating audio files: {e}")
             return ""
 
-    def generate_podcast(self, script_json: str) -> Path | str:
-        """Generate individual audio files and concatenate them into a single podcast"""
-        # Set the output directory based on the title
-        self.output_dir = Path("assets/podcast") / self.tittle
+    def prepare_output_dir(self) -> Path:
+        """Create the output directory for the current podcast title, or inside the run checkpoint"""
+        if self.checkpoint is not None:
+            self.output_dir = self.checkpoint.run_dir / "audio"
+        else:
+            self.output_dir = Path("assets/podcast") / self.tittle
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir
 
-        # Generate individual audio files
-        audio_files = self.process_script(script_json)
+    def generate_podcast(self, script_json: str, checkpoint: RunCheckpoint | None = None) -> Path | str:
+        """
+        Generate individual audio files and concatenate them into a single podcast.
 
-        if not audio_files:
-            return ""
+        With a checkpoint, clips and the final mix are written to the run directory
+        and the ones still valid from a previous attempt are not generated again.
+        """
+        self.checkpoint = checkpoint
+        try:
+            # Set the output directory based on the title
+            self.prepare_output_dir()
+
+            # Generate individual audio files
+            audio_files = self.process_script(script_json)
+            cache_stats = self.clip_cache.stats()
+            print(f"TTS cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+            if not audio_files:
+                return ""
 
-        # Concatenate all audio files
-        final_podcast: Path = Path(self.concatenate_audio_files(audio_files))
+            # Concatenate all audio files
+            final_podcast: Path = Path(self.concatenate_audio_files(audio_files))
+        finally:
+            self.checkpoint = None
 
         # Return the path relative to the project root
         return final_podcast
 
+    async def generate_podcast_async(self, script_json: str, checkpoint: RunCheckpoint | None = None) -> Path | str:
+        """Async variant of generate_podcast; the final mix runs in a worker thread"""
+        self.checkpoint = checkpoint
+        try:
+            self.prepare_output_dir()
+
+            audio_files = await self.process_script_async(script_json)
+            cache_stats = self.clip_cache.stats()
+            print(f"TTS cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+            if not audio_files:
+                return ""
+
+            return Path(await asyncio.to_thread(self.concatenate_audio_files, audio_files))
+        finally:
+            self.checkpoint = None
+
 
 if __name__ == "__main__":
     # Example usage
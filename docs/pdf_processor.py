@@ -1,25 +1,203 @@
 # docs/pdf_processor.py
+import hashlib
+import json
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
 from pypdf import PdfReader # type: ignore
+from utils import metrics
+from utils.constants import PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK, PDF_MAX_WORKERS
+
+# Índice de la caché de transcripciones: digest del PDF -> transcripción
+INDEX_FILENAME = "index.json"
+
+# Tamaño de lectura al calcular el digest del PDF
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# fork no es seguro en un proceso con hilos (Gradio, cola de trabajos, métricas):
+# los procesos del pool parten de un servidor limpio o de un intérprete nuevo
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _extract_page_range(pdf_file: str, start: int, end: int) -> list[str]:
+    """Extrae el texto de las páginas [start, end) en un proceso del pool."""
+    reader = PdfReader(pdf_file)
+    return [reader.pages[i].extract_text() for i in range(start, end)]
 
 
 class PDFProcessor:
     """
     Clase para procesar archivos PDF y extraer su contenido textual.
 
+    El directorio de salida funciona como caché: cada transcripción se indexa
+    por el SHA-256 del contenido del PDF en `index.json`, de modo que volver a
+    subir el mismo documento no lo vuelve a analizar, y dos PDFs distintos con
+    el mismo nombre no comparten entrada.
+
     Attributes:
         output_path (str): Ruta donde se guardarán los archivos de transcripción.
+        parallel_min_pages (int): A partir de este número de páginas se usa un pool de procesos.
+        pages_per_task (int): Páginas que extrae cada tarea del pool.
+        max_workers (int | None): Tamaño del pool (None usa os.cpu_count()).
     """
 
-    def __init__(self):
+    def __init__(self, output_path: str = "assets/docs/transcript/pdf/"):
         """Inicializa el procesador PDF y crea el directorio de salida si no existe."""
-        self.output_path = "assets/docs/transcript/pdf/"
+        self.output_path = str(output_path)
+        self.parallel_min_pages = PDF_PARALLEL_MIN_PAGES
+        self.pages_per_task = PDF_PAGES_PER_TASK
+        self.max_workers = PDF_MAX_WORKERS
+        self._index_lock = threading.Lock()
         os.makedirs(self.output_path, exist_ok=True)
 
+    def iter_pages(self, pdf_file: str) -> Iterator[str]:
+        """
+        Devuelve un iterador con el texto de cada página, en orden, a medida que se extrae.
+
+        Los documentos grandes se reparten en bloques de páginas entre un pool
+        de procesos; los pequeños se procesan en el propio proceso.
+
+        Args:
+            pdf_file (str): Ruta del archivo PDF a procesar.
+
+        Returns:
+            Iterator[str]: Texto de cada página.
+
+        Raises:
+            FileNotFoundError: Si el archivo PDF no existe (se lanza al llamar, no al iterar).
+        """
+        reader = PdfReader(pdf_file)
+        return self._generate_pages(pdf_file, reader)
+
+    def _generate_pages(self, pdf_file: str, reader: PdfReader) -> Iterator[str]:
+        num_pages = len(reader.pages)
+
+        if num_pages < self.parallel_min_pages:
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+
+        ranges = [(start, min(start + self.pages_per_task, num_pages))
+                  for start in range(0, num_pages, self.pages_per_task)]
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 mp_context=multiprocessing.get_context(POOL_START_METHOD)) as executor:
+            # map() entrega los bloques en orden aunque terminen desordenados
+            for pages in executor.map(_extract_page_range,
+                                      [pdf_file] * len(ranges),
+                                      [start for start, _ in ranges],
+                                      [end for _, end in ranges]):
+                yield from pages
+
+    @staticmethod
+    def file_digest(pdf_file: str) -> str:
+        """Devuelve el SHA-256 del contenido del PDF"""
+        digest = hashlib.sha256()
+        with open(pdf_file, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _output_file(self, pdf_file: str, digest: str) -> str:
+        # Nombre original + prefijo del digest: dos PDFs con el mismo nombre no se pisan
+        base_name = os.path.splitext(os.path.basename(pdf_file))[0]
+        output_filename = f"{base_name}_{digest[:12]}_transcripcion.txt"
+        return os.path.join(self.output_path, output_filename)
+
+    def _index_file(self) -> str:
+        return os.path.join(self.output_path, INDEX_FILENAME)
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(self._index_file(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _record(self, digest: str, pdf_file: str, output_file: str) -> None:
+        """Registra una transcripción completa en el índice (escritura atómica)"""
+        with self._index_lock:
+            index = self._load_index()
+            index[digest] = {
+                "source": os.path.basename(pdf_file),
+                "transcript": os.path.basename(output_file),
+                "size": os.path.getsize(output_file)
+            }
+            tmp_file = f"{self._index_file()}.{threading.get_ident()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self._index_file())
+
+    def get_cached(self, digest: str) -> tuple[str, str] | None:
+        """
+        Busca una transcripción en la caché.
+
+        Una entrada solo es válida si el archivo existe y conserva el tamaño
+        registrado; en otro caso se considera obsoleta.
+
+        Args:
+            digest (str): SHA-256 del PDF.
+
+        Returns:
+            tuple | None: (ruta de la transcripción, texto) o None si no hay entrada válida.
+        """
+        entry = self._load_index().get(digest)
+        if entry is None:
+            return None
+
+        output_file = os.path.join(self.output_path, entry["transcript"])
+        try:
+            if os.path.getsize(output_file) != entry["size"]:
+                return None
+            with open(output_file, "r", encoding="utf-8") as f:
+                return output_file, f.read()
+        except FileNotFoundError:
+            return None
+
+    def stream_text(self, pdf_file: str, digest: str | None = None) -> Iterator[str]:
+        """
+        Extrae el PDF página a página escribiendo la transcripción de forma incremental.
+
+        El archivo de salida se escribe a medida que llegan las páginas, sin
+        acumular el documento en memoria, en un temporal que solo sustituye al
+        definitivo (y se registra en el índice de la caché) cuando se ha
+        extraído completo: nadie lee una transcripción a medias.
+
+        Args:
+            pdf_file (str): Ruta del archivo PDF a procesar.
+            digest (str, optional): SHA-256 del PDF si ya se ha calculado.
+
+        Yields:
+            str: Texto de cada página, terminado en salto de línea.
+        """
+        # Abrir el PDF antes de crear el archivo de salida
+        pages = self.iter_pages(pdf_file)
+        digest = digest or self.file_digest(pdf_file)
+        output_file = self._output_file(pdf_file, digest)
+        # Temporal propio: dos extracciones del mismo PDF a la vez no escriben el mismo archivo
+        tmp_file = f"{output_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for page_text in pages:
+                    page_text += "\n"
+                    f.write(page_text)
+                    yield page_text
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            # También si se abandona el generador antes de terminar
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+        self._record(digest, pdf_file, output_file)
+
     def extract_text(self, pdf_file: str) -> str:
         """
         Extrae texto de un archivo PDF y lo guarda en un archivo de texto.
 
+        Si el mismo contenido ya se había transcrito, se devuelve la
+        transcripción cacheada sin volver a analizar el PDF.
+
         Args:
             pdf_file (str): Ruta del archivo PDF a procesar.
 
@@ -30,19 +208,18 @@ class PDFProcessor:
             FileNotFoundError: Si el archivo PDF no existe.
             PermissionError: Si no hay permisos para escribir el archivo de salida.
         """
-        reader = PdfReader(pdf_file)
-        transcript_text = ""
-
-        for page in reader.pages:
-            transcript_text += page.extract_text() + "\n"
-
-        # Obtener nombre del archivo original sin extensión y añadir _transcripcion
-        base_name = os.path.splitext(os.path.basename(pdf_file))[0]
-        output_filename = f"{base_name}_transcripcion.txt"
-        output_file = os.path.join(self.output_path, output_filename)
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(transcript_text)
+        digest = self.file_digest(pdf_file)
+        cached = self.get_cached(digest)
+        metrics.cache_result("extract", cached is not None)
+        if cached is not None:
+            output_file, transcript_text = cached
+            print(f"Transcripción en caché: {output_file}")
+        else:
+            with metrics.timer("extract", "pdf", bytes_out=metrics.file_size(pdf_file)) as values:
+                # join() en lugar de += evita copiar el texto acumulado en cada página
+                transcript_text = "".join(self.stream_text(pdf_file, digest))
+                values["bytes_in"] = len(transcript_text.encode("utf-8"))
+            output_file = self._output_file(pdf_file, digest)
 
         return f"Transcripción guardada en: {output_file} \n\nContenido de la transcripción:\n{transcript_text}"
 
@@ -1,26 +1,54 @@
+import asyncio
+import copy
 import json
+import shutil
+import time
+import uuid
 import gradio as gr  # type: ignore
+from pathlib import Path
 from audio.video_processor import VideoProcessor
-from core.summary import SummaryGenerator
+from core.checkpoint import RunCheckpoint, digest_text
+from core.jobs import JobQueue, JobStore
+from core.pipeline import PodcastPipeline
+from core.summary import SummaryCache, SummaryGenerator
 from core.script import ScriptGenerator
 from core.voice import VoiceGenerator
 from docs.pdf_processor import PDFProcessor
-from utils.gen_podcast_name import Extra
+from utils.constants import (JOBS_DB_PATH, JOBS_INPUT_DIR, RUNS_DIR, EPISODE_COUNTER_PATH, SUMMARY_CACHE_DIR,
+                             CLIP_CACHE_DIR, TRANSCRIPT_STORE_DIR, DEFAULT_NUM_EXCHANGES, SUMMARY_PROMPT_VERSION,
+                             SCRIPT_STREAM_UPDATE_INTERVAL, METRICS_PORT, UI_CONCURRENCY_LIMIT, TRANSCRIPT_MODEL)
+from utils import metrics
+from utils.clip_cache import ClipCache
+from utils.gen_podcast_name import EpisodeAllocator
+from utils.transcript_store import TranscriptStore
 from utils.url_processor import URLProcessor
 from utils.env_loader import load_environment_variables, OPENAI_API_KEY
 from ui.podia_ui import PodIAUI
 
 
 class PodIA:
-    def __init__(self):
-        self.summary_generator = SummaryGenerator(OPENAI_API_KEY)
-        self.podcast_number = Extra.enumarate_podcast_name()
-        self.pdf_processor = PDFProcessor()
-        self.video_processor = VideoProcessor(OPENAI_API_KEY)
-        self.url_processor = URLProcessor(OPENAI_API_KEY)
-        self.script_generator = ScriptGenerator(OPENAI_API_KEY)
-        self.voice_generator = VoiceGenerator(
-            OPENAI_API_KEY, podcast_number=self.podcast_number)
+    def __init__(self, job_store: JobStore | None = None, api_key: str | None = None,
+                 data_dir: str | Path | None = None):
+        """
+        Args:
+            job_store (JobStore, optional): Almacén de la cola de trabajos.
+            api_key (str, optional): Clave de OpenAI (por defecto la cargada del entorno).
+            data_dir (str | Path, optional): Directorio bajo el que se guardan assets/ y temp/
+                (por defecto el directorio actual).
+        """
+        self.api_key = api_key if api_key is not None else OPENAI_API_KEY
+        self.data_dir = Path(data_dir) if data_dir is not None else Path()
+        self.summary_generator = SummaryGenerator(
+            self.api_key, cache=SummaryCache(self.data_dir / SUMMARY_CACHE_DIR))
+        self.episodes = EpisodeAllocator(self.data_dir / RUNS_DIR, self.data_dir / EPISODE_COUNTER_PATH)
+        self.pdf_processor = PDFProcessor(str(self.data_dir / "assets/docs/transcript/pdf"))
+        self.video_processor = self._new_video_processor()
+        self.url_processor = URLProcessor(
+            self.api_key, transcript_store=TranscriptStore(self.data_dir / TRANSCRIPT_STORE_DIR),
+            download_path=self.data_dir / "temp", video_processor=self._new_video_processor("whisper-1"))
+        self.script_generator = ScriptGenerator(self.api_key)
+        self.voice_generator = VoiceGenerator(self.api_key, clip_cache=ClipCache(self.data_dir / CLIP_CACHE_DIR))
+        self.job_queue = JobQueue(job_store, self._job_stages(), store_path=self.data_dir / JOBS_DB_PATH)
         self.ui = PodIAUI(self)
 
     def update_models_config(self, transcript_model, summary_model, script_model, voice_model):
@@ -48,6 +76,12 @@ class PodIA:
             self.script_generator.participante.set_gender(guest_gender)
             self.script_generator.participante.set_voice(guest_voice)
 
+            # La voz sintetizada sigue a los mismos personajes que el guion
+            self.voice_generator.characters = {
+                "Anfitrion": self.script_generator.anfitrion,
+                "Participante": self.script_generator.participante
+            }
+
             return "✅ Configuración de voces actualizada exitosamente"
         except Exception as e:
             return f"❌ Error actualizando la configuración de voces: {str(e)}"
@@ -78,7 +112,37 @@ class PodIA:
                 return extracted_text, "Error al generar resumen", {}
 
             # Crear guión (ahora ya viene como JSON válido)
-            script = self.script_generator.generate_script(summary)
+            script = self._new_script_generator().generate_script(summary)
+
+            return extracted_text, summary, script
+        except Exception as e:
+            return f"Error en el procesamiento: {str(e)}", "", {}
+
+    async def process_input_async(self, input_type, content, progress=gr.Progress()):
+        """Async variant of process_input; blocking parsers run in a worker thread"""
+        progress(0.2, "Procesando entrada...")
+
+        if input_type == "PDF":
+            return await asyncio.to_thread(self.pdf_processor.process_pdf, content)
+        elif input_type == "URL":
+            return await asyncio.to_thread(self.url_processor.process_youtube_url, content, progress)
+        elif input_type == "Video/Audio":
+            return await self.video_processor.process_media_async(content)
+
+        return "Por favor, seleccione un tipo de entrada válido y proporcione el contenido."
+
+    async def process_content_async(self, input_type, content):
+        """Async variant of process_content"""
+        try:
+            extracted_text = await self.process_input_async(input_type, content)
+            if not extracted_text:
+                return "Error al extraer texto", "", {}
+
+            summary = await self.summary_generator.generate_summary_async(extracted_text)
+            if not summary:
+                return extracted_text, "Error al generar resumen", {}
+
+            script = await self._new_script_generator().generate_script_async(summary)
 
             return extracted_text, summary, script
         except Exception as e:
@@ -89,15 +153,54 @@ class PodIA:
             input_type, pdf_content, url_content, media_content)
         return self.process_input(input_type, content)
 
+    async def extract_text_async(self, input_type, pdf_content, url_content, media_content):
+        content = self._get_active_content(
+            input_type, pdf_content, url_content, media_content)
+        return await self.process_input_async(input_type, content)
+
     def generate_summary(self, text):
         if not text.strip():
             return "Por favor, primero extraiga el texto del contenido."
         return self.summary_generator.generate_summary(text)
 
+    async def generate_summary_async(self, text):
+        if not text.strip():
+            return "Por favor, primero extraiga el texto del contenido."
+        return await self.summary_generator.generate_summary_async(text)
+
     def generate_script(self, summary):
         if not summary.strip():
             return {}
-        return self.script_generator.generate_script(summary)
+        # Generador propio: dos guiones a la vez no comparten la memoria de la conversación
+        return self._new_script_generator().generate_script(summary)
+
+    async def generate_script_async(self, summary):
+        if not summary.strip():
+            return {}
+        return await self._new_script_generator().generate_script_async(summary)
+
+    def stream_script(self, summary, num_exchanges=DEFAULT_NUM_EXCHANGES):
+        """
+        Genera el guion devolviendo el guion parcial a medida que llegan los tokens.
+
+        Cada valor es el diccionario del guion con los turnos terminados y el
+        texto recibido del turno en curso; el último es el guion completo.
+        """
+        if not summary.strip():
+            yield {}
+            return
+        script_generator = self._new_script_generator()
+        current, partial, last_update = None, "", 0.0
+        for index, speaker, delta in script_generator.stream_script(summary, num_exchanges):
+            if index != current:
+                current, partial = index, ""
+            partial += delta
+            # Limitar la frecuencia: cada actualización vuelve a pintar todo el JSON
+            now = time.perf_counter()
+            if now - last_update >= SCRIPT_STREAM_UPDATE_INTERVAL:
+                last_update = now
+                yield script_generator.script_preview(speaker, partial)
+        yield script_generator.script_preview()
 
     def generate_podcast(self, script_json: dict) -> str | None:
         """Generate audio podcast from script"""
@@ -105,13 +208,274 @@ class PodIA:
             # Convert dict to JSON string if needed
             script_str = json.dumps(script_json) if isinstance(
                 script_json, dict) else script_json
-            # Generate the podcast audio file
-            audio_path = self.voice_generator.generate_podcast(script_str)
+            # Each podcast gets its own episode directory: nothing from another run is overwritten
+            run = self.episodes.allocate()
+            audio_path = self._new_voice_generator(run.title).generate_podcast(
+                script_str, checkpoint=RunCheckpoint(run.run_dir))
             return audio_path
         except Exception as e:
             print(f"Error generating podcast: {e}")
             return None
 
+    async def generate_podcast_async(self, script_json: dict) -> str | None:
+        """Async variant of generate_podcast"""
+        try:
+            script_str = json.dumps(script_json) if isinstance(
+                script_json, dict) else script_json
+            run = self.episodes.allocate()
+            return await self._new_voice_generator(run.title).generate_podcast_async(
+                script_str, checkpoint=RunCheckpoint(run.run_dir))
+        except Exception as e:
+            print(f"Error generating podcast: {e}")
+            return None
+
+    def generate_script_and_podcast(self, summary: str) -> tuple[str | dict, str | None]:
+        """Generate the script and synthesize each turn while the dialogue is still being written"""
+        if not summary.strip():
+            return {}, None
+        try:
+            run = self.episodes.allocate()
+            pipeline = PodcastPipeline(self._new_script_generator(), self._new_voice_generator(run.title))
+            script, audio_path = pipeline.run(summary, checkpoint=RunCheckpoint(run.run_dir))
+            return script, str(audio_path) if audio_path else None
+        except Exception as e:
+            print(f"Error generating script and podcast: {e}")
+            return {}, None
+
+    # * Sessions
+
+    def new_session(self) -> "PodIA":
+        """
+        Contexto propio para una sesión de la interfaz.
+
+        Devuelve una copia ligera de esta instancia con sus propios generadores:
+        la configuración de modelos y voces de un usuario no cambia la de los
+        demás. Cada podcast se escribe en su propio directorio de episodio. Los
+        procesadores de PDF y URL, la cola de trabajos, el pool HTTP de
+        `OpenAIClientFactory` y las cachés de resúmenes y clips se comparten.
+        """
+        session = copy.copy(self)
+        session.summary_generator = SummaryGenerator(
+            self.api_key, cache=self.summary_generator.cache, use_cache=self.summary_generator.use_cache)
+        session.summary_generator.model = self.summary_generator.model
+        session.video_processor = self._new_video_processor(self.video_processor.transcript_model)
+        session.script_generator = self._new_script_generator()
+        session.voice_generator = self._new_voice_generator(self.voice_generator.tittle)
+        session.voice_generator.characters = {
+            "Anfitrion": session.script_generator.anfitrion,
+            "Participante": session.script_generator.participante
+        }
+        return session
+
+    # * Checkpointed runs
+
+    def _new_video_processor(self, transcript_model: str = TRANSCRIPT_MODEL) -> VideoProcessor:
+        return VideoProcessor(self.api_key, transcript_model=transcript_model,
+                              transcript_path=self.data_dir / "assets/docs/transcript/video")
+
+    def _new_script_generator(self) -> ScriptGenerator:
+        """Generador propio por ejecución con la configuración actual: la conversación no se mezcla entre ejecuciones"""
+        script_generator = ScriptGenerator(self.api_key)
+        script_generator.model = self.script_generator.model
+        script_generator.anfitrion = copy.deepcopy(self.script_generator.anfitrion)
+        script_generator.participante = copy.deepcopy(self.script_generator.participante)
+        return script_generator
+
+    def _new_voice_generator(self, title: str) -> VoiceGenerator:
+        voice_generator = VoiceGenerator(
+            self.api_key,
+            model=self.voice_generator.model,
+            podcast_number=title,
+            clip_cache=self.voice_generator.clip_cache
+        )
+        voice_generator.characters = copy.deepcopy(self.voice_generator.characters)
+        return voice_generator
+
+    def _extract(self, input_type, content):
+        if input_type == "PDF":
+            text = self.pdf_processor.extract_text(str(getattr(content, "name", content)))
+        elif input_type == "Video/Audio":
+            # process_media devuelve (ruta de la transcripción, transcripción)
+            _, text = self.video_processor.process_media(str(getattr(content, "name", content)))
+        else:
+            # Sin petición de Gradio activa no hay barra de progreso que actualizar
+            text = self.process_input(input_type, content, progress=lambda *args, **kwargs: None)
+        # Los procesadores devuelven los errores como texto: no deben guardarse como resultado
+        if not text or text.startswith(("Error", "URL inválida")):
+            raise RuntimeError(text or "No se pudo extraer el texto")
+        return text
+
+    def extract_stage(self, input_type, content, checkpoint: RunCheckpoint) -> str:
+        """Extrae el texto de la entrada o lo reutiliza del checkpoint"""
+        path = Path(str(getattr(content, "name", content)))
+        # Los archivos se identifican por su contenido y las URLs por sí mismas
+        identity = RunCheckpoint.file_digest(path) if input_type != "URL" and path.is_file() else str(content)
+        source = digest_text(input_type, identity)
+
+        text = checkpoint.load_text("extract", source)
+        if text is None:
+            text = self._extract(input_type, content)
+            checkpoint.save_text("extract", text, "extract.txt", source)
+        return text
+
+    def summary_stage(self, text: str, checkpoint: RunCheckpoint) -> str:
+        """Genera el resumen o lo reutiliza del checkpoint"""
+        source = digest_text(self.summary_generator.model, SUMMARY_PROMPT_VERSION, text)
+        summary = checkpoint.load_text("summary", source)
+        if summary is None:
+            summary = self.summary_generator.generate_summary(text)
+            if not summary:
+                raise RuntimeError("No se pudo generar el resumen")
+            checkpoint.save_text("summary", summary, "summary.txt", source)
+        return summary
+
+    def run_episode(self, input_type, content, run_dir=None, num_exchanges=DEFAULT_NUM_EXCHANGES) -> dict:
+        """
+        Genera un episodio completo guardando cada etapa en un directorio de ejecución.
+
+        Si `run_dir` ya contiene un intento anterior, solo se repiten las etapas
+        (extracción, resumen, turnos del guion, clips de voz, mezcla) que falten
+        o cuyo resultado no sea válido.
+
+        Args:
+            input_type (str): "PDF", "URL" o "Video/Audio".
+            content: Ruta del archivo, archivo de Gradio o URL.
+            run_dir (str | Path, optional): Directorio de la ejecución (por defecto se reserva un episodio nuevo en RUNS_DIR).
+            num_exchanges (int): Número de intercambios del guion.
+
+        Returns:
+            dict: Directorio de la ejecución, texto, resumen, guion, ruta del podcast,
+                duración en segundos de cada etapa, tokens de prompt de cada turno y
+                métricas del episodio (también guardadas en `metrics.json`).
+        """
+        run_dir = Path(run_dir) if run_dir else self.episodes.allocate().run_dir
+        checkpoint = RunCheckpoint(run_dir)
+        timings = {}
+
+        # Las métricas del episodio se escriben en metrics.json aunque falle una etapa
+        with metrics.episode() as episode_metrics:
+            try:
+                start = time.perf_counter()
+                with metrics.timer("extract", "stage"):
+                    text = self.extract_stage(input_type, content, checkpoint)
+                timings["extract"] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with metrics.timer("summary", "stage"):
+                    summary = self.summary_stage(text, checkpoint)
+                timings["summary"] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                pipeline = PodcastPipeline(
+                    self._new_script_generator(), self._new_voice_generator(run_dir.name))
+                with metrics.timer("script_and_audio", "stage"):
+                    script, audio_path = pipeline.run(summary, num_exchanges, checkpoint=checkpoint)
+                checkpoint.path_for("script.json").write_text(script, encoding="utf-8")
+                timings["script_and_audio"] = time.perf_counter() - start
+                if not audio_path:
+                    raise RuntimeError("No se pudo generar el audio del podcast")
+            finally:
+                report = episode_metrics.snapshot()
+                checkpoint.path_for("metrics.json").write_text(
+                    json.dumps(report, indent=2), encoding="utf-8")
+
+        return {
+            "run_dir": str(run_dir),
+            "extract": text,
+            "summary": summary,
+            "script": script,
+            "podcast": str(audio_path),
+            "timings": timings,
+            "script_tokens": pipeline.script_generator.token_usage,
+            "metrics": report
+        }
+
+    # * Background jobs
+
+    def _job_stages(self):
+        return [
+            ("extract", self._job_extract),
+            ("summary", self._job_summary),
+            ("script", self._job_script),
+            ("podcast", self._job_podcast)
+        ]
+
+    def job_config(self) -> dict:
+        """Modelos y personajes de este contexto; se guardan con cada trabajo encolado"""
+        def character(character):
+            return {"name": character.name, "gender": character.gender, "voice": character.voice}
+        return {
+            "models": {
+                "transcript": self.video_processor.transcript_model,
+                "summary": self.summary_generator.model,
+                "script": self.script_generator.model,
+                "voice": self.voice_generator.model
+            },
+            "characters": {
+                "host": character(self.script_generator.anfitrion),
+                "guest": character(self.script_generator.participante)
+            }
+        }
+
+    def _job_context(self, job) -> "PodIA":
+        """Contexto con la configuración guardada en el trabajo, también al reanudarlo o reintentarlo"""
+        config = job.get("config") or {}
+        if not config:
+            # Trabajos encolados antes de guardar la configuración
+            return self
+        context = self.new_session()
+        models, host, guest = config["models"], config["characters"]["host"], config["characters"]["guest"]
+        context.update_models_config(models["transcript"], models["summary"], models["script"], models["voice"])
+        context.update_voice_config(host["name"], host["gender"], host["voice"],
+                                    guest["name"], guest["gender"], guest["voice"])
+        return context
+
+    def _job_checkpoint(self, job) -> RunCheckpoint:
+        # El checkpoint permite reanudar dentro de una etapa (turnos y clips ya hechos)
+        return RunCheckpoint(self.data_dir / RUNS_DIR / job["id"])
+
+    def _job_extract(self, job, results):
+        return self._job_context(job).extract_stage(job["input_type"], job["content"], self._job_checkpoint(job))
+
+    def _job_summary(self, job, results):
+        return self._job_context(job).summary_stage(results["extract"], self._job_checkpoint(job))
+
+    def _job_script(self, job, results):
+        return self._job_context(job)._new_script_generator().generate_script(
+            results["summary"], checkpoint=self._job_checkpoint(job))
+
+    def _job_podcast(self, job, results):
+        voice_generator = self._job_context(job)._new_voice_generator(f"Job -- {job['id']}")
+        audio_path = voice_generator.generate_podcast(
+            results["script"], checkpoint=self._job_checkpoint(job))
+        if not audio_path or not Path(audio_path).is_file():
+            raise RuntimeError("No se pudo generar el audio del podcast")
+        return str(audio_path)
+
+    def submit_job(self, input_type, pdf_content, url_content, media_content):
+        """Encola la generación completa de un episodio y devuelve el id del trabajo"""
+        content = self._get_active_content(
+            input_type, pdf_content, url_content, media_content)
+        if not content:
+            raise ValueError("Proporcione el contenido antes de encolar el trabajo")
+
+        if input_type != "URL":
+            # Copiar la subida: Gradio borra sus temporales y el trabajo debe poder reanudarse
+            source = Path(getattr(content, "name", content))
+            input_dir = self.data_dir / JOBS_INPUT_DIR
+            input_dir.mkdir(parents=True, exist_ok=True)
+            content = shutil.copy(source, input_dir / f"{uuid.uuid4().hex[:8]}_{source.name}")
+
+        return self.job_queue.submit(input_type, str(content), self.job_config())
+
+    def job_status(self, job_id):
+        """Devuelve el estado de un trabajo o None si no existe"""
+        return self.job_queue.status(job_id.strip())
+
+    def retry_job(self, job_id):
+        """Reanuda un trabajo fallido desde la última etapa completada"""
+        return self.job_queue.retry(job_id.strip())
+
     def _get_active_content(self, input_type, pdf_content, url_content, media_content):
         content_map = {
             "PDF": pdf_content,
@@ -121,8 +485,18 @@ class PodIA:
         return content_map.get(input_type)
 
     def launch(self):
+        # Reanudar los trabajos que quedaron pendientes en la última ejecución
+        self.job_queue.start()
+        if METRICS_PORT is not None:
+            try:
+                metrics.MetricsServer().start()
+            except OSError as e:
+                # Puerto ocupado (por ejemplo, otra instancia): la interfaz arranca sin /metrics
+                print(f"⚠️ No se pudo iniciar el servidor de métricas en el puerto {METRICS_PORT}: {e}")
         ui = PodIAUI(self)
         app = ui.create_ui()
+        # Cada sesión tiene su propio contexto: los eventos ya no necesitan ejecutarse de uno en uno
+        app.queue(default_concurrency_limit=UI_CONCURRENCY_LIMIT)
         app.launch(share=False, server_port=4022, show_api=False)
 
 
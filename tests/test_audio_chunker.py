@@ -0,0 +1,72 @@
+import pytest
+from pydub import AudioSegment  # type: ignore
+from pydub.generators import Sine  # type: ignore
+from audio.audio_chunker import AudioChunker, merge_transcripts
+
+
+def speech_with_pauses(pauses_at, length):
+    """Tone of `length` ms with 400 ms silences starting at each position."""
+    audio = Sine(440).to_audio_segment(duration=length).set_frame_rate(8000)
+    for start in pauses_at:
+        audio = audio[:start] + AudioSegment.silent(duration=400, frame_rate=8000) + audio[start + 400:]
+    return audio
+
+
+def test_plan_single_chunk_for_short_audio():
+    chunker = AudioChunker(chunk_ms=10_000, overlap_ms=500, silence_window_ms=3_000)
+    audio = speech_with_pauses([], 8_000)
+
+    assert chunker.plan(audio) == [(0, 8_000)]
+
+
+def test_plan_cuts_on_silence_with_overlap():
+    chunker = AudioChunker(chunk_ms=10_000, overlap_ms=500, silence_window_ms=3_000)
+    audio = speech_with_pauses([8_000, 17_500], 25_000)
+
+    bounds = chunker.plan(audio)
+
+    assert len(bounds) == 3
+    first_cut, second_cut = bounds[0][1], bounds[1][1]
+    assert 8_000 <= first_cut <= 8_400
+    assert 17_500 <= second_cut <= 17_900
+    # Each chunk after the first repeats the end of the previous one
+    assert bounds[1][0] == first_cut - 500
+    assert bounds[2] == (second_cut - 500, 25_000)
+
+
+def test_plan_always_advances_without_silence():
+    chunker = AudioChunker(chunk_ms=1_000, overlap_ms=200, silence_window_ms=5_000)
+    bounds = chunker.plan(speech_with_pauses([], 10_000))
+
+    cuts = [end for _, end in bounds]
+    assert cuts == sorted(cuts)
+    assert cuts[-1] == 10_000
+
+
+def test_merge_transcripts_removes_overlap():
+    texts = [
+        "Hoy hablamos de redes neuronales y de cómo aprenden.",
+        "Cómo aprenden, a partir de ejemplos etiquetados.",
+        "Ejemplos etiquetados. Fin."
+    ]
+
+    assert merge_transcripts(texts) == (
+        "Hoy hablamos de redes neuronales y de cómo aprenden. "
+        "a partir de ejemplos etiquetados. Fin.")
+
+
+def test_merge_transcripts_keeps_single_word_coincidences():
+    assert merge_transcripts(["Dijo que", "que no", ""]) == "Dijo que que no"
+
+
+def test_split_exports_mono_chunks(tmp_path, monkeypatch):
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    monkeypatch.setattr(AudioSegment, "converter", imageio_ffmpeg.get_ffmpeg_exe())
+    source = tmp_path / "lecture.wav"
+    speech_with_pauses([3_000], 6_000).set_channels(2).export(str(source), format="wav")
+
+    chunker = AudioChunker(chunk_ms=4_000, overlap_ms=500, silence_window_ms=2_000)
+    chunk_paths = chunker.split(str(source), tmp_path)
+
+    assert [p.rsplit("/", 1)[-1] for p in chunk_paths] == ["chunk_0000.mp3", "chunk_0001.mp3"]
+    assert all((tmp_path / p).stat().st_size > 0 for p in chunk_paths)
@@ -0,0 +1,93 @@
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock
+from batch import BatchRunner, infer_input_type, load_manifest
+
+
+def test_infer_input_type():
+    assert infer_input_type("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == "URL"
+    assert infer_input_type("docs/Paper.PDF") == "PDF"
+    assert infer_input_type("media/lecture.mp4") == "Video/Audio"
+
+
+def test_load_manifest_jsonl(tmp_path):
+    manifest = tmp_path / "episodes.jsonl"
+    manifest.write_text(
+        '{"source": "docs/paper.pdf"}\n'
+        '\n'
+        '{"id": "yt intro", "source": "https://youtu.be/dQw4w9WgXcQ", "num_exchanges": 3}\n',
+        encoding="utf-8")
+
+    episodes = load_manifest(manifest)
+
+    assert episodes == [
+        {"id": "001_paper", "source": "docs/paper.pdf", "type": "PDF", "num_exchanges": 1},
+        {"id": "yt_intro", "source": "https://youtu.be/dQw4w9WgXcQ", "type": "URL", "num_exchanges": 3},
+    ]
+
+
+def test_load_manifest_csv(tmp_path):
+    manifest = tmp_path / "episodes.csv"
+    manifest.write_text("source,type\nclase.m4a,audio\nnotas.txt,pdf\n", encoding="utf-8")
+
+    episodes = load_manifest(manifest)
+
+    assert [(e["source"], e["type"]) for e in episodes] == [
+        ("clase.m4a", "Video/Audio"), ("notas.txt", "PDF")]
+
+
+def test_load_manifest_rejects_invalid_rows(tmp_path):
+    manifest = tmp_path / "episodes.csv"
+    manifest.write_text("source,type\nclase.m4a,podcast\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="tipo desconocido"):
+        load_manifest(manifest)
+
+    manifest.write_text("source\n\n,\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="source"):
+        load_manifest(manifest)
+
+
+def test_load_manifest_rejects_duplicate_ids(tmp_path):
+    manifest = tmp_path / "episodes.csv"
+    manifest.write_text("id,source\nintro,a.pdf\nintro,b.pdf\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Fila 2: id duplicado"):
+        load_manifest(manifest)
+
+    # Distinct ids that collide once sanitized
+    manifest.write_text("id,source\na.b,a.pdf\na_b,b.pdf\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="id duplicado 'a_b'"):
+        load_manifest(manifest)
+
+
+def test_batch_runs_episodes_concurrently_and_writes_report(tmp_path):
+    both_started = threading.Barrier(2, timeout=5)
+    podia = MagicMock()
+
+    def run_episode(input_type, content, run_dir, num_exchanges):
+        both_started.wait()
+        if content == "bad.pdf":
+            raise RuntimeError("No se pudo extraer el texto")
+        return {"podcast": f"{run_dir}/audio/podcast_final.mp3", "timings": {"extract": 0.1}}
+
+    podia.run_episode.side_effect = run_episode
+    episodes = [
+        {"id": "001_good", "source": "good.pdf", "type": "PDF", "num_exchanges": 1},
+        {"id": "002_bad", "source": "bad.pdf", "type": "PDF", "num_exchanges": 2},
+    ]
+
+    report = BatchRunner(podia, tmp_path / "batch", concurrency=2).run(episodes)
+
+    assert (report["total"], report["succeeded"], report["failed"]) == (2, 1, 1)
+    good, bad = report["episodes"]
+    assert good["status"] == "ok"
+    assert good["run_dir"] == str(tmp_path / "batch" / "001_good")
+    assert good["timings"] == {"extract": 0.1}
+    assert bad["status"] == "failed"
+    assert bad["error"] == "No se pudo extraer el texto"
+    assert "seconds" in good and "seconds" in bad
+    podia.run_episode.assert_any_call(
+        "PDF", "bad.pdf", run_dir=str(tmp_path / "batch" / "002_bad"), num_exchanges=2)
+
+    saved = json.loads((tmp_path / "batch" / "report.json").read_text(encoding="utf-8"))
+    assert saved == report
@@ -0,0 +1,132 @@
+import os
+import shutil
+import pytest
+from openai import InternalServerError, OpenAI
+from pypdf import PdfReader
+from benchmark import (Benchmark, FakeOpenAIServer, compare, fake_text, percentile,
+                       silent_mp3, write_sample_pdf)
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAIServer(latency=0.0, jitter=0.0, seed=1)
+    server.start()
+    yield server
+    server.stop()
+
+
+def make_client(server, **kwargs):
+    return OpenAI(api_key="test", base_url=server.base_url, **kwargs)
+
+
+def test_fake_server_chat_completion(server):
+    client = make_client(server)
+    messages = [{"role": "user", "content": "Resume este texto"}]
+
+    first = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    second = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+
+    assert first.choices[0].message.content.startswith("Respuesta simulada")
+    assert first.choices[0].message.content != second.choices[0].message.content
+    assert first.usage.prompt_tokens == 3
+    assert server.requests == {"/v1/chat/completions": 2}
+
+
+def test_fake_server_streams_chat_with_usage(server):
+    stream = make_client(server).chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": "Hola"}],
+        stream=True, stream_options={"include_usage": True})
+
+    chunks = list(stream)
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+
+    assert text.startswith("Respuesta simulada 1.")
+    assert chunks[-1].usage.completion_tokens == len(text.split())
+
+
+def test_fake_server_speech_and_transcription(server, tmp_path):
+    client = make_client(server)
+
+    speech = client.audio.speech.create(model="tts-1", voice="alloy", input="una frase de prueba")
+    assert speech.content == silent_mp3(4)
+
+    audio = tmp_path / "clip.mp3"
+    audio.write_bytes(speech.content)
+    with open(audio, "rb") as f:
+        transcript = client.audio.transcriptions.create(model="whisper-1", file=f)
+    assert transcript.text
+
+
+def test_fake_server_injects_errors():
+    server = FakeOpenAIServer(latency=0.0, jitter=0.0, error_rate=1.0, seed=1)
+    server.start()
+    try:
+        with pytest.raises(InternalServerError):
+            make_client(server, max_retries=0).chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Hola"}])
+    finally:
+        server.stop()
+
+    assert server.errors == 1
+
+
+def test_sample_pdf_is_readable(tmp_path):
+    pages = [fake_text(page, 200) for page in range(2)]
+
+    reader = PdfReader(write_sample_pdf(tmp_path / "sample.pdf", pages))
+
+    assert len(reader.pages) == 2
+    assert reader.pages[1].extract_text().split() == pages[1].split()
+
+
+def test_percentile_interpolates():
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0], 50) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert percentile(list(range(101)), 95) == 95
+
+
+def test_compare_flags_regressions():
+    baseline = {"throughput_per_min": 10.0, "failed": 0,
+                "stages": {"summary": {"count": 5, "p95": 1.0, "peak_memory_mb": 10.0}}}
+    within = {"throughput_per_min": 9.0, "failed": 0,
+              "stages": {"summary": {"count": 5, "p95": 1.1, "peak_memory_mb": 11.0}}}
+    worse = {"throughput_per_min": 7.0, "failed": 1,
+             "stages": {"summary": {"count": 5, "p95": 1.5, "peak_memory_mb": 20.0}}}
+
+    assert compare(within, baseline, tolerance=0.2) == []
+    regressions = compare(worse, baseline, tolerance=0.2)
+    assert len(regressions) == 4
+    assert regressions[0].startswith("summary: p95")
+
+
+def test_benchmark_runs_full_pipeline(tmp_path, monkeypatch):
+    import podia as podia_module
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    base_url = os.environ.get("OPENAI_BASE_URL")
+    api_key = podia_module.OPENAI_API_KEY
+    server = FakeOpenAIServer(latency=0.0, jitter=0.0, seed=1)
+
+    report = Benchmark(server, tmp_path / "work", episodes=1, track_memory=True).run()
+
+    # No process-wide side effects: everything lands in the work directory
+    assert os.getcwd() == str(cwd)
+    assert list(cwd.iterdir()) == []
+    assert (tmp_path / "work" / "assets" / "runs" / "benchmark-001" / "metrics.json").is_file()
+    assert os.environ.get("OPENAI_BASE_URL") == base_url
+    assert podia_module.OPENAI_API_KEY == api_key
+    assert report["episodes"] == 1
+    assert report["stages"]["extract"]["count"] == report["stages"]["summary"]["count"] == 1
+    assert report["stages"]["summary"]["peak_memory_mb"] > 0
+    assert report["operations"]["summary/chat"]["calls"] == 1
+    assert report["operations"]["voice/tts"]["calls"] == 4
+    assert report["server"]["requests"]["/v1/audio/speech"] == 4
+    # La mezcla necesita ffmpeg y ffprobe
+    if shutil.which("ffmpeg") and shutil.which("ffprobe"):
+        assert report["succeeded"] == 1
+        assert report["stages"]["script_and_audio"]["count"] == 1
+    else:
+        assert report["failed"] == 1
+        assert report["errors"] == ["No se pudo generar el audio del podcast"]
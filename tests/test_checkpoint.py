@@ -0,0 +1,48 @@
+import json
+from core.checkpoint import RunCheckpoint, digest_text
+
+
+def test_save_and_load_text(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path / "run")
+    checkpoint.save_text("summary", "Resumen", "summary.txt", source="abc")
+
+    assert checkpoint.load_text("summary", source="abc") == "Resumen"
+    manifest = json.loads((tmp_path / "run" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["stages"]["summary"]["file"] == "summary.txt"
+
+
+def test_manifest_survives_restart(tmp_path):
+    RunCheckpoint(tmp_path).save_text("extract", "Texto", "extract.txt")
+
+    reloaded = RunCheckpoint(tmp_path)
+    assert reloaded.load_text("extract") == "Texto"
+    assert reloaded.completed_stages() == ["extract"]
+
+
+def test_changed_inputs_invalidate_stage(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path)
+    checkpoint.save_text("summary", "Resumen", "summary.txt", source=digest_text("texto v1"))
+
+    assert checkpoint.load_text("summary", source=digest_text("texto v2")) is None
+
+
+def test_modified_or_missing_file_is_invalid(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path)
+    path = checkpoint.save_text("a", "contenido", "a.txt")
+    checkpoint.save_text("b", "contenido", "b.txt")
+
+    path.write_text("truncado", encoding="utf-8")
+    (tmp_path / "b.txt").unlink()
+
+    assert checkpoint.get("a") is None
+    assert checkpoint.get("b") is None
+
+
+def test_record_existing_file(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path)
+    clip = checkpoint.path_for("audio/1_Anfitrion.mp3")
+    clip.write_bytes(b"mp3")
+
+    checkpoint.record("tts/1_Anfitrion.mp3", clip, source="key")
+
+    assert checkpoint.get("tts/1_Anfitrion.mp3", source="key") == tmp_path / "audio" / "1_Anfitrion.mp3"
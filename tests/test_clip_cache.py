@@ -0,0 +1,65 @@
+import os
+import pytest
+from utils.clip_cache import ClipCache
+
+
+@pytest.fixture
+def clip_cache(tmp_path):
+    return ClipCache(tmp_path / "cache", max_bytes=100)
+
+
+@pytest.fixture
+def clip_file(tmp_path):
+    def _create(name, size):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        return path
+    return _create
+
+
+def test_make_key_normalizes_text():
+    key = ClipCache.make_key("tts-1", "onyx", "Hola   mundo\n")
+    assert key == ClipCache.make_key("tts-1", "onyx", "Hola mundo")
+    assert key != ClipCache.make_key("tts-1", "nova", "Hola mundo")
+    assert key != ClipCache.make_key("tts-1-hd", "onyx", "Hola mundo")
+
+
+def test_get_counts_hits_and_misses(clip_cache, clip_file):
+    assert clip_cache.get("missing") is None
+    clip_cache.put("key", clip_file("clip.mp3", 10))
+
+    assert clip_cache.get("key") is not None
+    assert clip_cache.stats() == {
+        "hits": 1, "misses": 1, "entries": 1, "size_bytes": 10}
+
+
+def test_fetch_copies_clip(clip_cache, clip_file, tmp_path):
+    clip_cache.put("key", clip_file("clip.mp3", 10))
+    destination = tmp_path / "out.mp3"
+
+    assert clip_cache.fetch("key", destination)
+    assert destination.read_bytes() == b"x" * 10
+    assert not clip_cache.fetch("other", tmp_path / "other.mp3")
+
+
+def test_evicts_least_recently_used(tmp_path, clip_file):
+    clip_cache = ClipCache(tmp_path / "cache", max_bytes=130)
+    for i, name in enumerate(["a", "b", "c"]):
+        path = clip_cache.put(name, clip_file(f"{name}.mp3", 40))
+        os.utime(path, (1000 + i, 1000 + i))
+
+    # Reading "a" makes it the most recently used clip
+    clip_cache.get("a")
+    clip_cache.put("d", clip_file("d.mp3", 40))
+
+    assert clip_cache.get("a") is not None
+    assert clip_cache.get("b") is None
+    assert clip_cache.get("c") is not None
+    assert clip_cache.get("d") is not None
+    assert clip_cache.stats()["size_bytes"] <= 130
+
+
+def test_clear(clip_cache, clip_file):
+    clip_cache.put("key", clip_file("clip.mp3", 10))
+    clip_cache.clear()
+    assert clip_cache.stats()["entries"] == 0
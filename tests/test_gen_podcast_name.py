@@ -0,0 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.gen_podcast_name import EpisodeAllocator
+
+
+def make_allocator(tmp_path):
+    return EpisodeAllocator(tmp_path / "runs", tmp_path / "last_podcast_number.txt")
+
+
+def allocate_numbers(runs_dir, counter_path, count):
+    allocator = EpisodeAllocator(runs_dir, counter_path)
+    return [allocator.allocate().number for _ in range(count)]
+
+
+def test_allocate_continues_from_counter(tmp_path):
+    (tmp_path / "last_podcast_number.txt").write_text("17")
+    allocator = make_allocator(tmp_path)
+
+    run = allocator.allocate()
+
+    assert run.number == 18
+    assert run.run_id == "episode-0018"
+    assert run.title == "Podcast -- PodIA#18"
+    assert run.run_dir == tmp_path / "runs" / "episode-0018"
+    assert run.run_dir.is_dir()
+    assert (tmp_path / "last_podcast_number.txt").read_text() == "18"
+    assert allocator.allocate().number == 19
+
+
+def test_allocate_skips_directories_already_taken(tmp_path):
+    allocator = make_allocator(tmp_path)
+    # Otro proceso reservó el 1 y el 2 pero el contador quedó atrás
+    (tmp_path / "runs" / "episode-0001").mkdir(parents=True)
+    (tmp_path / "runs" / "episode-0002").mkdir()
+
+    assert allocator.allocate().number == 3
+
+
+def test_allocate_is_unique_across_threads(tmp_path):
+    allocator = make_allocator(tmp_path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        runs = list(executor.map(lambda _: allocator.allocate(), range(40)))
+
+    assert sorted(run.number for run in runs) == list(range(1, 41))
+
+
+def test_allocate_is_unique_across_processes(tmp_path):
+    runs_dir, counter_path = tmp_path / "runs", tmp_path / "last_podcast_number.txt"
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        batches = list(executor.map(allocate_numbers, [runs_dir] * 4, [counter_path] * 4, [10] * 4))
+
+    numbers = [number for batch in batches for number in batch]
+    assert len(set(numbers)) == 40
+    assert len(list(runs_dir.iterdir())) == 40
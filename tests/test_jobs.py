@@ -0,0 +1,148 @@
+import threading
+import pytest
+from core.jobs import JobQueue, JobStore, DONE, FAILED, QUEUED, RUNNING
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.db")
+
+
+def wait_for(queue, job_id, statuses=(DONE, FAILED), timeout=5):
+    import time
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_all_stages_in_order(store):
+    stages = [
+        ("extract", lambda job, results: f"text of {job['content']}"),
+        ("summary", lambda job, results: results["extract"].upper()),
+    ]
+    queue = JobQueue(store, stages, max_workers=2)
+
+    job_id = queue.submit("URL", "video")
+    job = wait_for(queue, job_id)
+    queue.shutdown()
+
+    assert job["status"] == DONE
+    assert job["stage"] == "summary"
+    assert job["results"] == {"extract": "text of video", "summary": "TEXT OF VIDEO"}
+
+
+def test_failed_job_records_error_and_retry_resumes(store):
+    calls = {"extract": 0, "summary": 0}
+    fail = {"summary": True}
+
+    def extract(job, results):
+        calls["extract"] += 1
+        return "text"
+
+    def summary(job, results):
+        calls["summary"] += 1
+        if fail["summary"]:
+            raise RuntimeError("API down")
+        return "summary"
+
+    queue = JobQueue(store, [("extract", extract), ("summary", summary)])
+    job_id = queue.submit("PDF", "doc.pdf")
+    job = wait_for(queue, job_id)
+    assert job["status"] == FAILED
+    assert job["error"] == "API down"
+    assert job["results"] == {"extract": "text"}
+
+    fail["summary"] = False
+    assert queue.retry(job_id)
+    job = wait_for(queue, job_id)
+    queue.shutdown()
+
+    assert job["status"] == DONE
+    # The completed stage is not repeated
+    assert calls == {"extract": 1, "summary": 2}
+
+
+def test_start_resumes_interrupted_jobs(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    store = JobStore(db_path)
+    job_id = store.create("URL", "video")
+    # Simulate a crash after the first stage
+    store.update(job_id, status=RUNNING)
+    store.save_stage(job_id, "extract", "text")
+
+    calls = []
+    stages = [
+        ("extract", lambda job, results: calls.append("extract")),
+        ("summary", lambda job, results: calls.append("summary") or "summary"),
+    ]
+    queue = JobQueue(JobStore(db_path), stages)
+
+    assert queue.start() == [job_id]
+    job = wait_for(queue, job_id)
+    queue.shutdown()
+
+    assert job["status"] == DONE
+    assert calls == ["summary"]
+
+
+def test_start_is_idempotent(store):
+    release = threading.Event()
+    queue = JobQueue(store, [("extract", lambda job, results: release.wait(5))])
+    job_id = queue.submit("URL", "video")
+
+    # A running job must not be submitted twice
+    assert queue.start() == []
+    release.set()
+    wait_for(queue, job_id)
+    queue.shutdown()
+
+
+def test_status_of_unknown_job(store):
+    queue = JobQueue(store, [])
+    assert queue.status("missing") is None
+    assert queue.retry("missing") is False
+
+
+def test_unfinished_lists_queued_and_running(store):
+    queued = store.create("URL", "a")
+    running = store.create("URL", "b")
+    done = store.create("URL", "c")
+    store.update(running, status=RUNNING)
+    store.update(done, status=DONE)
+
+    assert store.unfinished() == [queued, running]
+    assert store.get(queued)["status"] == QUEUED
+
+
+def test_stages_receive_the_submitted_config(store):
+    seen = []
+    queue = JobQueue(store, [("extract", lambda job, results: seen.append(job["config"]) or "text")])
+
+    job_id = queue.submit("URL", "video", {"models": {"summary": "gpt-4o"}})
+    wait_for(queue, job_id)
+    queue.shutdown()
+
+    assert seen == [{"models": {"summary": "gpt-4o"}}]
+    assert store.get(job_id)["config"] == {"models": {"summary": "gpt-4o"}}
+
+
+def test_store_adds_config_column_to_old_databases(tmp_path):
+    import sqlite3
+    db_path = tmp_path / "jobs.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, input_type TEXT NOT NULL, content TEXT NOT NULL, "
+        "status TEXT NOT NULL, stage TEXT, results TEXT NOT NULL DEFAULT '{}', error TEXT, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES ('old', 'URL', 'video', 'queued', NULL, '{}', NULL, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_path)
+
+    assert store.get("old")["config"] == {}
+    assert store.get(store.create("URL", "video", {"a": 1}))["config"] == {"a": 1}
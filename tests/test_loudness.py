@@ -0,0 +1,49 @@
+import math
+import numpy as np
+import pytest
+from audio.loudness import integrated_loudness, pcm_samples
+
+
+def sine(frame_rate, amplitude=1.0, seconds=2.0, frequency=997.0):
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    return (amplitude * np.sin(2 * math.pi * frequency * t)).reshape(-1, 1)
+
+
+@pytest.mark.parametrize("frame_rate", [24000, 44100, 48000])
+def test_full_scale_sine_reads_minus_three_lufs(frame_rate):
+    # BS.1770 reference: a 997 Hz full-scale sine on one channel is -3.01 LUFS
+    assert integrated_loudness(sine(frame_rate), frame_rate) == pytest.approx(-3.01, abs=0.1)
+
+
+def test_loudness_follows_gain():
+    assert integrated_loudness(sine(24000, amplitude=0.1), 24000) == pytest.approx(-23.01, abs=0.1)
+
+
+def test_stereo_adds_channel_power():
+    mono = sine(24000, amplitude=0.1)
+    stereo = np.hstack([mono, mono])
+    assert integrated_loudness(stereo, 24000) - integrated_loudness(mono, 24000) == pytest.approx(3.01, abs=0.05)
+
+
+def test_silence_is_minus_infinity():
+    assert integrated_loudness(np.zeros((24000, 1)), 24000) == -math.inf
+    assert integrated_loudness(np.zeros((0, 1)), 24000) == -math.inf
+
+
+def test_gate_ignores_pauses():
+    tone = sine(24000, amplitude=0.1)
+    with_pause = np.vstack([tone, np.zeros((48000, 1)), tone])
+    assert integrated_loudness(with_pause, 24000) == pytest.approx(integrated_loudness(tone, 24000), abs=0.5)
+
+
+def test_short_clip_is_measured_whole():
+    assert integrated_loudness(sine(24000, seconds=0.2), 24000) == pytest.approx(-3.01, abs=0.2)
+
+
+def test_pcm_samples_scales_integer_pcm():
+    raw = np.array([0, 16384, -32768, 32767], dtype=np.int16).tobytes()
+    samples = pcm_samples(raw, 2, 2)
+    assert samples.shape == (2, 2)
+    assert samples[1, 0] == -1.0
+    assert samples[0, 1] == 0.5
+    assert pcm_samples(bytes([128, 0]), 1, 1)[:, 0].tolist() == [0.0, -1.0]
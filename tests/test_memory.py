@@ -0,0 +1,71 @@
+from core.memory import ConversationMemory
+from utils.tokens import count_tokens
+
+
+def test_recent_turns_are_kept_verbatim():
+    memory = ConversationMemory(window_turns=2)
+    memory.add("Anfitrion", "[Carlos] Hola a todos.")
+    memory.add("Participante", "[Patricia] Hola Carlos.")
+
+    context = memory.context(1000, skip_latest=False)
+
+    assert "Anfitrion: [Carlos] Hola a todos." in context
+    assert "Participante: [Patricia] Hola Carlos." in context
+    assert "Resumen" not in context
+
+
+def test_latest_turn_is_skipped_by_default():
+    memory = ConversationMemory(window_turns=3)
+    memory.add("Anfitrion", "Primero")
+    memory.add("Participante", "Segundo")
+
+    context = memory.context(1000)
+
+    assert "Primero" in context
+    assert "Segundo" not in context
+
+
+def test_old_turns_move_to_rolling_summary():
+    memory = ConversationMemory(window_turns=1)
+    memory.add("Anfitrion", "[Carlos] Hablemos de redes. Es un tema enorme y con muchos matices.")
+    memory.add("Participante", "[Patricia] Me encanta la idea.")
+
+    context = memory.context(1000, skip_latest=False)
+
+    assert list(memory.summary) == ["- Anfitrion: Hablemos de redes."]
+    assert "Resumen de la conversación hasta ahora:\n- Anfitrion: Hablemos de redes." in context
+    assert "muchos matices" not in context
+
+
+def test_memory_stays_bounded():
+    memory = ConversationMemory(window_turns=2, summary_tokens=50)
+    for i in range(200):
+        memory.add("Anfitrion", f"Turno número {i} con algo de texto. Y una segunda frase larga.")
+
+    assert len(memory.recent) == 2
+    assert sum(count_tokens(line) for line in memory.summary) <= 50
+    # The newest summarized turn survives, the oldest ones are forgotten
+    assert "Turno número 197" in memory.summary[-1]
+    assert all("Turno número 0 " not in line for line in memory.summary)
+
+
+def test_context_respects_token_budget():
+    memory = ConversationMemory(window_turns=3, summary_tokens=1000)
+    for i in range(10):
+        memory.add("Participante", f"Respuesta {i}. " + "palabra " * 40)
+
+    context = memory.context(120, skip_latest=False)
+
+    assert count_tokens(context) <= 120
+    # Older material is dropped first
+    assert "Respuesta 9" in context
+    assert memory.context(0) == ""
+
+
+def test_clear():
+    memory = ConversationMemory(window_turns=1)
+    memory.add("Anfitrion", "Uno.")
+    memory.add("Anfitrion", "Dos.")
+    memory.clear()
+
+    assert memory.context(1000, skip_latest=False) == ""
@@ -0,0 +1,91 @@
+import json
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils import metrics
+from utils.metrics import Metrics, MetricsServer
+
+
+def test_observe_accumulates_per_stage_and_operation():
+    registry = Metrics()
+    registry.observe("script", "chat", 1.5, calls=1, prompt_tokens=100)
+    registry.observe("script", "chat", 0.5, calls=1, prompt_tokens=50, retries=1)
+    registry.observe("voice", "cache", cache_hits=1)
+
+    snapshot = registry.snapshot()
+
+    chat = snapshot["script"]["chat"]
+    assert chat["calls"] == 2
+    assert chat["seconds"] == 2.0
+    assert chat["max_seconds"] == 1.5
+    assert chat["prompt_tokens"] == 150
+    assert chat["retries"] == 1
+    assert snapshot["voice"]["cache"]["cache_hits"] == 1
+
+
+def test_unknown_counter_is_rejected():
+    with pytest.raises(KeyError):
+        Metrics().observe("script", "chat", tokens=1)
+
+
+def test_timer_counts_errors_and_reraises():
+    with metrics.episode() as report:
+        with metrics.timer("summary", "chat", bytes_out=10) as values:
+            values["prompt_tokens"] = 7
+        with pytest.raises(ValueError):
+            with metrics.timer("summary", "chat"):
+                raise ValueError("boom")
+
+    chat = report.snapshot()["summary"]["chat"]
+    assert chat["calls"] == 2
+    assert chat["errors"] == 1
+    assert chat["bytes_out"] == 10
+    assert chat["prompt_tokens"] == 7
+
+
+def test_episode_metrics_are_isolated_and_follow_worker_threads():
+    def work(i):
+        metrics.observe("voice", "tts", 0.1, calls=1)
+        return i
+
+    with metrics.episode() as first:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(metrics.in_current_context(work), range(5)))
+    with metrics.episode() as second:
+        metrics.cache_result("voice", False)
+
+    assert first.snapshot()["voice"]["tts"]["calls"] == 5
+    assert "cache" not in first.snapshot()["voice"]
+    assert second.snapshot() == {"voice": {"cache": second.snapshot()["voice"]["cache"]}}
+    assert second.snapshot()["voice"]["cache"]["cache_misses"] == 1
+    # The process-wide registry sees everything
+    assert metrics.REGISTRY.snapshot()["voice"]["tts"]["calls"] >= 5
+
+
+def test_render_prometheus_text():
+    registry = Metrics()
+    registry.observe("transcribe", "whisper", 2.0, calls=1, bytes_out=1024)
+
+    text = registry.render()
+
+    assert '# TYPE podia_calls_total counter' in text
+    assert 'podia_calls_total{stage="transcribe",operation="whisper"} 1' in text
+    assert 'podia_bytes_out_total{stage="transcribe",operation="whisper"} 1024' in text
+    assert 'podia_max_seconds{stage="transcribe",operation="whisper"} 2.0' in text
+
+
+def test_metrics_server_serves_both_formats():
+    registry = Metrics()
+    registry.observe("mix", "assemble", 0.25, calls=1)
+    server = MetricsServer(registry, port=0)
+    port = server.start()
+    try:
+        base = f"http://127.0.0.1:{port}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert 'podia_calls_total{stage="mix",operation="assemble"} 1' in response.read().decode()
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            assert json.loads(response.read())["mix"]["assemble"]["calls"] == 1
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/other")
+    finally:
+        server.stop()
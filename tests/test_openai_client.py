@@ -0,0 +1,78 @@
+import pytest
+from utils.openai_client import OpenAIClientFactory
+
+
+@pytest.fixture(autouse=True)
+def reset_factory():
+    timeouts = dict(OpenAIClientFactory.stage_timeouts)
+    max_connections = OpenAIClientFactory.max_connections
+    yield
+    OpenAIClientFactory.configure(
+        max_connections=max_connections, stage_timeouts=timeouts)
+
+
+def test_stages_share_http_pool():
+    summary = OpenAIClientFactory.get_client("shared-key", "summary")
+    voice = OpenAIClientFactory.get_client("shared-key", "voice")
+
+    assert summary._client is voice._client
+    assert summary.timeout == OpenAIClientFactory.timeout_for("summary")
+    assert voice.timeout == OpenAIClientFactory.timeout_for("voice")
+
+
+def test_async_stages_share_http_pool():
+    script = OpenAIClientFactory.get_async_client("shared-key", "script")
+    transcript = OpenAIClientFactory.get_async_client("shared-key", "transcript")
+
+    assert script._client is transcript._client
+    assert transcript.timeout == OpenAIClientFactory.timeout_for("transcript")
+
+
+def test_different_keys_get_different_pools():
+    first = OpenAIClientFactory.get_client("key-1")
+    second = OpenAIClientFactory.get_client("key-2")
+
+    assert first._client is not second._client
+    assert second.api_key == "key-2"
+
+
+def test_unknown_stage_uses_default_timeout():
+    client = OpenAIClientFactory.get_client("shared-key", "unknown")
+    assert client.timeout == OpenAIClientFactory.stage_timeouts["default"]
+
+
+def test_configure_rebuilds_pool():
+    before = OpenAIClientFactory.get_client("shared-key", "voice")
+    OpenAIClientFactory.configure(max_connections=3, stage_timeouts={"voice": 5.0})
+    after = OpenAIClientFactory.get_client("shared-key", "voice")
+
+    assert after._client is not before._client
+    assert after._client._transport._pool._max_connections == 3
+    assert after.timeout == 5.0
+
+
+def test_configure_closes_replaced_clients():
+    sync_client = OpenAIClientFactory.get_client("closing-key")
+    async_client = OpenAIClientFactory.get_async_client("closing-key")
+    OpenAIClientFactory.configure()
+
+    assert sync_client.is_closed()
+    assert async_client.is_closed()
+
+
+def test_base_url_only_applies_to_its_key():
+    other = OpenAIClientFactory.get_client("other-key")
+    before = OpenAIClientFactory.get_client("local-key")
+    OpenAIClientFactory.set_base_url("local-key", "http://127.0.0.1:9999/v1")
+    try:
+        local = OpenAIClientFactory.get_client("local-key")
+        local_async = OpenAIClientFactory.get_async_client("local-key")
+
+        assert before.is_closed()
+        assert str(local.base_url) == str(local_async.base_url) == "http://127.0.0.1:9999/v1/"
+        assert not other.is_closed()
+        assert OpenAIClientFactory.get_client("other-key")._client is other._client
+    finally:
+        OpenAIClientFactory.set_base_url("local-key", None)
+    assert local.is_closed()
+    assert "127.0.0.1" not in str(OpenAIClientFactory.get_client("local-key").base_url)
@@ -1,6 +1,6 @@
 import pytest
 import os
-from unittest.mock import mock_open, patch, MagicMock
+from unittest.mock import patch, MagicMock
 
 @pytest.fixture
 def pdf_processor():
@@ -17,19 +17,36 @@ def test_init_creates_output_directory(pdf_processor):
     assert os.path.exists(pdf_processor.output_path)
 
 
+@pytest.fixture
+def output_dir(pdf_processor, tmp_path):
+    pdf_processor.output_path = str(tmp_path / "transcripts")
+    os.makedirs(pdf_processor.output_path)
+    return pdf_processor.output_path
+
+
+def make_pdf(path, content=b"%PDF-1.4 fake"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def mock_pages(*texts):
+    pages = []
+    for text in texts:
+        page = MagicMock()
+        page.extract_text.return_value = text
+        pages.append(page)
+    return pages
+
+
 @patch('docs.pdf_processor.PdfReader')
-def test_extract_text_success(mock_pdfreader, pdf_processor, sample_pdf_content):
-    # Configure mock
-    mock_page = MagicMock()
-    mock_page.extract_text.return_value = "Sample PDF text"
-    mock_pdfreader.return_value.pages = [mock_page, mock_page]
+def test_extract_text_success(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    mock_pdfreader.return_value.pages = mock_pages("Sample PDF text", "Sample PDF text")
 
-    with patch('builtins.open', mock_open()) as mock_file:
-        result = pdf_processor.extract_text("test.pdf")
+    result = pdf_processor.extract_text(make_pdf(tmp_path / "test.pdf"))
 
     assert "Transcripción guardada en:" in result
     assert "Sample PDF text\nSample PDF text" in result
-    mock_file.assert_called_once()
 
 
 def test_extract_text_file_not_found(pdf_processor):
@@ -38,54 +55,144 @@ def test_extract_text_file_not_found(pdf_processor):
 
 
 @patch('docs.pdf_processor.PdfReader')
-def test_process_pdf(mock_pdfreader, pdf_processor):
+def test_process_pdf(mock_pdfreader, pdf_processor, output_dir, tmp_path):
     # Create mock file object
     mock_file = MagicMock()
-    mock_file.name = "test.pdf"
-
-    # Configure PdfReader mock
-    mock_page = MagicMock()
-    mock_page.extract_text.return_value = "Sample PDF text"
-    mock_pdfreader.return_value.pages = [mock_page]
+    mock_file.name = make_pdf(tmp_path / "test.pdf")
+    mock_pdfreader.return_value.pages = mock_pages("Sample PDF text")
 
-    with patch('builtins.open', mock_open()):
-        result = pdf_processor.process_pdf(mock_file)
+    result = pdf_processor.process_pdf(mock_file)
 
     assert "Transcripción guardada en:" in result
     assert "Sample PDF text" in result
 
 
-def test_output_file_naming(pdf_processor):
-    test_pdf = "test_document.pdf"
+@patch('docs.pdf_processor.PdfReader')
+def test_output_file_naming(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    test_pdf = make_pdf(tmp_path / "test_document.pdf")
+    digest = pdf_processor.file_digest(test_pdf)
+    mock_pdfreader.return_value.pages = mock_pages("test content")
+
+    pdf_processor.extract_text(test_pdf)
+
     expected_output = os.path.join(
-        pdf_processor.output_path,
-        "test_document_transcripcion.txt"
-    )
+        output_dir, f"test_document_{digest[:12]}_transcripcion.txt")
+    assert os.path.exists(expected_output)
 
-    with patch('docs.pdf_processor.PdfReader') as mock_reader, \
-            patch('builtins.open', mock_open()) as mock_file:
-        mock_page = MagicMock()
-        mock_page.extract_text.return_value = "test content"
-        mock_reader.return_value.pages = [mock_page]
 
-        pdf_processor.extract_text(test_pdf)
+@patch('docs.pdf_processor.PdfReader')
+def test_output_file_content(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    test_pdf = make_pdf(tmp_path / "test_document.pdf")
+    mock_pdfreader.return_value.pages = mock_pages("test content")
+
+    pdf_processor.extract_text(test_pdf)
+
+    output_file = pdf_processor._output_file(test_pdf, pdf_processor.file_digest(test_pdf))
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read() == "test content\n"
+
+
+@patch('docs.pdf_processor.PdfReader')
+def test_stream_text_writes_each_page(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    pages = mock_pages("Page 1", "Page 2", "Page 3")
+    mock_pdfreader.return_value.pages = pages
+    test_pdf = make_pdf(tmp_path / "test.pdf")
+    output_file = pdf_processor._output_file(test_pdf, pdf_processor.file_digest(test_pdf))
+
+    stream = pdf_processor.stream_text(test_pdf)
+    first = next(stream)
+    # The first page is written before the rest are extracted
+    pages[1].extract_text.assert_not_called()
+    # Readers never see a half-written transcript under the final name
+    assert not os.path.exists(output_file)
+    rest = list(stream)
+
+    assert [first] + rest == ["Page 1\n", "Page 2\n", "Page 3\n"]
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read() == "Page 1\nPage 2\nPage 3\n"
+
+
+@patch('docs.pdf_processor.PdfReader')
+def test_reupload_uses_cache(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    mock_pdfreader.return_value.pages = mock_pages("Cached text")
+    first = pdf_processor.extract_text(make_pdf(tmp_path / "a" / "doc.pdf"))
+
+    # Same bytes under another name: no parsing at all
+    mock_pdfreader.reset_mock()
+    second = pdf_processor.extract_text(make_pdf(tmp_path / "b" / "copy.pdf"))
+
+    mock_pdfreader.assert_not_called()
+    assert second == first
+
+
+@patch('docs.pdf_processor.PdfReader')
+def test_same_name_different_content(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    mock_pdfreader.return_value.pages = mock_pages("First version")
+    first = pdf_processor.extract_text(make_pdf(tmp_path / "a" / "doc.pdf", b"v1"))
+
+    mock_pdfreader.return_value.pages = mock_pages("Second version")
+    second = pdf_processor.extract_text(make_pdf(tmp_path / "b" / "doc.pdf", b"v2"))
+
+    assert "First version" in first
+    assert "Second version" in second
+    assert len(pdf_processor._load_index()) == 2
+
+
+@patch('docs.pdf_processor.PdfReader')
+def test_stale_entry_is_reparsed(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    test_pdf = make_pdf(tmp_path / "doc.pdf")
+    mock_pdfreader.return_value.pages = mock_pages("Original text")
+    pdf_processor.extract_text(test_pdf)
+
+    # Transcript truncated on disk: the index entry no longer matches
+    output_file = pdf_processor._output_file(test_pdf, pdf_processor.file_digest(test_pdf))
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("Orig")
+
+    result = pdf_processor.extract_text(test_pdf)
+
+    assert mock_pdfreader.call_count == 2
+    assert "Original text" in result
+
+
+@patch('docs.pdf_processor.PdfReader')
+def test_incomplete_stream_is_not_cached(mock_pdfreader, pdf_processor, output_dir, tmp_path):
+    mock_pdfreader.return_value.pages = mock_pages("Page 1", "Page 2")
+    test_pdf = make_pdf(tmp_path / "doc.pdf")
+
+    stream = pdf_processor.stream_text(test_pdf)
+    next(stream)
+    stream.close()
+
+    assert pdf_processor.get_cached(pdf_processor.file_digest(test_pdf)) is None
+    # The temporary file is removed as well
+    assert os.listdir(output_dir) == []
+
+
+def test_stream_text_missing_file_creates_no_output(pdf_processor, tmp_path):
+    pdf_processor.output_path = str(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        next(pdf_processor.stream_text("nonexistent.pdf"))
+    assert list(tmp_path.iterdir()) == []
 
-    mock_file.assert_called_with(expected_output, "w", encoding="utf-8")
 
+def test_process_pool_does_not_fork():
+    from docs.pdf_processor import POOL_START_METHOD
+    assert POOL_START_METHOD in ("forkserver", "spawn")
 
-def test_output_file_content(pdf_processor):
-    test_pdf = "test_document.pdf"
-    expected_content = "test content"
 
-    with patch('docs.pdf_processor.PdfReader') as mock_reader, \
-            patch('builtins.open', mock_open()) as mock_file:
-        mock_page = MagicMock()
-        mock_page.extract_text.return_value = expected_content
-        mock_reader.return_value.pages = [mock_page]
+def test_parallel_extraction_matches_sequential(pdf_processor):
+    pdf_file = "assets/docs/transcript/pdf/Speech_and_Language_Processing_An_Introduction_to_.pdf"
+    pdf_processor.parallel_min_pages = 10**6
+    sequential = list(pdf_processor.iter_pages(pdf_file))
 
-        pdf_processor.extract_text(test_pdf)
+    pdf_processor.parallel_min_pages = 1
+    pdf_processor.pages_per_task = 5
+    pdf_processor.max_workers = 2
+    parallel = list(pdf_processor.iter_pages(pdf_file))
 
-    mock_file().write.assert_called_with(expected_content + "\n")
+    assert len(parallel) == len(sequential) > 5
+    assert parallel == sequential
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+import json
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from core.pipeline import PodcastPipeline
+from core.script import ScriptGenerator
+from core.voice import VoiceGenerator
+from utils.clip_cache import ClipCache
+
+
+@pytest.fixture
+def script_generator():
+    return ScriptGenerator(api_key="test_key")
+
+
+@pytest.fixture
+def voice_generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return VoiceGenerator(api_key="test_key", clip_cache=ClipCache(tmp_path / "cache"))
+
+
+@pytest.fixture
+def pipeline(script_generator, voice_generator):
+    return PodcastPipeline(script_generator, voice_generator)
+
+
+def test_turns_are_synthesized_while_script_is_generated(pipeline, script_generator, voice_generator):
+    first_clip_done = threading.Event()
+    events = []
+
+    def fake_speech(text, voice, filename):
+        events.append(("tts", text))
+        if filename.startswith("1_"):
+            first_clip_done.set()
+        return filename
+
+    def fake_participante(prompt):
+        # The host's opening line must be synthesized before the guest answers
+        assert first_clip_done.wait(timeout=5)
+        events.append(("llm", "guest"))
+        return "[Patricia] Hola"
+
+    with patch.object(script_generator, '_generate_anfitrion_response',
+                      side_effect=["[Alfonso] Bienvenidos", "[Alfonso] Pregunta", "[Alfonso] Adiós"]), \
+            patch.object(script_generator, '_generate_participante_response', side_effect=fake_participante), \
+            patch.object(voice_generator, 'generate_speech', side_effect=fake_speech), \
+            patch.object(voice_generator, 'concatenate_audio_files', return_value="podcast_final.mp3") as mock_concat:
+        script, audio_path = pipeline.run("Resumen", num_exchanges=1)
+
+    assert events.index(("tts", "Bienvenidos")) < events.index(("llm", "guest"))
+    audio_files = mock_concat.call_args.args[0]
+    assert [f["character"] for f in audio_files] == [
+        "Alfonso", "Patricia", "Alfonso", "Alfonso"]
+    assert [f["audio_path"] for f in audio_files] == [
+        "1_Alfonso.mp3", "2_Patricia.mp3", "3_Alfonso.mp3", "4_Alfonso.mp3"]
+    assert len(json.loads(script)["dialogue"]) == 4
+    assert audio_path == Path("podcast_final.mp3")
+
+
+def test_no_audio_returns_empty_path(pipeline, script_generator, voice_generator):
+    with patch.object(script_generator, '_generate_anfitrion_response', return_value="[Alfonso] Hola"), \
+            patch.object(script_generator, '_generate_participante_response', return_value="[Patricia] Hola"), \
+            patch.object(voice_generator, 'generate_speech', return_value=""):
+        script, audio_path = pipeline.run("Resumen", num_exchanges=1)
+
+    assert json.loads(script)["dialogue"]
+    assert audio_path == ""
+
+
+def test_failed_mix_returns_empty_path(pipeline, script_generator, voice_generator):
+    with patch.object(script_generator, '_generate_anfitrion_response', return_value="[Alfonso] Hola"), \
+            patch.object(script_generator, '_generate_participante_response', return_value="[Patricia] Hola"), \
+            patch.object(voice_generator, 'generate_speech', return_value="clip.mp3"), \
+            patch.object(voice_generator, 'concatenate_audio_files', return_value=""):
+        script, audio_path = pipeline.run("Resumen", num_exchanges=1)
+
+    assert audio_path == ""
@@ -0,0 +1,190 @@
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch, MagicMock
+from pydub import AudioSegment  # type: ignore
+from pydub.generators import Sine  # type: ignore
+from audio.loudness import integrated_loudness, pcm_samples
+from audio.podcast_assembler import PodcastAssembler
+
+
+@pytest.fixture
+def clips(tmp_path):
+    paths = []
+    for i, duration in enumerate([300, 700]):
+        path = tmp_path / f"{i + 1}_clip.wav"
+        tone = Sine(440).to_audio_segment(duration=duration).set_frame_rate(
+            24000).set_channels(1).set_sample_width(2)
+        tone.export(str(path), format="wav")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def ffmpeg():
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def test_assemble_streams_pcm_and_silence(clips, tmp_path):
+    assembler = PodcastAssembler(pause_duration=1000, lead_in=500, converter="ffmpeg")
+    written = []
+    encoder = MagicMock()
+    encoder.stdin.write.side_effect = lambda data: written.append(len(data))
+    encoder.wait.return_value = 0
+
+    with patch('audio.podcast_assembler.subprocess.Popen', return_value=encoder) as mock_popen:
+        result = assembler.assemble(clips, tmp_path / "final.mp3")
+
+    command = mock_popen.call_args.args[0]
+    assert command[command.index("-ar") + 1] == "24000"
+    assert command[-1] == str(tmp_path / "final.mp3")
+    # 0.5s lead-in, both clips and a 1s pause after each, at 24 kHz mono 16 bits
+    clip_bytes = sum(len(AudioSegment.from_file(clip).raw_data) for clip in clips)
+    assert sum(written) == clip_bytes + int(24000 * 2.5) * 2
+    assert max(written) <= 64 * 1024
+    encoder.stdin.close.assert_called_once()
+    assert result == str(tmp_path / "final.mp3")
+
+
+def test_assemble_raises_on_encoder_error(clips, tmp_path):
+    encoder = MagicMock()
+    encoder.wait.return_value = 1
+
+    def popen(command, stderr, **kwargs):
+        stderr.write(b"boom")
+        return encoder
+
+    with patch('audio.podcast_assembler.subprocess.Popen', side_effect=popen):
+        with pytest.raises(RuntimeError, match="boom"):
+            PodcastAssembler(converter="ffmpeg").assemble(clips, tmp_path / "final.mp3")
+
+
+def test_assemble_requires_clips(tmp_path):
+    with pytest.raises(ValueError):
+        PodcastAssembler(converter="ffmpeg").assemble([], tmp_path / "final.mp3")
+
+
+def test_assemble_matches_in_memory_concatenation(clips, tmp_path, ffmpeg, monkeypatch):
+    monkeypatch.setattr(AudioSegment, "converter", ffmpeg)
+    output = PodcastAssembler(pause_duration=1000, lead_in=500).assemble(
+        clips, tmp_path / "final.mp3")
+
+    expected = AudioSegment.silent(duration=500)
+    for clip in clips:
+        expected += AudioSegment.from_file(clip) + AudioSegment.silent(duration=1000)
+    # Decode with ffmpeg directly: pydub's MP3 loader also needs ffprobe
+    decoded = tmp_path / "final.wav"
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", output, str(decoded)], check=True)
+    result = AudioSegment.from_wav(str(decoded))
+
+    assert result.frame_rate == expected.frame_rate
+    assert result.channels == expected.channels
+    # MP3 framing adds a few milliseconds of encoder padding
+    assert abs(len(result) - len(expected)) < 100
+
+
+def test_encoder_command_uses_codec_and_bitrate(tmp_path):
+    opus = PodcastAssembler(converter="ffmpeg", codec="opus")._encoder_command("final.ogg", 24000, 1, 2)
+    assert opus[opus.index("-c:a") + 1] == "libopus"
+    assert opus[opus.index("-b:a") + 1] == "64k"
+    assert opus[-3:] == ["-f", "ogg", "final.ogg"]
+    # libopus only encodes at 48 kHz here, the input rate stays 24 kHz
+    assert opus[opus.index("-ar") + 1] == "24000"
+    assert "48000" in opus
+
+    aac = PodcastAssembler(converter="ffmpeg", codec="aac", bitrate="64k")._encoder_command("final.m4a", 24000, 1, 2)
+    assert aac[aac.index("-c:a") + 1] == "aac"
+    assert aac[aac.index("-b:a") + 1] == "64k"
+    assert "+faststart" in aac
+
+
+def test_unknown_codec_raises():
+    with pytest.raises(ValueError, match="flac"):
+        PodcastAssembler(codec="flac")
+
+
+def test_extension_follows_codec():
+    assert PodcastAssembler().extension == ".mp3"
+    assert PodcastAssembler(codec="opus").extension == ".ogg"
+    assert PodcastAssembler(codec="aac").extension == ".m4a"
+
+
+def test_settings_change_with_mix_options():
+    assert PodcastAssembler().settings() == PodcastAssembler().settings()
+    assert PodcastAssembler().settings() != PodcastAssembler(codec="opus").settings()
+    assert PodcastAssembler().settings() != PodcastAssembler(target_lufs=-19.0).settings()
+
+
+def test_assemble_normalizes_each_clip_to_target(tmp_path):
+    quiet, loud = tmp_path / "1_quiet.wav", tmp_path / "2_loud.wav"
+    tone = Sine(440).to_audio_segment(duration=1000).set_frame_rate(24000).set_channels(1).set_sample_width(2)
+    (tone - 30).export(str(quiet), format="wav")
+    (tone - 6).export(str(loud), format="wav")
+
+    assembler = PodcastAssembler(pause_duration=0, lead_in=0, converter="ffmpeg", target_lufs=-20.0)
+    written = []
+    encoder = MagicMock()
+    encoder.stdin.write.side_effect = lambda data: written.append(bytes(data))
+    encoder.wait.return_value = 0
+
+    with patch('audio.podcast_assembler.subprocess.Popen', return_value=encoder):
+        assembler.assemble([str(quiet), str(loud)], tmp_path / "final.mp3")
+
+    pcm = b"".join(written)
+    half = len(pcm) // 2
+    levels = [integrated_loudness(pcm_samples(part, 2, 1), 24000) for part in (pcm[:half], pcm[half:])]
+    assert levels == pytest.approx([-20.0, -20.0], abs=0.2)
+    # The quiet clip is boosted and the loud one attenuated
+    assert assembler.gains[0] > 0 > assembler.gains[1]
+
+
+def test_normalize_respects_peak_ceiling_and_max_gain():
+    tone = Sine(440).to_audio_segment(duration=1000).set_frame_rate(24000).set_channels(1).set_sample_width(2)
+
+    clip, gain = PodcastAssembler(target_lufs=0.0, peak_ceiling_db=-1.0).normalize(tone - 10)
+    assert clip.max_dBFS <= -0.9
+    assert gain == pytest.approx(9.0, abs=0.1)
+
+    _, gain = PodcastAssembler(target_lufs=-16.0, max_gain_db=5.0).normalize(tone - 40)
+    assert gain == pytest.approx(5.0)
+
+
+def test_normalize_leaves_silence_and_disabled_target_alone():
+    silence = AudioSegment.silent(duration=1000, frame_rate=24000)
+    assert PodcastAssembler().normalize(silence) == (silence, 0.0)
+
+    tone = Sine(440).to_audio_segment(duration=1000) - 30
+    assert PodcastAssembler(target_lufs=None).normalize(tone) == (tone, 0.0)
+
+
+def test_assemble_encodes_opus(clips, tmp_path, ffmpeg, monkeypatch):
+    monkeypatch.setattr(AudioSegment, "converter", ffmpeg)
+    output = PodcastAssembler(pause_duration=1000, lead_in=500, codec="opus").assemble(
+        clips, tmp_path / "final.ogg")
+
+    decoded = tmp_path / "final.wav"
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", output, str(decoded)], check=True)
+    result = AudioSegment.from_wav(str(decoded))
+    assert result.frame_rate == 48000
+    assert abs(len(result) - 3500) < 100
+
+
+def fake_encoder(tmp_path, body):
+    script = tmp_path / "fake_ffmpeg"
+    script.write_text(f"#!{sys.executable}\nimport sys\n{body}\n", encoding="utf-8")
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_assemble_does_not_block_on_verbose_encoder(clips, tmp_path):
+    # Writes more than a pipe buffer to stderr before reading any PCM
+    converter = fake_encoder(tmp_path, "sys.stderr.write('x' * 1024 * 1024)\nsys.stdin.buffer.read()")
+    output = PodcastAssembler(converter=converter, target_lufs=None).assemble(clips, tmp_path / "final.mp3")
+    assert output == str(tmp_path / "final.mp3")
+
+
+def test_assemble_reports_encoder_that_exits_early(clips, tmp_path):
+    converter = fake_encoder(tmp_path, "sys.stderr.write('bad codec')\nsys.exit(1)")
+    with pytest.raises(RuntimeError, match="bad codec"):
+        PodcastAssembler(converter=converter).assemble(clips, tmp_path / "final.mp3")
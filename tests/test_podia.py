@@ -0,0 +1,179 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+import podia as podia_module
+from podia import PodIA
+
+
+@pytest.fixture
+def podia(tmp_path, monkeypatch):
+    # PodIA escribe en rutas relativas de assets/: aislarlo en un directorio temporal
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(podia_module, "OPENAI_API_KEY", "test-key")
+    return PodIA()
+
+
+def test_sessions_have_their_own_configuration(podia):
+    first, second = podia.new_session(), podia.new_session()
+
+    first.update_models_config("whisper-1", "gpt-4o", "gpt-4", "tts-1-hd")
+    first.update_voice_config("Ana", "female", "shimmer", "Luis", "male", "echo")
+
+    assert (second.summary_generator.model, second.script_generator.model, second.voice_generator.model) == \
+        (podia.summary_generator.model, podia.script_generator.model, podia.voice_generator.model)
+    assert second.script_generator.anfitrion.name == podia.script_generator.anfitrion.name == "Alfonso"
+    assert first.summary_generator.model == "gpt-4o"
+    assert first.script_generator.anfitrion.name == "Ana"
+    # Los generadores de cada ejecución parten de la configuración de la sesión
+    assert first._new_script_generator().model == "gpt-4"
+    assert first._new_voice_generator("run").model == "tts-1-hd"
+
+
+def test_sessions_share_processors_caches_and_client_pool(podia):
+    first, second = podia.new_session(), podia.new_session()
+
+    assert first.pdf_processor is second.pdf_processor is podia.pdf_processor
+    assert first.job_queue is second.job_queue is podia.job_queue
+    assert first.summary_generator.cache is second.summary_generator.cache is podia.summary_generator.cache
+    assert first.voice_generator.clip_cache is second.voice_generator.clip_cache
+    assert first.summary_generator.client._client is second.summary_generator.client._client
+    assert first.episodes is second.episodes is podia.episodes
+
+
+def test_session_voice_config_reaches_speech(podia):
+    session = podia.new_session()
+    session.update_voice_config("Ana", "female", "shimmer", "Luis", "male", "echo")
+
+    assert session.voice_generator._get_voice_for_character("Ana") == "shimmer"
+    assert session._new_voice_generator("run")._get_voice_for_character("Luis") == "echo"
+
+    with patch.object(session.voice_generator, "generate_speech", return_value="1_Ana.mp3") as mock_speech:
+        session.voice_generator.synthesize_entry(0, {"character": "Ana", "message": "Hola"})
+    mock_speech.assert_called_once_with("Hola", "shimmer", "1_Ana.mp3")
+
+
+def fake_generate_podcast(voice_generator, script_json, checkpoint=None):
+    return checkpoint.run_dir / "audio" / "podcast_final.mp3"
+
+
+def test_each_podcast_gets_its_own_episode_directory(podia, tmp_path):
+    first, second = podia.new_session(), podia.new_session()
+
+    with patch("core.voice.VoiceGenerator.generate_podcast", autospec=True, side_effect=fake_generate_podcast):
+        paths = [first.generate_podcast({"dialogue": []}), second.generate_podcast({"dialogue": []}),
+                 first.generate_podcast({"dialogue": []})]
+
+    assert len({path.parent for path in paths}) == 3
+    assert [path.parent.parent.name for path in paths] == ["episode-0001", "episode-0002", "episode-0003"]
+    assert (tmp_path / "assets/docs/extra/last_podcast_number.txt").read_text() == "3"
+
+
+def test_ui_builds_with_session_state(podia):
+    app = podia.ui.create_ui()
+    assert app is not None
+
+
+def test_job_store_is_only_created_when_jobs_are_used(podia, tmp_path):
+    assert not (tmp_path / "assets" / "jobs" / "jobs.db").exists()
+
+    assert podia.new_session().job_status("missing") is None
+    assert (tmp_path / "assets" / "jobs" / "jobs.db").exists()
+
+
+def test_launch_continues_when_metrics_port_is_taken(podia):
+    with patch.object(podia.job_queue, "start"), \
+            patch.object(podia_module.metrics.MetricsServer, "start", side_effect=OSError("Address already in use")), \
+            patch.object(podia_module, "PodIAUI") as mock_ui:
+        podia.launch()
+
+    mock_ui.return_value.create_ui.return_value.launch.assert_called_once()
+
+
+def test_script_paths_use_a_generator_per_run(podia):
+    session = podia.new_session()
+    session.update_models_config("whisper-1", "gpt-4o-mini", "gpt-4", "tts-1")
+    used = []
+
+    def fake_generate_script(self, summary):
+        used.append(self)
+        return {"podcast": []}
+
+    async def fake_generate_script_async(self, summary):
+        used.append(self)
+        return {"podcast": []}
+
+    with patch.object(podia_module.ScriptGenerator, "generate_script", fake_generate_script), \
+            patch.object(podia_module.ScriptGenerator, "generate_script_async", fake_generate_script_async), \
+            patch.object(session, "process_input", return_value="texto"), \
+            patch.object(session.summary_generator, "generate_summary", return_value="resumen"):
+        session.generate_script("resumen")
+        session.generate_script("resumen")
+        asyncio.run(session.generate_script_async("resumen"))
+        session.process_content("PDF", "doc.pdf")
+
+    assert len({id(generator) for generator in used}) == 4
+    assert session.script_generator not in used
+    assert all(generator.model == "gpt-4" for generator in used)
+
+
+def test_run_episode_with_media_uses_the_transcript(podia, tmp_path):
+    media = tmp_path / "clase.mp3"
+    media.write_bytes(b"audio")
+    podcast = tmp_path / "podcast_final.mp3"
+
+    with patch.object(podia.video_processor, "process_media",
+                      return_value=("clase_transcript.txt", "Transcripcion de la clase")) as mock_media, \
+            patch.object(podia.summary_generator, "generate_summary", return_value="Resumen") as mock_summary, \
+            patch.object(podia_module.PodcastPipeline, "run", return_value=('{"podcast": []}', podcast)):
+        result = podia.run_episode("Video/Audio", str(media), run_dir=tmp_path / "run")
+
+    mock_media.assert_called_once_with(str(media))
+    mock_summary.assert_called_once_with("Transcripcion de la clase")
+    assert result["extract"] == "Transcripcion de la clase"
+    assert (tmp_path / "run" / "extract.txt").read_text(encoding="utf-8") == "Transcripcion de la clase"
+    assert result["podcast"] == str(podcast)
+
+
+def test_jobs_run_with_the_session_configuration(podia, tmp_path):
+    session = podia.new_session()
+    session.update_models_config("whisper-1", "gpt-4o", "gpt-4", "tts-1-hd")
+    session.update_voice_config("Ana", "female", "shimmer", "Luis", "male", "echo")
+    url = "https://youtu.be/dQw4w9WgXcQ"
+
+    with patch.object(podia.job_queue, "submit", return_value="job-1") as mock_submit:
+        session.submit_job("URL", None, url, None)
+    config = mock_submit.call_args.args[2]
+    # The job row keeps the configuration, so resume and retry rebuild the same context
+    job = {"id": "job-1", "input_type": "URL", "content": url, "config": config}
+    seen = {}
+
+    def fake_generate_script(self, summary, checkpoint=None):
+        seen["script"] = (self.model, self.anfitrion.name, self.participante.voice)
+        return '{"podcast": []}'
+
+    with patch.object(podia_module.ScriptGenerator, "generate_script", fake_generate_script):
+        podia._job_script(job, {"summary": "Resumen"})
+
+    context = podia._job_context(job)
+    assert seen["script"] == ("gpt-4", "Ana", "echo")
+    assert context.summary_generator.model == "gpt-4o"
+    assert context._new_voice_generator("run").model == "tts-1-hd"
+    assert context._new_voice_generator("run")._get_voice_for_character("Ana") == "shimmer"
+    # The base instance keeps its own configuration
+    assert podia.script_generator.model != "gpt-4"
+    assert podia._job_context({"config": {}}) is podia
+
+
+def test_data_dir_and_api_key_are_explicit(tmp_path, monkeypatch):
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    podia = PodIA(api_key="explicit-key", data_dir=tmp_path / "data")
+    session = podia.new_session()
+
+    # Nothing is written relative to the working directory
+    assert list(cwd.iterdir()) == []
+    assert podia.episodes.allocate().run_dir.parent == tmp_path / "data" / "assets" / "runs"
+    assert session.video_processor.transcript_path.parent.parent == tmp_path / "data" / "assets" / "docs"
+    assert session.summary_generator.client.api_key == "explicit-key"
+    assert session._new_voice_generator("run").client.api_key == "explicit-key"
@@ -67,6 +67,40 @@ class TestResponseGeneration:
         response = script_generator._generate_participante_response("Test prompt")
         assert response == expected_response
 
+@pytest.mark.responses
+class TestPromptAssembly:
+    def test_persona_prompt_is_memoized(self, script_generator):
+        anfitrion = script_generator.anfitrion
+        assert anfitrion.anfitrion_prompt() is anfitrion.anfitrion_prompt()
+        assert Anfitrion().anfitrion_prompt() is anfitrion.anfitrion_prompt()
+
+        anfitrion.name = "Lucia"
+        anfitrion.set_gender("female")
+        prompt = anfitrion.anfitrion_prompt()
+        assert "Lucia is a girl" in prompt
+        assert "Alfonso" not in prompt
+
+    def test_persona_is_the_stable_system_prefix(self, script_generator):
+        first = script_generator._participante_messages("Turno 1")
+        second = script_generator._participante_messages("Turno 2")
+
+        assert first[0] == second[0]
+        assert first[0] == {"role": "system",
+                            "content": script_generator.participante.participante1_prompt()}
+        assert first[1] == {"role": "user", "content": "Turno 1"}
+
+    def test_prompt_tokens_are_recorded_per_turn(self, script_generator, mock_openai_response):
+        response = mock_openai_response("Hola")
+        response.usage.prompt_tokens = 1900
+        response.usage.prompt_tokens_details.cached_tokens = 1792
+        script_generator.anfitrion_ai.chat = MagicMock()
+        script_generator.anfitrion_ai.chat.completions.create.return_value = response
+
+        script_generator._generate_anfitrion_response("Test prompt")
+
+        assert script_generator.token_usage == [
+            {"speaker": "Anfitrion", "prompt_tokens": 1900, "cached_tokens": 1792}]
+
 @pytest.mark.script_generation
 class TestScriptGeneration:
     @pytest.fixture
@@ -106,6 +140,215 @@ class TestScriptGeneration:
         assert dialogue[0]["character"] == "Anfitrion"
         assert dialogue[1]["character"] == "Participante"
 
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_generate_script_notifies_each_turn(
+        self, mock_participante_resp, mock_anfitrion_resp,
+        script_generator, mock_responses
+    ):
+        mock_anfitrion_resp.side_effect = mock_responses['anfitrion']
+        mock_participante_resp.side_effect = mock_responses['participante']
+        turns = []
+
+        script = script_generator.generate_script(
+            "Test summary", 2, on_turn=lambda speaker, text: turns.append((speaker, text)))
+
+        assert turns == script_generator.get_conversation()
+        assert len(turns) == len(json.loads(script)["dialogue"])
+        assert script_generator.on_turn is None
+
+    def test_generate_script_async(self, script_generator, mock_responses):
+        import asyncio
+        from unittest.mock import AsyncMock
+        with patch.object(script_generator, '_generate_anfitrion_response_async',
+                          AsyncMock(side_effect=mock_responses['anfitrion'])), \
+                patch.object(script_generator, '_generate_participante_response_async',
+                             AsyncMock(side_effect=mock_responses['participante'])):
+            script = asyncio.run(script_generator.generate_script_async("Test summary", 2))
+
+        dialogue = json.loads(script)["dialogue"]
+        assert [d["character"] for d in dialogue] == [
+            "Anfitrion", "Participante", "Anfitrion", "Participante", "Anfitrion", "Anfitrion"]
+        assert dialogue[-1]["message"] == "Anfitrion despedida"
+
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_initial_turn_error_does_not_stop_script(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator
+    ):
+        mock_anfitrion_resp.side_effect = [Exception("API Error"), "Anfitrion 1", "Anfitrion despedida"]
+        mock_participante_resp.return_value = "Participante response"
+
+        script = json.loads(script_generator.generate_script("Test summary", 1))
+
+        assert [d["message"] for d in script["dialogue"]] == [
+            "Participante response", "Anfitrion 1", "Anfitrion despedida"]
+        guest_prompt = mock_participante_resp.call_args_list[0].args[0]
+        assert "Error: No se pudo generar el guion del podcast." in guest_prompt
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_checkpoint_resumes_after_failed_turn(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator, mock_responses, tmp_path
+    ):
+        from core.checkpoint import RunCheckpoint
+        checkpoint = RunCheckpoint(tmp_path / "run")
+        # The third turn (first exchange) fails: the first two are checkpointed
+        mock_anfitrion_resp.side_effect = ["Anfitrion initial response", Exception("Timeout")]
+        mock_participante_resp.side_effect = ["Participante response 1"]
+        with pytest.raises(Exception, match="Timeout"):
+            script_generator.generate_script("Test summary", 2, checkpoint=checkpoint)
+
+        resumed = ScriptGenerator(api_key="test_api_key")
+        mock_anfitrion_resp.reset_mock()
+        mock_participante_resp.reset_mock()
+        mock_anfitrion_resp.side_effect = mock_responses['anfitrion'][1:]
+        mock_participante_resp.side_effect = mock_responses['participante'][1:]
+        script = json.loads(resumed.generate_script("Test summary", 2, checkpoint=checkpoint))
+
+        assert [d["message"] for d in script["dialogue"]] == [
+            "Anfitrion initial response", "Participante response 1", "Anfitrion response 1",
+            "Participante response 2", "Anfitrion response 2", "Anfitrion despedida"]
+        # Only the missing turns reached the API
+        assert mock_anfitrion_resp.call_count == 3
+        assert mock_participante_resp.call_count == 1
+        assert resumed.checkpoint is None
+
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_checkpoint_ignored_when_summary_changes(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator, mock_responses, tmp_path
+    ):
+        from core.checkpoint import RunCheckpoint
+        checkpoint = RunCheckpoint(tmp_path / "run")
+        mock_anfitrion_resp.side_effect = mock_responses['anfitrion'] * 2
+        mock_participante_resp.side_effect = mock_responses['participante'] * 2
+
+        script_generator.generate_script("Summary A", 2, checkpoint=checkpoint)
+        ScriptGenerator(api_key="test_api_key").generate_script("Summary B", 2, checkpoint=checkpoint)
+
+        assert mock_anfitrion_resp.call_count == 8
+
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_conversation_is_reset_between_runs(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator, mock_responses
+    ):
+        mock_anfitrion_resp.side_effect = mock_responses['anfitrion'] * 2
+        mock_participante_resp.side_effect = mock_responses['participante'] * 2
+
+        first = script_generator.generate_script("Summary A", 2)
+        second = script_generator.generate_script("Summary B", 2)
+
+        assert first == second
+        assert len(script_generator.get_conversation()) == 6
+        assert len(script_generator.get_anfitrion_messages()) == 4
+        assert len(script_generator.get_participante_messages()) == 2
+
+    @patch('core.script.SCRIPT_PROMPT_MAX_TOKENS', 1000)
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_turn_prompts_include_bounded_memory(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator
+    ):
+        from utils.tokens import count_tokens
+        long_turn = "Una frase. " + "detalle " * 300
+        mock_anfitrion_resp.side_effect = lambda prompt: f"Anfitrion {long_turn}"
+        mock_participante_resp.side_effect = lambda prompt: f"Participante {long_turn}"
+
+        script_generator.generate_script("Test summary", 8)
+
+        prompts = ([c.args[0] for c in mock_anfitrion_resp.call_args_list] +
+                   [c.args[0] for c in mock_participante_resp.call_args_list])
+        exchange_prompts = [p for p in prompts if "Última respuesta" in p or "closing statement" in p]
+        assert any("Turnos más recientes" in p for p in exchange_prompts)
+        assert any("Resumen de la conversación" in p for p in exchange_prompts)
+        # Only the unavoidable persona + latest reply may exceed the memory budget
+        for prompt in exchange_prompts[2:]:
+            assert count_tokens(prompt) <= 1000 + count_tokens(long_turn) + 20
+        despedida_prompt = mock_anfitrion_resp.call_args_list[-1].args[0]
+        assert "Participante: Participante" in despedida_prompt
+
+    @patch('core.script.ScriptGenerator._generate_anfitrion_response')
+    @patch('core.script.ScriptGenerator._generate_participante_response')
+    def test_persona_is_not_repeated_in_user_prompt(
+        self, mock_participante_resp, mock_anfitrion_resp, script_generator, mock_responses
+    ):
+        mock_anfitrion_resp.side_effect = mock_responses['anfitrion']
+        mock_participante_resp.side_effect = mock_responses['participante']
+
+        script_generator.generate_script("Test summary", 2)
+
+        host_persona = script_generator.anfitrion.anfitrion_prompt()
+        guest_persona = script_generator.participante.participante1_prompt()
+        for call in mock_anfitrion_resp.call_args_list + mock_participante_resp.call_args_list:
+            assert host_persona not in call.args[0]
+            assert guest_persona not in call.args[0]
+
+
+@pytest.mark.script_generation
+class TestScriptStreaming:
+    @staticmethod
+    def stream_of(*deltas, prompt_tokens=100):
+        chunks = [MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content=d))])
+                  for d in deltas]
+        usage_chunk = MagicMock(choices=[])
+        usage_chunk.usage.prompt_tokens = prompt_tokens
+        usage_chunk.usage.prompt_tokens_details.cached_tokens = 0
+        return iter(chunks + [usage_chunk])
+
+    def test_stream_script_yields_tokens_per_turn(self, script_generator):
+        streams = [self.stream_of("[Alfonso] ", "Hola", "."),
+                   self.stream_of("[Patricia] ", "Buenas"),
+                   self.stream_of("Adiós")]
+        script_generator.anfitrion_ai.chat = MagicMock()
+        script_generator.participante_ai.chat = MagicMock()
+        script_generator.anfitrion_ai.chat.completions.create.side_effect = [streams[0], streams[2]]
+        script_generator.participante_ai.chat.completions.create.side_effect = [streams[1]]
+
+        stream = script_generator.stream_script("Test summary", 0)
+        events = []
+        with pytest.raises(StopIteration) as done:
+            while True:
+                events.append(next(stream))
+
+        assert events == [
+            (0, "Anfitrion", "[Alfonso] "), (0, "Anfitrion", "Hola"), (0, "Anfitrion", "."),
+            (1, "Participante", "[Patricia] "), (1, "Participante", "Buenas"),
+            (2, "Anfitrion", "Adiós")]
+        script = json.loads(done.value.value)
+        assert [d["message"] for d in script["dialogue"]] == ["Hola.", "Buenas", "Adiós"]
+        kwargs = script_generator.anfitrion_ai.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        assert [u["prompt_tokens"] for u in script_generator.token_usage] == [100, 100, 100]
+
+    def test_script_preview_includes_partial_turn(self, script_generator):
+        script_generator.conversation = [("Anfitrion", "[Alfonso] Hola")]
+
+        preview = script_generator.script_preview("Participante", "[Patricia] Bue")
+
+        assert preview["dialogue"] == [
+            {"character": "Alfonso", "message": "Hola"},
+            {"character": "Patricia", "message": "Bue"}]
+        assert script_generator.script_preview()["dialogue"] == preview["dialogue"][:1]
+
+    def test_stream_script_reuses_checkpointed_turns(self, script_generator, tmp_path):
+        from core.checkpoint import RunCheckpoint
+        checkpoint = RunCheckpoint(tmp_path / "run")
+        script_generator.anfitrion_ai.chat = MagicMock()
+        script_generator.participante_ai.chat = MagicMock()
+        script_generator.anfitrion_ai.chat.completions.create.side_effect = [
+            self.stream_of("Hola"), self.stream_of("Adiós")]
+        script_generator.participante_ai.chat.completions.create.side_effect = [
+            self.stream_of("Buenas")]
+        list(script_generator.stream_script("Test summary", 0, checkpoint=checkpoint))
+
+        script_generator.anfitrion_ai.chat.completions.create.reset_mock()
+        events = list(script_generator.stream_script("Test summary", 0, checkpoint=checkpoint))
+
+        assert events == [(0, "Anfitrion", "Hola"), (1, "Participante", "Buenas"), (2, "Anfitrion", "Adiós")]
+        script_generator.anfitrion_ai.chat.completions.create.assert_not_called()
+
+
 @pytest.mark.messages
 class TestMessageRetrieval:
     def test_get_messages(self, script_generator):
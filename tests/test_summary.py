@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from core.summary import SummaryGenerator
+from core.summary import SummaryCache, SummaryGenerator
 
 
 @pytest.fixture
@@ -35,12 +35,25 @@ def sample_summary():
 
 
 @pytest.fixture
-def summary_generator(api_key):
-    return SummaryGenerator(api_key)
+def summary_cache(tmp_path):
+    return SummaryCache(tmp_path / "summary_cache")
 
 
-def test_summary_generator_init(api_key):
-    generator = SummaryGenerator(api_key)
+@pytest.fixture
+def summary_generator(api_key, summary_cache):
+    return SummaryGenerator(api_key, cache=summary_cache)
+
+
+@pytest.fixture
+def mock_client(sample_summary):
+    client = MagicMock()
+    client.chat.completions.create.return_value = MagicMock(
+        choices=[MagicMock(message=MagicMock(content=sample_summary))])
+    return client
+
+
+def test_summary_generator_init(api_key, summary_cache):
+    generator = SummaryGenerator(api_key, cache=summary_cache)
     assert generator.client.api_key == api_key
 
 @patch('openai.OpenAI')
@@ -54,9 +67,127 @@ def test_generate_summary_error(mock_openai, summary_generator, sample_text):
         summary_generator.generate_summary(sample_text)
 
 
-def test_summary_generator_empty_key():
+def test_generate_summary_async(summary_generator, sample_text, sample_summary):
+    import asyncio
+    from unittest.mock import AsyncMock
+    summary_generator.async_client = MagicMock()
+    summary_generator.async_client.chat.completions.create = AsyncMock(
+        return_value=MagicMock(choices=[MagicMock(message=MagicMock(content=sample_summary))]))
+
+    result = asyncio.run(summary_generator.generate_summary_async(sample_text))
+
+    assert result == sample_summary
+    messages = summary_generator.async_client.chat.completions.create.call_args.kwargs["messages"]
+    assert sample_text in messages[1]["content"]
+
+
+def test_generate_summary_map_reduce(summary_generator):
+    summary_generator.chunk_tokens = 100
+    long_text = "\n\n".join(f"Parrafo {i}. " + "palabra " * 30 for i in range(4))
+    calls = []
+
+    def fake_create(model, messages):
+        calls.append(messages[1]["content"])
+        content = "Resumen final" if "Main topic" in messages[1]["content"] else "nota"
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    summary_generator.client = MagicMock()
+    summary_generator.client.chat.completions.create.side_effect = fake_create
+
+    result = summary_generator.generate_summary(long_text)
+
+    assert result == "Resumen final"
+    map_calls = [c for c in calls if "part" in c and "Main topic" not in c]
+    assert len(map_calls) == 4
+    assert "Notas de la parte 4 de 4" in calls[-1]
+
+
+def test_generate_summary_map_reduce_async(summary_generator):
+    import asyncio
+    from unittest.mock import AsyncMock
+    summary_generator.chunk_tokens = 100
+    long_text = "\n\n".join("palabra " * 30 for _ in range(3))
+
+    async def fake_create(model, messages):
+        content = "Resumen final" if "Main topic" in messages[1]["content"] else "nota"
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    summary_generator.async_client = MagicMock()
+    summary_generator.async_client.chat.completions.create = AsyncMock(side_effect=fake_create)
+
+    result = asyncio.run(summary_generator.generate_summary_async(long_text))
+
+    assert result == "Resumen final"
+    assert summary_generator.async_client.chat.completions.create.await_count == 4
+
+
+def test_generate_summary_uses_cache(summary_generator, mock_client, sample_text, sample_summary):
+    summary_generator.client = mock_client
+
+    first = summary_generator.generate_summary(sample_text)
+    second = summary_generator.generate_summary(sample_text)
+
+    assert first == second == sample_summary
+    mock_client.chat.completions.create.assert_called_once()
+
+
+def test_cache_key_depends_on_model(summary_generator, mock_client, sample_text):
+    summary_generator.client = mock_client
+
+    summary_generator.generate_summary(sample_text)
+    summary_generator.update_model("gpt-4o")
+    summary_generator.generate_summary(sample_text)
+
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+def test_generate_summary_cache_opt_out(summary_generator, mock_client, sample_text):
+    summary_generator.client = mock_client
+
+    summary_generator.generate_summary(sample_text, use_cache=False)
+    summary_generator.generate_summary(sample_text, use_cache=False)
+
+    assert mock_client.chat.completions.create.call_count == 2
+    assert summary_generator.cache.get(
+        SummaryCache.make_key(sample_text, summary_generator.model)) is None
+
+
+def test_summary_cache_expires(summary_cache):
+    key = SummaryCache.make_key("texto", "gpt-4o-mini")
+    summary_cache.put(key, "resumen", "gpt-4o-mini")
+    assert summary_cache.get(key) == "resumen"
+
+    summary_cache.ttl = -1
+    assert summary_cache.get(key) is None
+
+
+def test_summary_cache_evicts_least_recently_used(tmp_path):
+    import os
+    cache = SummaryCache(tmp_path / "cache", max_entries=2)
+    for i, name in enumerate(["a", "b"]):
+        cache.put(name, f"resumen {name}", "model")
+        os.utime(cache.cache_dir / f"{name}.json", (1000 + i, 1000 + i))
+
+    cache.get("a")
+    cache.put("c", "resumen c", "model")
+
+    assert cache.get("a") == "resumen a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "resumen c"
+
+
+def test_cache_directory_is_created_on_first_put(tmp_path):
+    cache = SummaryCache(tmp_path / "lazy")
+    assert not cache.cache_dir.exists()
+    assert cache.get("a") is None
+
+    cache.put("a", "resumen a", "model")
+    assert cache.get("a") == "resumen a"
+
+
+def test_summary_generator_empty_key(summary_cache):
     with pytest.raises(Exception):
-        SummaryGenerator("")
+        SummaryGenerator("", cache=summary_cache)
 
 
 if __name__ == "__main__":
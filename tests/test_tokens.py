@@ -0,0 +1,42 @@
+from utils.tokens import count_tokens, split_into_chunks
+
+
+def test_count_tokens_is_positive():
+    assert count_tokens("") == 0
+    assert count_tokens("Hola mundo") > 0
+
+
+def test_short_text_is_a_single_chunk():
+    assert split_into_chunks("Hola mundo", max_tokens=100) == ["Hola mundo"]
+
+
+def test_chunks_respect_token_limit():
+    text = "\n\n".join(f"Parrafo {i}. " + "palabra " * 40 for i in range(10))
+    chunks = split_into_chunks(text, max_tokens=120)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 120 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "").replace(" ", "") == text.replace("\n", "").replace(" ", "")
+
+
+def test_oversized_paragraph_is_split_by_sentences():
+    text = " ".join(f"Frase numero {i} con varias palabras." for i in range(50))
+    chunks = split_into_chunks(text, max_tokens=40)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+    assert chunks[0].startswith("Frase numero 0")
+
+
+def test_dense_word_is_cut_within_token_limit(monkeypatch):
+    class DenseEncoding:
+        # Each digit is its own token, far below the 4 characters per token estimate
+        def encode(self, text, disallowed_special=()):
+            return list(text)
+
+    monkeypatch.setattr("utils.tokens._get_encoding", lambda model: DenseEncoding())
+    text = "1234567890" * 50
+    chunks = split_into_chunks(text, max_tokens=64)
+
+    assert all(count_tokens(chunk) <= 64 for chunk in chunks)
+    assert "".join(chunks) == text
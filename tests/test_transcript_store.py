@@ -0,0 +1,33 @@
+import pytest
+from utils.transcript_store import TranscriptStore
+
+
+@pytest.fixture
+def transcript_store(tmp_path):
+    return TranscriptStore(tmp_path / "transcripts")
+
+
+def test_transcript_store_keys_by_language_and_source(transcript_store):
+    transcript_store.put("dQw4w9WgXcQ", "es", "captions", "hola")
+    transcript_store.put("dQw4w9WgXcQ", "auto", "whisper", "hello")
+    transcript_store.put("otherVideo1", "es", "captions", "otro")
+
+    assert transcript_store.get("dQw4w9WgXcQ", "es", "captions") == "hola"
+    assert transcript_store.get("dQw4w9WgXcQ", "auto", "whisper") == "hello"
+    assert transcript_store.get("dQw4w9WgXcQ", "en", "captions") is None
+
+    assert transcript_store.invalidate("dQw4w9WgXcQ", source="whisper") == 1
+    assert transcript_store.get("dQw4w9WgXcQ", "auto", "whisper") is None
+    assert transcript_store.invalidate("dQw4w9WgXcQ") == 1
+    assert transcript_store.get("otherVideo1", "es", "captions") == "otro"
+
+
+def test_transcript_store_persists_between_instances(tmp_path):
+    TranscriptStore(tmp_path).put("dQw4w9WgXcQ", "es", "captions", "hola")
+    assert TranscriptStore(tmp_path).get("dQw4w9WgXcQ", "es", "captions") == "hola"
+
+
+def test_transcript_store_clear(transcript_store):
+    transcript_store.put("dQw4w9WgXcQ", "es", "captions", "hola")
+    transcript_store.clear()
+    assert transcript_store.get("dQw4w9WgXcQ", "es", "captions") is None
@@ -2,16 +2,24 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 from utils.url_processor import URLProcessor
+from utils.transcript_store import TranscriptStore
 
 
 @pytest.fixture
-def url_processor():
+def transcript_store(tmp_path):
+    return TranscriptStore(tmp_path / "transcripts")
+
+
+@pytest.fixture
+def url_processor(transcript_store, tmp_path):
     with patch('utils.url_processor.VideoProcessor') as mock_video_processor:
         # Create a mock instance that will be returned when VideoProcessor is instantiated
         mock_instance = MagicMock()
         mock_video_processor.return_value = mock_instance
-        processor = URLProcessor("fake-api-key")
+        processor = URLProcessor("fake-api-key", transcript_store=transcript_store)
         # Now processor.video_processor is our mock instance
+        processor.download_path = tmp_path / "downloads"
+        processor.download_path.mkdir()
         yield processor
 
 
@@ -43,7 +51,7 @@ def test_init(url_processor):
 @patch('yt_dlp.YoutubeDL')
 def test_download_video(mock_ytdl, url_processor, youtube_url):
     mock_instance = MagicMock()
-    mock_instance.extract_info.return_value = {"title": "Test Video"}
+    mock_instance.extract_info.return_value = {"id": "dQw4w9WgXcQ", "title": "Test Video"}
     mock_ytdl.return_value.__enter__.return_value = mock_instance
 
     result = url_processor.download_video(youtube_url)
@@ -51,6 +59,72 @@ def test_download_video(mock_ytdl, url_processor, youtube_url):
     assert result.endswith(".mp3")
 
 
+class FakeYoutubeDL:
+    """Local stand-in for yt_dlp.YoutubeDL that records every extractor call."""
+    instances = []
+
+    def __init__(self, params=None):
+        self.params = params or {}
+        self.calls = []
+        FakeYoutubeDL.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True):
+        self.calls.append((url, download))
+        for hook in self.params.get("progress_hooks", []):
+            hook({"status": "downloading", "downloaded_bytes": 50, "total_bytes": 100})
+            hook({"status": "finished"})
+        path = self.params["outtmpl"].replace("%(id)s", "dQw4w9WgXcQ").replace("%(ext)s", "mp3")
+        return {"id": "dQw4w9WgXcQ", "title": "Fake", "requested_downloads": [{"filepath": path}]}
+
+
+def test_download_video_single_extractor_call(url_processor, youtube_url, monkeypatch):
+    FakeYoutubeDL.instances = []
+    monkeypatch.setattr('yt_dlp.YoutubeDL', FakeYoutubeDL)
+    progress = MagicMock()
+
+    result = url_processor.download_video(youtube_url, progress)
+
+    assert len(FakeYoutubeDL.instances) == 1
+    assert FakeYoutubeDL.instances[0].calls == [(youtube_url, True)]
+    assert Path(result).name == "dQw4w9WgXcQ.mp3"
+    assert Path(result).parent.parent == url_processor.download_path.resolve()
+    progress.assert_any_call(pytest.approx(0.3), "Descargando audio...")
+    progress.assert_called_with(0.5, "Audio descargado. Procesando...")
+
+
+def test_concurrent_downloads_use_separate_directories(url_processor, youtube_url, monkeypatch):
+    monkeypatch.setattr('yt_dlp.YoutubeDL', FakeYoutubeDL)
+
+    first = url_processor.download_video(youtube_url)
+    second = url_processor.download_video(youtube_url)
+
+    assert first != second
+    for path in (first, second):
+        Path(path).write_bytes(b"audio")
+    url_processor.remove_download(first)
+    assert not Path(first).parent.exists()
+    assert Path(second).exists()
+    url_processor.remove_download(second)
+
+
+def test_download_video_audio_range(url_processor, youtube_url, monkeypatch):
+    FakeYoutubeDL.instances = []
+    monkeypatch.setattr('yt_dlp.YoutubeDL', FakeYoutubeDL)
+
+    url_processor.download_video(youtube_url, start_time=60, end_time=120)
+
+    params = FakeYoutubeDL.instances[0].params
+    ranges = list(params["download_ranges"]({}, None))
+    assert ranges == [{"start_time": 60, "end_time": 120}]
+    assert params["force_keyframes_at_cuts"] is True
+
+
 @patch('yt_dlp.YoutubeDL')
 def test_download_video_error(mock_ytdl, url_processor, youtube_url):
     mock_ytdl.side_effect = Exception("Download error")
@@ -76,6 +150,31 @@ def test_process_youtube_url_invalid_url(mock_get_video_id, url_processor, youtu
     assert result == "URL inválida"
 
 
+@patch('docs.youtube_processor.YoutubeProcessor.get_video_id')
+@patch('docs.youtube_processor.YoutubeProcessor.download_transcript')
+def test_failed_transcription_removes_download(mock_download_transcript, mock_get_video_id,
+                                               url_processor, youtube_url, video_id, monkeypatch):
+    mock_get_video_id.return_value = video_id
+    mock_download_transcript.side_effect = Exception("No direct transcript")
+    monkeypatch.setattr('yt_dlp.YoutubeDL', FakeYoutubeDL)
+    downloads = []
+
+    def download(url, progress=None):
+        path = URLProcessor.download_video(url_processor, url)
+        Path(path).write_bytes(b"audio")
+        downloads.append(path)
+        return path
+
+    monkeypatch.setattr(url_processor, "download_video", download)
+    url_processor.video_processor.process_media.side_effect = Exception("Whisper down")
+
+    result = url_processor.process_youtube_url(youtube_url, progress=MagicMock())
+
+    assert "Whisper down" in result
+    assert not Path(downloads[0]).parent.exists()
+    assert list(url_processor.download_path.iterdir()) == []
+
+
 @patch('docs.youtube_processor.YoutubeProcessor.get_video_id')
 @patch('docs.youtube_processor.YoutubeProcessor.download_transcript')
 @patch.object(URLProcessor, 'download_video')
@@ -106,5 +205,49 @@ def test_process_youtube_url_download_error(mock_download_video, mock_download_t
     assert "Error en el procesamiento" in result
 
 
+@patch('docs.youtube_processor.YoutubeProcessor.download_transcript')
+def test_process_youtube_url_reuses_stored_captions(mock_download_transcript, url_processor,
+                                                    youtube_url, transcript_text):
+    mock_download_transcript.return_value = transcript_text
+
+    first = url_processor.process_youtube_url(youtube_url)
+    second = url_processor.process_youtube_url(youtube_url)
+
+    assert first == second
+    mock_download_transcript.assert_called_once()
+
+
+@patch('docs.youtube_processor.YoutubeProcessor.download_transcript')
+@patch.object(URLProcessor, 'download_video')
+@patch('os.remove')
+def test_process_youtube_url_reuses_stored_whisper_transcript(mock_remove, mock_download_video,
+                                                              mock_download_transcript, url_processor,
+                                                              youtube_url, audio_path, transcript_text):
+    mock_download_transcript.return_value = None
+    mock_download_video.return_value = audio_path
+    url_processor.video_processor.process_media.return_value = ("transcript.txt", transcript_text)
+
+    url_processor.process_youtube_url(youtube_url)
+    result = url_processor.process_youtube_url(youtube_url)
+
+    assert "Transcripción generada por IA" in result
+    assert transcript_text in result
+    # The cache is checked before any network call
+    mock_download_transcript.assert_called_once()
+    mock_download_video.assert_called_once()
+
+
+@patch('docs.youtube_processor.YoutubeProcessor.download_transcript')
+def test_invalidate_transcript_forces_refetch(mock_download_transcript, url_processor, youtube_url):
+    mock_download_transcript.side_effect = ["old text", "new text"]
+
+    url_processor.process_youtube_url(youtube_url)
+    assert url_processor.invalidate_transcript(youtube_url) == 1
+    result = url_processor.process_youtube_url(youtube_url)
+
+    assert "new text" in result
+    assert mock_download_transcript.call_count == 2
+
+
 if __name__ == "__main__":
     pytest.main(["-v"])
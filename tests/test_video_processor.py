@@ -52,6 +52,71 @@ def test_extract_audio(mock_videoclip, video_processor, sample_video_path):
     assert isinstance(output_path, str)
 
 
+def probe_output(codec):
+    return MagicMock(returncode=1, stderr=(
+        "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'lecture.mp4':\n"
+        "  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p\n"
+        f"  Stream #0:1[0x2](und): Audio: {codec} (LC) (mp4a / 0x6134706D), 44100 Hz, stereo\n"))
+
+
+@patch('moviepy.editor.VideoFileClip')
+@patch('audio.video_processor.subprocess.run')
+def test_extract_audio_copies_supported_codec(mock_run, mock_videoclip, video_processor):
+    mock_run.side_effect = [probe_output("aac"), MagicMock(returncode=0, stderr="")]
+
+    output_path = video_processor.extract_audio("videos/lecture.mp4")
+
+    assert output_path == str(Path("videos") / "lecture.m4a")
+    copy_cmd = mock_run.call_args_list[1].args[0]
+    assert copy_cmd[copy_cmd.index("-c:a") + 1] == "copy"
+    assert copy_cmd[-1] == output_path
+    mock_videoclip.assert_not_called()
+    assert set(video_processor.timings) == {"probe", "copy"}
+
+
+@patch('moviepy.editor.VideoFileClip')
+@patch('audio.video_processor.subprocess.run')
+def test_extract_audio_reencodes_unsupported_codec(mock_run, mock_videoclip, video_processor):
+    mock_run.return_value = probe_output("ac3")
+
+    output_path = video_processor.extract_audio("videos/lecture.mp4")
+
+    assert output_path.endswith("lecture.mp3")
+    assert mock_run.call_count == 1
+    kwargs = mock_videoclip.return_value.audio.write_audiofile.call_args.kwargs
+    assert kwargs["ffmpeg_params"] == ["-ac", "1"]
+    assert kwargs["bitrate"] == "64k"
+    assert set(video_processor.timings) == {"probe", "encode"}
+
+
+@patch('moviepy.editor.VideoFileClip')
+@patch('audio.video_processor.subprocess.run')
+def test_extract_audio_falls_back_when_copy_fails(mock_run, mock_videoclip, video_processor):
+    mock_run.side_effect = [probe_output("aac"), MagicMock(returncode=1, stderr="boom")]
+
+    output_path = video_processor.extract_audio("videos/lecture.mp4")
+
+    assert output_path == str(Path("videos") / "lecture.mp3")
+    mock_videoclip.return_value.audio.write_audiofile.assert_called_once()
+
+
+def test_extract_audio_stream_copy_real_file(video_processor, tmp_path):
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    import subprocess
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    video_path = tmp_path / "clip.mp4"
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "sine=d=1", "-f", "lavfi", "-i", "color=d=1:s=64x64",
+                    "-c:a", "aac", "-c:v", "mpeg4", "-shortest", str(video_path)], check=True)
+    video_processor.ffmpeg = ffmpeg
+
+    assert video_processor.probe_audio_codec(str(video_path)) == "aac"
+    output_path = video_processor.extract_audio(str(video_path))
+
+    assert output_path == str(tmp_path / "clip.m4a")
+    assert (tmp_path / "clip.m4a").stat().st_size > 0
+
+
 @patch('openai.OpenAI')
 def test_transcribe_audio(mock_openai, video_processor, sample_audio_path, sample_transcript):
     from audio.video_processor import VideoProcessor
@@ -68,6 +133,67 @@ def test_transcribe_audio(mock_openai, video_processor, sample_audio_path, sampl
     mock_client.audio.transcriptions.create.assert_called_once()
 
 
+def test_transcribe_audio_async(video_processor, sample_audio_path, sample_transcript):
+    import asyncio
+    from unittest.mock import AsyncMock
+    video_processor.async_client = MagicMock()
+    video_processor.async_client.audio.transcriptions.create = AsyncMock(
+        return_value=MagicMock(text=sample_transcript))
+
+    with patch('builtins.open', mock_open()):
+        result = asyncio.run(video_processor.transcribe_audio_async(sample_audio_path))
+
+    assert result == sample_transcript
+    video_processor.async_client.audio.transcriptions.create.assert_awaited_once()
+
+
+def test_transcribe_audio_chunks_large_files(video_processor, tmp_path):
+    audio_path = tmp_path / "lecture.mp3"
+    audio_path.write_bytes(b"0" * 2048)
+    video_processor.chunk_min_bytes = 1024
+    video_processor.chunker = MagicMock()
+    video_processor.chunker.split.return_value = ["c0.mp3", "c1.mp3", "c2.mp3"]
+    texts = {"c0.mp3": "Uno dos tres", "c1.mp3": "dos tres cuatro", "c2.mp3": "cinco"}
+
+    with patch.object(video_processor, "_transcribe_file", side_effect=texts.get) as mock_file:
+        result = video_processor.transcribe_audio(str(audio_path))
+
+    assert mock_file.call_count == 3
+    assert result == "Uno dos tres cuatro cinco"
+
+
+def test_transcribe_audio_small_file_single_request(video_processor, tmp_path):
+    audio_path = tmp_path / "short.mp3"
+    audio_path.write_bytes(b"0" * 10)
+    video_processor.chunker = MagicMock()
+
+    with patch.object(video_processor, "_transcribe_file", return_value="texto") as mock_file:
+        assert video_processor.transcribe_audio(str(audio_path)) == "texto"
+
+    mock_file.assert_called_once_with(str(audio_path))
+    video_processor.chunker.split.assert_not_called()
+
+
+def test_transcribe_chunked_async(video_processor, tmp_path):
+    import asyncio
+    from unittest.mock import AsyncMock
+    audio_path = tmp_path / "lecture.mp3"
+    audio_path.write_bytes(b"0" * 2048)
+    video_processor.chunk_min_bytes = 1024
+    video_processor.chunker = MagicMock()
+    video_processor.chunker.split.return_value = ["c0.mp3", "c1.mp3"]
+
+    async def fake_transcribe(path):
+        # The first chunk finishes last: order must still be preserved
+        await asyncio.sleep(0.02 if path == "c0.mp3" else 0)
+        return {"c0.mp3": "hola a todos", "c1.mp3": "a todos y bienvenidos"}[path]
+
+    with patch.object(video_processor, "_transcribe_file_async", AsyncMock(side_effect=fake_transcribe)):
+        result = asyncio.run(video_processor.transcribe_audio_async(str(audio_path)))
+
+    assert result == "hola a todos y bienvenidos"
+
+
 @patch('audio.video_processor.VideoProcessor.extract_audio')
 @patch('audio.video_processor.VideoProcessor.transcribe_audio')
 @patch('audio.video_processor.VideoProcessor.save_transcript')
@@ -3,11 +3,13 @@ from pathlib import Path
 import json
 from unittest.mock import Mock, patch
 from core.voice import VoiceGenerator
+from utils import metrics
+from utils.clip_cache import ClipCache
 
 
 @pytest.fixture
-def voice_generator():
-    return VoiceGenerator(api_key="test_key")
+def voice_generator(tmp_path):
+    return VoiceGenerator(api_key="test_key", clip_cache=ClipCache(tmp_path / "cache"))
 
 
 @pytest.fixture
@@ -59,3 +61,151 @@ def test_generate_podcast(mock_concatenate, mock_process, voice_generator, sampl
 def test_generate_podcast_empty(voice_generator):
     result = voice_generator.generate_podcast("{}")
     assert result == ""
+
+
+def test_process_script_keeps_order(voice_generator, tmp_path):
+    import time
+    voice_generator.output_dir = tmp_path
+    voice_generator.max_workers = 4
+    script = json.dumps({"dialogue": [
+        {"character": "Anfitrion", "message": f"Line {i}"} for i in range(6)
+    ]})
+
+    def slow_speech(text, voice, filename):
+        # Earlier lines finish last to force out-of-order completion
+        time.sleep(0.05 * (6 - int(text.split()[-1])))
+        return str(tmp_path / filename)
+
+    with patch.object(voice_generator, 'generate_speech', side_effect=slow_speech):
+        audio_files = voice_generator.process_script(script)
+
+    assert [f["message"] for f in audio_files] == [f"Line {i}" for i in range(6)]
+    assert audio_files[0]["audio_path"].endswith("1_Anfitrion.mp3")
+
+
+@patch('core.voice.time.sleep')
+def test_create_speech_retries_on_rate_limit(mock_sleep, voice_generator):
+    import httpx
+    from openai import RateLimitError
+    response = httpx.Response(
+        429, request=httpx.Request("POST", "https://api.openai.com"))
+    rate_limit = RateLimitError("Rate limit", response=response, body=None)
+    voice_generator.client = Mock()
+    voice_generator.client.audio.speech.create.side_effect = [
+        rate_limit, rate_limit, "audio"]
+
+    with metrics.episode() as report:
+        result = voice_generator._create_speech("Hola", "onyx")
+
+    assert result == "audio"
+    assert voice_generator.client.audio.speech.create.call_count == 3
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 2.0]
+    tts = report.snapshot()["voice"]["tts"]
+    assert (tts["calls"], tts["retries"], tts["errors"], tts["bytes_out"]) == (1, 2, 0, 4)
+
+
+def test_generate_speech_uses_clip_cache(voice_generator, tmp_path):
+    voice_generator.output_dir = tmp_path
+    voice_generator.client = Mock()
+    voice_generator.client.audio.speech.create.return_value.write_to_file.side_effect = (
+        lambda path: Path(path).write_bytes(b"mp3-data"))
+
+    first = voice_generator.generate_speech("Hola  mundo", "onyx", "1_Anfitrion.mp3")
+    second = voice_generator.generate_speech("Hola mundo", "onyx", "2_Anfitrion.mp3")
+
+    assert voice_generator.client.audio.speech.create.call_count == 1
+    assert Path(second).read_bytes() == Path(first).read_bytes() == b"mp3-data"
+    assert voice_generator.clip_cache.hits == 1
+    assert voice_generator.clip_cache.misses == 1
+
+
+def test_generate_speech_async_keeps_file_io_off_the_event_loop(voice_generator, tmp_path):
+    import asyncio
+    import threading
+    voice_generator.output_dir = tmp_path
+    voice_generator.async_client = Mock()
+    response = Mock()
+    response.write_to_file.side_effect = lambda path: Path(path).write_bytes(b"mp3-data")
+
+    async def fake_create(**kwargs):
+        return response
+    voice_generator.async_client.audio.speech.create = fake_create
+
+    io_threads = []
+    fetch, put = voice_generator.clip_cache.fetch, voice_generator.clip_cache.put
+    with patch.object(voice_generator.clip_cache, "fetch",
+                      side_effect=lambda *args: io_threads.append(threading.get_ident()) or fetch(*args)), \
+            patch.object(voice_generator.clip_cache, "put",
+                         side_effect=lambda *args: io_threads.append(threading.get_ident()) or put(*args)):
+        async def run():
+            loop_thread = threading.get_ident()
+            first = await voice_generator.generate_speech_async("Hola mundo", "onyx", "1_Anfitrion.mp3")
+            second = await voice_generator.generate_speech_async("Hola mundo", "onyx", "2_Anfitrion.mp3")
+            return loop_thread, first, second
+        loop_thread, first, second = asyncio.run(run())
+
+    assert Path(second).read_bytes() == Path(first).read_bytes() == b"mp3-data"
+    # fetch + put for the first line, fetch (a hit) for the second
+    assert len(io_threads) == 3
+    assert loop_thread not in io_threads
+
+
+def test_generate_podcast_resumes_from_checkpoint(voice_generator, sample_script, tmp_path):
+    from core.checkpoint import RunCheckpoint
+    checkpoint = RunCheckpoint(tmp_path / "run")
+    voice_generator.clip_cache.max_bytes = 0  # Force the checkpoint to do the work
+    voice_generator.client = Mock()
+    responses = iter([b"clip-1", b"clip-2", b"clip-2-again"])
+    voice_generator.client.audio.speech.create.side_effect = lambda **kwargs: Mock(
+        write_to_file=lambda path, data=next(responses): Path(path).write_bytes(data))
+
+    def fake_assemble(clips, output):
+        Path(output).write_bytes(b"mix")
+        return str(output)
+
+    with patch.object(voice_generator.assembler, 'assemble', side_effect=fake_assemble) as mock_assemble:
+        first = voice_generator.generate_podcast(sample_script, checkpoint=checkpoint)
+        assert voice_generator.client.audio.speech.create.call_count == 2
+        assert first == tmp_path / "run" / "audio" / "podcast_final.mp3"
+
+        # Everything valid: no API call and no new mix
+        voice_generator.generate_podcast(sample_script, checkpoint=checkpoint)
+        assert voice_generator.client.audio.speech.create.call_count == 2
+        assert mock_assemble.call_count == 1
+
+        # A corrupted clip is synthesized again and the mix is rebuilt
+        (tmp_path / "run" / "audio" / "2_Participante.mp3").write_bytes(b"broken")
+        voice_generator.generate_podcast(sample_script, checkpoint=checkpoint)
+
+    assert voice_generator.client.audio.speech.create.call_count == 3
+    assert mock_assemble.call_count == 2
+    assert voice_generator.checkpoint is None
+
+
+def test_process_script_async_keeps_order(voice_generator, tmp_path):
+    import asyncio
+    voice_generator.output_dir = tmp_path
+    voice_generator.max_workers = 2
+    script = json.dumps({"dialogue": [
+        {"character": "Participante", "message": f"Line {i}"} for i in range(4)
+    ]})
+    running = []
+    peak = []
+
+    async def fake_speech(text, voice, filename):
+        running.append(text)
+        peak.append(len(running))
+        await asyncio.sleep(0.01 * (4 - int(text.split()[-1])))
+        running.remove(text)
+        return str(tmp_path / filename)
+
+    with patch.object(voice_generator, 'generate_speech_async', side_effect=fake_speech):
+        audio_files = asyncio.run(voice_generator.process_script_async(script))
+
+    assert [f["message"] for f in audio_files] == [f"Line {i}" for i in range(4)]
+    assert max(peak) == 2
+
+
+def test_get_voice_for_character_by_script_name(voice_generator):
+    voice_generator.characters["Anfitrion"].name = "Alfonso"
+    assert voice_generator._get_voice_for_character("Alfonso") == "onyx"
@@ -1,5 +1,5 @@
 import gradio as gr  # type: ignore
-from typing import TYPE_CHECKING, cast, Literal
+from typing import TYPE_CHECKING, Iterator, cast, Literal
 from ui.theme import PodIATheme
 from utils.constants import (
     AVAILABLE_TRANSCRIPT_MODELS,
@@ -33,6 +33,10 @@ class PodIAUI:
         # future script_generated = gr.State(False)
 
         with gr.Blocks(theme=self.theme, title="🎙️ PodIA - Generador de Podcasts Inteligente", css=PodIATheme.css) as app:
+            # Contexto de pipeline propio de cada pestaña del navegador. Una lambda y no el
+            # método: gr.State hace deepcopy de su valor y copiaría toda la instancia
+            session = gr.State(lambda: self.podia.new_session())
+
             gr.Markdown(""" 
                 # 🎙️ PodIA - Generador de Podcasts Inteligente
                 ### Transforma cualquier contenido en un podcast interactivo
@@ -88,6 +92,8 @@ class PodIAUI:
                         2. **📝 Generar Resumen**: Una vez extraído el texto, este botón creará un resumen conciso del contenido.
                         3. **🎭 Generar Guión**: Usando el resumen, este botón creará un guión conversacional para el podcast.
                         4. **🎙️ Generar Podcast**: Finalmente, este botón convertirá el guión en un podcast de audio.
+                        
+                        > **⚡ Atajo**: Tras generar el resumen, este botón crea el guión y sintetiza cada intervención mientras se escribe la siguiente.
                     """)
 
                     extract_text_btn = gr.Button(
@@ -98,6 +104,8 @@ class PodIAUI:
                         "🎭 Generar Guión", variant="primary")
                     generate_podcast_btn = gr.Button(
                         "🎙️ Generar Podcast de Audio", variant="primary")
+                    generate_all_btn = gr.Button(
+                        "⚡ Generar Guión y Podcast a la vez", variant="secondary")
 
                     process_status = gr.Textbox(
                         label="Estado del Proceso",
@@ -207,6 +215,36 @@ class PodIAUI:
                                     "waveform_color": "pink", "show_controls": True},
                             )
 
+                with gr.TabItem("📋 Trabajos"):
+                    gr.Markdown(""" 
+                        ### 📋 Trabajos en segundo plano
+                        Encola la generación completa del episodio (texto, resumen, guión y audio) con el contenido de la pestaña de entrada.
+                        Puede cerrar el navegador: guarde el identificador y consulte el estado más tarde. Si la aplicación se reinicia, el trabajo continúa desde la última etapa completada.
+                    """)
+
+                    submit_job_btn = gr.Button(
+                        "📥 Encolar Episodio Completo", variant="primary")
+                    job_id_input = gr.Textbox(
+                        label="ID del Trabajo",
+                        placeholder="Identificador devuelto al encolar"
+                    )
+                    with gr.Row():
+                        check_job_btn = gr.Button(
+                            "🔄 Consultar Estado", variant="secondary")
+                        retry_job_btn = gr.Button(
+                            "🔁 Reintentar Trabajo Fallido", variant="secondary")
+                    job_status = gr.Textbox(
+                        label="Estado del Trabajo",
+                        interactive=False,
+                        elem_classes=["status-box"]
+                    )
+                    job_details = gr.JSON(label="Detalle del Trabajo")
+                    job_podcast = gr.Audio(
+                        label="Podcast del Trabajo",
+                        type="filepath",
+                        interactive=False
+                    )
+
                 with gr.TabItem("⚙️ Configuración"):
                     gr.Markdown(""" 
                         ### ⚙️ Configuración de Modelos
@@ -268,44 +306,92 @@ class PodIAUI:
                     gr.update(visible=choice == VIDEO_INPUT)
                 )
 
-            def extract_text(input_type_val: str, *args) -> tuple[str, str]:
+            def clean_input_type(input_type_val: str) -> str:
+                return input_type_val.replace(PDF_INPUT, "PDF").replace(
+                    URL_INPUT, "URL").replace(VIDEO_INPUT, "Video/Audio")
+
+            async def extract_text(podia, input_type_val: str, *args) -> tuple[str, str]:
                 try:
-                    input_type_clean = input_type_val.replace(PDF_INPUT, "PDF").replace(
-                        URL_INPUT, "URL").replace(VIDEO_INPUT, "Video/Audio")
-                    result = self.podia.extract_text(
+                    input_type_clean = clean_input_type(input_type_val)
+                    result = await podia.extract_text_async(
                         input_type_clean, args[0], args[1], args[2])
                     status = "✅ Texto extraído correctamente. Puede continuar con 'Generar Resumen' en la pestaña de Resultados."
                     return result, status
                 except Exception as e:
                     return "", f"❌ Error al extraer texto: {str(e)}"
 
-            def generate_summary(content: str) -> tuple[str, str]:
+            async def generate_summary(podia, content: str) -> tuple[str, str]:
                 try:
-                    result = self.podia.generate_summary(content)
+                    result = await podia.generate_summary_async(content)
                     status = "✅ Resumen generado correctamente. Puede continuar con 'Generar Guión' en la pestaña de Resultados."
                     return result, status
                 except Exception as e:
                     return "", f"❌ Error al generar resumen: {str(e)}"
 
-            def generate_script(summary: str) -> tuple[dict, str]:
+            def generate_script(podia, summary: str) -> Iterator[tuple[dict, str]]:
+                # Generador: Gradio pinta cada turno mientras se escribe
                 try:
-                    result = self.podia.generate_script(summary)
+                    result = {}
+                    for result in podia.stream_script(summary):
+                        yield result, "⏳ Generando guión..."
                     status = "✅ Guión generado correctamente. Puede continuar con 'Generar Podcast' en la pestaña de Resultados."
-                    return result, status
+                    yield result, status
                 except Exception as e:
-                    return {}, f"❌ Error al generar guión: {str(e)}"
+                    yield {}, f"❌ Error al generar guión: {str(e)}"
 
-            def generate_podcast(script: dict) -> tuple[str | None, str, gr.update]:
+            async def generate_podcast(podia, script: dict) -> tuple[str | None, str]:
                 try:
                     if not script:
-                        return None, "❌ Error: No hay guión disponible para generar el podcast", gr.update(visible=False)
+                        return None, "❌ Error: No hay guión disponible para generar el podcast"
+
+                    audio_path = await podia.generate_podcast_async(script)
+                    if audio_path:
+                        return str(audio_path), "✅ Podcast generado correctamente. Puede reproducirlo con el botón."
+                    return None, "❌ Error: No se pudo generar el audio del podcast"
+                except Exception as e:
+                    return None, f"❌ Error al generar podcast: {str(e)}"
 
-                    audio_path = self.podia.generate_podcast(script)
+            def generate_script_and_podcast(podia, summary: str) -> tuple[dict | str, str | None, str]:
+                try:
+                    script, audio_path = podia.generate_script_and_podcast(summary)
                     if audio_path:
-                        return audio_path, "✅ Podcast generado correctamente. Puede reproducirlo con el botón.", gr.update(visible=True)
-                    return None, "❌ Error: No se pudo generar el audio del podcast", gr.update(visible=False)
+                        return script, audio_path, "✅ Guión y podcast generados correctamente."
+                    return script, None, "❌ Error: No se pudo generar el audio del podcast"
+                except Exception as e:
+                    return {}, None, f"❌ Error al generar guión y podcast: {str(e)}"
+
+            def submit_job(podia, input_type_val: str, *args) -> tuple[str, str]:
+                try:
+                    # El trabajo guarda la configuración de modelos y voces de la sesión
+                    job_id = podia.submit_job(
+                        clean_input_type(input_type_val), args[0], args[1], args[2])
+                    return job_id, f"✅ Trabajo encolado: {job_id}"
                 except Exception as e:
-                    return None, f"❌ Error al generar podcast: {str(e)}", gr.update(visible=False)
+                    return "", f"❌ Error al encolar el trabajo: {str(e)}"
+
+            def check_job(job_id: str) -> tuple[str, dict, str | None]:
+                job = self.podia.job_status(job_id)
+                if job is None:
+                    return "❌ Trabajo no encontrado", {}, None
+                details = {
+                    "estado": job["status"],
+                    "ultima_etapa": job["stage"],
+                    "error": job["error"],
+                    "resumen": job["results"].get("summary"),
+                    "guion": job["results"].get("script")
+                }
+                status = {
+                    "queued": "⏳ En cola",
+                    "running": f"⚙️ En proceso (última etapa completada: {job['stage'] or 'ninguna'})",
+                    "done": "✅ Trabajo completado",
+                    "failed": f"❌ Error: {job['error']}"
+                }.get(job["status"], job["status"])
+                return status, details, job["results"].get("podcast")
+
+            def retry_job(job_id: str) -> str:
+                if self.podia.retry_job(job_id):
+                    return "🔁 Trabajo reencolado desde la última etapa completada"
+                return "❌ Solo se pueden reintentar trabajos fallidos"
 
             def update_voice_choices(gender: str) -> gr.update:
                 """Update voice choices based on selected gender"""
@@ -313,6 +399,12 @@ class PodIAUI:
                               "male" else FEMALE_VOICES)
                 return gr.update(choices=voices, value=voices[0])
 
+            def update_models_config(podia, *models: str) -> str:
+                return podia.update_models_config(*models)
+
+            def update_voice_config(podia, *voices: str) -> str:
+                return podia.update_voice_config(*voices)
+
             # Evento para cambiar visibilidad
             input_type.change(
                 fn=update_visibility,
@@ -322,32 +414,56 @@ class PodIAUI:
 
             extract_text_btn.click(
                 fn=extract_text,
-                inputs=[input_type, pdf_input, url_input, media_input],
+                inputs=[session, input_type, pdf_input, url_input, media_input],
                 outputs=[content_output, process_status]
             )
 
             generate_summary_btn.click(
                 fn=generate_summary,
-                inputs=[content_output],
+                inputs=[session, content_output],
                 outputs=[summary_output, process_status]
             )
 
             generate_script_btn.click(
                 fn=generate_script,
-                inputs=[summary_output],
+                inputs=[session, summary_output],
                 outputs=[script_output, process_status]
             )
 
             generate_podcast_btn.click(
                 fn=generate_podcast,
-                inputs=[script_output],
+                inputs=[session, script_output],
                 outputs=[podcast_output, process_status]
             )
 
+            generate_all_btn.click(
+                fn=generate_script_and_podcast,
+                inputs=[session, summary_output],
+                outputs=[script_output, podcast_output, process_status]
+            )
+
+            submit_job_btn.click(
+                fn=submit_job,
+                inputs=[session, input_type, pdf_input, url_input, media_input],
+                outputs=[job_id_input, job_status]
+            )
+
+            check_job_btn.click(
+                fn=check_job,
+                inputs=[job_id_input],
+                outputs=[job_status, job_details, job_podcast]
+            )
+
+            retry_job_btn.click(
+                fn=retry_job,
+                inputs=[job_id_input],
+                outputs=[job_status]
+            )
+
             # Add event handler for configuration
             save_config_btn.click(
-                fn=self.podia.update_models_config,
-                inputs=[transcript_model, summary_model,
+                fn=update_models_config,
+                inputs=[session, transcript_model, summary_model,
                         script_model, voice_model],
                 outputs=config_status
             )
@@ -365,8 +481,8 @@ class PodIAUI:
             )
 
             update_voices_btn.click(
-                fn=self.podia.update_voice_config,
-                inputs=[host_name, host_gender, host_voice,
+                fn=update_voice_config,
+                inputs=[session, host_name, host_gender, host_voice,
                         guest_name, guest_gender, guest_voice],
                 outputs=[voices_status]
             )
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from utils.constants import CLIP_CACHE_DIR, CLIP_CACHE_MAX_BYTES
+
+
+class ClipCache:
+    """
+    Caché persistente en disco para los clips de voz generados por TTS.
+
+    Cada clip se guarda con el hash de (modelo, voz, texto normalizado) como
+    nombre, de modo que una línea ya sintetizada nunca vuelve a pedirse a la API.
+    Cuando el tamaño total supera `max_bytes` se eliminan los clips usados
+    hace más tiempo (LRU según la fecha de modificación, que se actualiza en
+    cada acierto).
+
+    Attributes:
+        cache_dir (Path): Directorio donde se guardan los clips.
+        max_bytes (int): Tamaño máximo de la caché en bytes.
+        hits (int): Número de aciertos desde que se creó la instancia.
+        misses (int): Número de fallos desde que se creó la instancia.
+    """
+
+    def __init__(self, cache_dir: str | Path = CLIP_CACHE_DIR, max_bytes: int = CLIP_CACHE_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Colapsa los espacios para que cambios de formato no invaliden el clip"""
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, model: str, voice: str, text: str) -> str:
+        """Devuelve la clave de caché de un clip"""
+        raw = "\0".join([model, voice, cls.normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _clip_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp3"
+
+    def get(self, key: str) -> Path | None:
+        """
+        Busca un clip en la caché.
+
+        Args:
+            key (str): Clave generada con `make_key`.
+
+        Returns:
+            Path | None: Ruta del clip cacheado o None si no existe.
+        """
+        path = self._clip_path(key)
+        with self._lock:
+            if path.exists():
+                # Marcar como usado recientemente
+                os.utime(path)
+                self.hits += 1
+                return path
+            self.misses += 1
+            return None
+
+    def fetch(self, key: str, destination: str | Path) -> bool:
+        """Copia el clip cacheado a `destination`. Devuelve False si no existe"""
+        cached = self.get(key)
+        if cached is None:
+            return False
+        try:
+            shutil.copyfile(cached, destination)
+            return True
+        except FileNotFoundError:
+            # Eliminado por otro proceso entre get() y la copia
+            return False
+
+    def put(self, key: str, source: str | Path) -> Path:
+        """
+        Guarda una copia de `source` en la caché y aplica la política de expulsión.
+
+        Args:
+            key (str): Clave generada con `make_key`.
+            source (str | Path): Ruta del clip recién generado.
+
+        Returns:
+            Path: Ruta del clip dentro de la caché.
+        """
+        path = self._clip_path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp_path)
+        # Reemplazo atómico para que un lector nunca vea un clip a medias
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Elimina los clips menos usados hasta quedar por debajo de `max_bytes`"""
+        with self._lock:
+            clips = []
+            for clip in self.cache_dir.glob("*.mp3"):
+                try:
+                    stat = clip.stat()
+                except FileNotFoundError:
+                    continue
+                clips.append((stat.st_mtime, stat.st_size, clip))
+
+            total = sum(size for _, size, _ in clips)
+            for _, size, clip in sorted(clips, key=lambda c: c[0]):
+                if total <= self.max_bytes:
+                    break
+                clip.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Vacía la caché por completo"""
+        with self._lock:
+            for clip in self.cache_dir.glob("*.mp3"):
+                clip.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve aciertos, fallos, número de clips y tamaño total"""
+        with self._lock:
+            sizes = [clip.stat().st_size for clip in self.cache_dir.glob("*.mp3")]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(sizes),
+                "size_bytes": sum(sizes)
+            }
@@ -20,6 +20,93 @@ SUMMARY_MODEL = "gpt-4o-mini"  # Default model for summary generation
 SCRIPT_MODEL = "gpt-4o-mini"  # Default model for script generation
 VOICE_MODEL = "tts-1"  # Default model for voice generation
 
+# Map-reduce summarization
+SUMMARY_CHUNK_TOKENS = 8000  # Texts longer than this are summarized chunk by chunk
+SUMMARY_MAX_WORKERS = 4  # Chunks summarized in parallel
+
+# PDF extraction
+PDF_PARALLEL_MIN_PAGES = 40  # Documents with at least this many pages use a process pool
+PDF_PAGES_PER_TASK = 8  # Pages extracted by each process pool task
+PDF_MAX_WORKERS = None  # Process pool size, None uses os.cpu_count()
+
+# Script conversation memory
+SCRIPT_MEMORY_WINDOW_TURNS = 4  # Most recent turns sent verbatim to each speaker
+SCRIPT_MEMORY_SUMMARY_TOKENS = 600  # Budget of the rolling summary of older turns
+SCRIPT_PROMPT_MAX_TOKENS = 2500  # Cap on the user prompt of each turn, memory included; the persona goes in the system prompt
+
+# Script streaming
+SCRIPT_STREAM_UPDATE_INTERVAL = 0.1  # Minimum seconds between partial script updates sent to the UI
+
+# Chunked transcription
+TRANSCRIPT_CHUNK_MIN_BYTES = 10 * 1024 * 1024  # Larger audio files are split and transcribed in parallel
+TRANSCRIPT_CHUNK_MS = 5 * 60 * 1000  # Target length of each chunk in milliseconds
+TRANSCRIPT_CHUNK_OVERLAP_MS = 2000  # Audio repeated at the start of each chunk so no word is cut
+TRANSCRIPT_SILENCE_WINDOW_MS = 30 * 1000  # How far before each target cut to look for a pause
+TRANSCRIPT_MAX_WORKERS = 4  # Chunks transcribed in parallel
+TRANSCRIPT_OVERLAP_MAX_WORDS = 30  # Longest repeated run removed when stitching chunks
+
+# Audio extraction
+EXTRACT_AUDIO_BITRATE = "64k"  # Bitrate of the fallback re-encode, enough for speech
+EXTRACT_AUDIO_SAMPLE_RATE = 16000  # Whisper resamples to 16 kHz anyway
+EXTRACT_AUDIO_COPY_FORMATS = {  # Codecs accepted by the transcription endpoint -> container used for the stream copy
+    "mp3": ".mp3",
+    "aac": ".m4a",
+    "flac": ".flac",
+    "opus": ".ogg",
+    "vorbis": ".ogg"
+}
+
+# YouTube transcript store
+TRANSCRIPT_STORE_DIR = "assets/cache/transcripts"  # Transcripts keyed by video id + language + source
+
+# Summary cache
+SUMMARY_PROMPT_VERSION = "1"  # Bump when the summary prompts change to invalidate cached summaries
+SUMMARY_CACHE_DIR = "assets/cache/summary"
+SUMMARY_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds a cached summary stays valid
+SUMMARY_CACHE_MAX_ENTRIES = 500  # Least recently used summaries are evicted above this count
+
+# Checkpointed runs
+RUNS_DIR = "assets/runs"  # One directory per episode run with every stage output and a manifest.json
+EPISODE_COUNTER_PATH = "assets/docs/extra/last_podcast_number.txt"  # Last episode number reserved, where the next search starts
+
+# Batch mode
+BATCH_OUTPUT_DIR = "assets/batch"  # Each batch writes its episodes and report.json under a timestamped folder
+BATCH_CONCURRENCY = 2  # Episodes generated at the same time by batch.py
+
+# Offline benchmark
+BENCHMARK_OUTPUT_DIR = "assets/benchmarks"  # benchmark.py writes one JSON report per run here
+BENCHMARK_EPISODES = 5  # Episodes generated per benchmark run
+BENCHMARK_CONCURRENCY = 1  # Episodes at the same time; peak memory per stage is only exact with 1
+BENCHMARK_PAGES = 3  # Pages of the sample PDF generated for each episode
+BENCHMARK_LATENCY = 0.2  # Seconds the fake OpenAI server waits before answering
+BENCHMARK_JITTER = 0.05  # Random +/- seconds added to that latency
+BENCHMARK_ERROR_RATE = 0.0  # Fraction of fake API requests answered with an error
+BENCHMARK_TOLERANCE = 0.2  # Allowed slowdown against a baseline report before it counts as a regression
+
+# Background jobs
+JOBS_DB_PATH = "assets/jobs/jobs.db"  # SQLite store of queued, running and finished jobs
+JOBS_INPUT_DIR = "assets/jobs/inputs"  # Uploaded files are copied here so jobs survive a restart
+JOBS_MAX_WORKERS = 2  # Episodes generated in parallel by the job queue
+
+# Metrics endpoint
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464  # /metrics (Prometheus) and /metrics.json, started with the UI; None disables it
+
+# Interface sessions
+UI_CONCURRENCY_LIMIT = 8  # Requests of each UI event handled at once; every browser session has its own pipeline context
+
+# Shared OpenAI HTTP pool
+OPENAI_MAX_CONNECTIONS = 20  # Connection cap of each pool; every API key has one sync and one async pool
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 10  # Idle connections kept open for reuse
+OPENAI_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection stays in the pool
+OPENAI_STAGE_TIMEOUTS = {  # Request timeout in seconds for each pipeline stage
+    "transcript": 600.0,
+    "summary": 180.0,
+    "script": 120.0,
+    "voice": 90.0,
+    "default": 120.0
+}
+
 # ? Extras ( No enable to modify)
 
 # Interface configurations
@@ -27,6 +114,28 @@ DEFAULT_NUM_EXCHANGES = 1  # Default number of exchanges in podcast script
 
 # Pause duration in milliseconds
 PAUSE_DURATION = 1000  # Default pause duration in milliseconds
+LEAD_IN_DURATION = 500  # Silence before the first line, in milliseconds
+
+# Final mix
+MIX_TARGET_LUFS = -16.0  # Loudness every clip is normalized to (podcast reference); None disables normalization
+MIX_MAX_GAIN_DB = 20.0  # Largest boost applied to a quiet clip
+MIX_PEAK_CEILING_DB = -1.0  # Normalization never pushes a clip's sample peak above this (dBFS)
+MIX_CODEC = "mp3"  # Codec of the final podcast, a key of MIX_CODECS
+MIX_BITRATE = None  # Bitrate such as "96k"; None uses the codec default below
+MIX_CODECS = {  # ffmpeg encoder, container format, file extension and default bitrate of each codec
+    "mp3": {"encoder": "libmp3lame", "format": "mp3", "extension": ".mp3", "bitrate": "128k"},
+    "opus": {"encoder": "libopus", "format": "ogg", "extension": ".ogg", "bitrate": "64k"},
+    "aac": {"encoder": "aac", "format": "ipod", "extension": ".m4a", "bitrate": "96k"}
+}
+
+# TTS concurrency
+TTS_MAX_WORKERS = 4  # Parallel speech requests per podcast
+TTS_MAX_RETRIES = 3  # Retries per line when the API rate-limits us
+TTS_RETRY_BACKOFF = 1.0  # Base delay in seconds, doubled on every retry
+
+# TTS clip cache
+CLIP_CACHE_DIR = "assets/cache/tts"  # Synthesized clips keyed by model+voice+text
+CLIP_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Least recently used clips are evicted above this size
 
 # Constants for input types
 URL_INPUT = "🌐 URL"
@@ -1,18 +1,76 @@
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple
+from utils.constants import EPISODE_COUNTER_PATH, RUNS_DIR
 
-class Extra:
+
+class EpisodeRun(NamedTuple):
+    """Episodio reservado por `EpisodeAllocator`."""
+    number: int
+    run_id: str
+    title: str
+    run_dir: Path
+
+
+class EpisodeAllocator:
+    """
+    Reserva números de episodio y directorios de ejecución únicos.
+
+    La reserva es la creación del directorio `runs_dir/<run_id>` con
+    `os.mkdir`, que es atómica en cualquier sistema: si dos hilos o procesos
+    eligen el mismo número, solo uno crea el directorio y el otro pasa al
+    siguiente. El archivo `counter_path` guarda el último número reservado y
+    solo indica por dónde empezar a buscar, así que no necesita bloqueo.
+
+    Attributes:
+        runs_dir (Path): Directorio donde se crea el de cada episodio.
+        counter_path (Path): Archivo con el último número reservado.
+    """
+
+    def __init__(self, runs_dir: str | Path = RUNS_DIR, counter_path: str | Path = EPISODE_COUNTER_PATH) -> None:
+        self.runs_dir = Path(runs_dir)
+        self.counter_path = Path(counter_path)
+        self._lock = threading.Lock()
 
     @staticmethod
-    def enumarate_podcast_name():
-        import os
-        file_path = 'assets/docs/extra/last_podcast_number.txt'
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    def run_id_for(number: int) -> str:
+        return f"episode-{number:04d}"
+
+    @staticmethod
+    def title_for(number: int) -> str:
+        return f"Podcast -- PodIA#{number}"
+
+    def _read_counter(self) -> int:
         try:
-            with open(file_path, 'r') as f:
-                last_number = int(f.read().strip())
-        except FileNotFoundError:
-            last_number = 0
-
-        last_number += 1
-        with open(file_path, 'w') as f:
-            f.write(str(last_number))
-        return f"Podcast -- PodIA#{last_number}"
+            return int(self.counter_path.read_text(encoding="utf-8").strip())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_counter(self, number: int) -> None:
+        # Escritura atómica; otro proceso puede dejar un número menor, pero mkdir evita repetirlo
+        self.counter_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.counter_path.with_name(f"{self.counter_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(str(number), encoding="utf-8")
+        os.replace(tmp_path, self.counter_path)
+
+    def allocate(self) -> EpisodeRun:
+        """
+        Reserva el siguiente episodio libre.
+
+        Returns:
+            EpisodeRun: Número, id, título y directorio (ya creado) del episodio.
+        """
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        # El lock solo evita que los hilos de este proceso compitan por el mismo número
+        with self._lock:
+            number = self._read_counter() + 1
+            while True:
+                run_dir = self.runs_dir / self.run_id_for(number)
+                try:
+                    os.mkdir(run_dir)
+                    break
+                except FileExistsError:
+                    number += 1
+            self._write_counter(number)
+        return EpisodeRun(number, self.run_id_for(number), self.title_for(number), run_dir)
@@ -0,0 +1,228 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from utils.constants import METRICS_HOST, METRICS_PORT
+
+# Contadores acumulados por cada par (etapa, operación)
+COUNTERS = ("calls", "errors", "retries", "cache_hits", "cache_misses",
+            "bytes_in", "bytes_out", "prompt_tokens", "completion_tokens")
+
+
+class Metrics:
+    """
+    Registro de métricas en memoria.
+
+    Agrupa las observaciones por etapa del pipeline (extract, transcribe,
+    summary, script, voice, mix...) y operación (chat, tts, whisper, cache,
+    stage...). De cada grupo guarda el tiempo total y máximo y los contadores
+    de `COUNTERS`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], dict[str, float]] = {}
+
+    def observe(self, stage: str, operation: str, seconds: float = 0.0, **counters: float) -> None:
+        """
+        Registra una observación.
+
+        Args:
+            stage (str): Etapa del pipeline.
+            operation (str): Operación dentro de la etapa.
+            seconds (float): Tiempo de reloj de la operación.
+            **counters: Valores que se suman a los contadores de `COUNTERS`.
+        """
+        with self._lock:
+            series = self._series.setdefault(
+                (stage, operation), dict.fromkeys(("seconds", "max_seconds", *COUNTERS), 0))
+            series["seconds"] += seconds
+            series["max_seconds"] = max(series["max_seconds"], seconds)
+            for name, value in counters.items():
+                series[name] += value
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Copia de las métricas agrupadas como {etapa: {operación: valores}}"""
+        with self._lock:
+            snapshot: dict[str, dict[str, dict[str, float]]] = {}
+            for (stage, operation), series in sorted(self._series.items()):
+                snapshot.setdefault(stage, {})[operation] = {
+                    name: round(value, 4) if isinstance(value, float) else value
+                    for name, value in series.items()}
+            return snapshot
+
+    def render(self) -> str:
+        """Métricas en el formato de texto de Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        for name in ("seconds", "max_seconds", *COUNTERS):
+            metric = f"podia_{name}" if name == "max_seconds" else f"podia_{name}_total"
+            lines.append(f"# TYPE {metric} {'gauge' if name == 'max_seconds' else 'counter'}")
+            for stage, operations in snapshot.items():
+                for operation, series in operations.items():
+                    lines.append(f'{metric}{{stage="{stage}",operation="{operation}"}} {series[name]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Borra todas las observaciones"""
+        with self._lock:
+            self._series.clear()
+
+
+# Métricas de todo el proceso, las que publica el endpoint
+REGISTRY = Metrics()
+
+# Métricas del episodio en curso; los hilos las heredan con `in_current_context`
+_episode: contextvars.ContextVar[Metrics | None] = contextvars.ContextVar("podia_episode", default=None)
+
+
+def observe(stage: str, operation: str, seconds: float = 0.0, **counters: float) -> None:
+    """Registra una observación en el registro global y en el episodio en curso"""
+    REGISTRY.observe(stage, operation, seconds, **counters)
+    episode_metrics = _episode.get()
+    if episode_metrics is not None:
+        episode_metrics.observe(stage, operation, seconds, **counters)
+
+
+@contextmanager
+def timer(stage: str, operation: str, **counters: float) -> Iterator[dict[str, float]]:
+    """
+    Mide el tiempo de un bloque y lo registra como una llamada.
+
+    Devuelve un diccionario de contadores que el bloque puede completar
+    (bytes, tokens, reintentos...). Si el bloque lanza una excepción se
+    cuenta también como error.
+
+    Args:
+        stage (str): Etapa del pipeline.
+        operation (str): Operación dentro de la etapa.
+        **counters: Valores iniciales de los contadores.
+    """
+    values: dict[str, float] = {"calls": 1, **counters}
+    start = time.perf_counter()
+    try:
+        yield values
+    except Exception:
+        values["errors"] = values.get("errors", 0) + 1
+        raise
+    finally:
+        observe(stage, operation, time.perf_counter() - start, **values)
+
+
+def cache_result(stage: str, hit: bool) -> None:
+    """Registra un acierto o un fallo de caché de una etapa"""
+    observe(stage, "cache", cache_hits=int(hit), cache_misses=int(not hit))
+
+
+def record_usage(values: dict[str, float], usage: Any) -> None:
+    """Copia el uso de tokens de una respuesta de OpenAI en los contadores de `timer`"""
+    if usage is None:
+        return
+    values["prompt_tokens"] = int(getattr(usage, "prompt_tokens", 0) or 0)
+    values["completion_tokens"] = int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def file_size(path: str | Path) -> int:
+    """Tamaño de un archivo en bytes, 0 si no existe"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def message_bytes(messages: list[dict[str, str]]) -> int:
+    """Tamaño en bytes del contenido de unos mensajes de chat"""
+    return sum(len(message["content"].encode("utf-8")) for message in messages)
+
+
+@contextmanager
+def episode() -> Iterator[Metrics]:
+    """
+    Recoge por separado las métricas de un episodio.
+
+    Todo lo que se observe dentro del bloque (y en los hilos lanzados con
+    `in_current_context`) se suma también a las métricas devueltas.
+    """
+    episode_metrics = Metrics()
+    token = _episode.set(episode_metrics)
+    try:
+        yield episode_metrics
+    finally:
+        _episode.reset(token)
+
+
+def in_current_context(fn: Callable) -> Callable:
+    """
+    Envuelve `fn` para que se ejecute con el contexto actual en otro hilo.
+
+    Los pools de hilos no heredan las variables de contexto; sin esto las
+    métricas de un hilo de trabajo no llegarían al episodio en curso.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        # Una copia por llamada: un mismo Context no puede estar activo en dos hilos
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+class MetricsServer:
+    """
+    Servidor HTTP mínimo que publica las métricas.
+
+    `/metrics` devuelve el formato de texto de Prometheus y `/metrics.json`
+    las mismas métricas en JSON. Se ejecuta en un hilo en segundo plano.
+
+    Attributes:
+        registry (Metrics): Métricas publicadas.
+        host (str): Dirección de escucha.
+        port (int): Puerto de escucha (0 elige uno libre).
+    """
+
+    def __init__(self, registry: Metrics = REGISTRY, host: str = METRICS_HOST, port: int = METRICS_PORT) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self) -> int:
+        """Arranca el servidor y devuelve el puerto en el que escucha"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/metrics":
+                    body = registry.render().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="podia-metrics", daemon=True).start()
+        print(f"Métricas disponibles en http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self) -> None:
+        """Detiene el servidor"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
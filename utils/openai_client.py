@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from utils.constants import (
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_STAGE_TIMEOUTS
+)
+
+
+class OpenAIClientFactory:
+    """
+    Fábrica de clientes OpenAI que comparten un único pool HTTP por clave de API.
+
+    Todos los componentes (resumen, guion, voz, transcripción) piden su cliente
+    aquí en lugar de crear el suyo, de modo que las conexiones TLS se reutilizan
+    (keep-alive). Cada clave de API tiene un pool síncrono y otro asíncrono,
+    cada uno acotado por `max_connections`: con ambos en uso el proceso puede
+    abrir hasta el doble de conexiones por clave. Cada etapa recibe una vista
+    del cliente compartido con su propio timeout.
+    """
+
+    _lock = threading.Lock()
+    _clients: dict[str | None, OpenAI] = {}
+    _async_clients: dict[str | None, AsyncOpenAI] = {}
+    _base_urls: dict[str | None, str] = {}
+
+    max_connections = OPENAI_MAX_CONNECTIONS
+    max_keepalive_connections = OPENAI_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry = OPENAI_KEEPALIVE_EXPIRY
+    stage_timeouts = dict(OPENAI_STAGE_TIMEOUTS)
+
+    @classmethod
+    def configure(cls, max_connections: int | None = None, max_keepalive_connections: int | None = None,
+                  keepalive_expiry: float | None = None, stage_timeouts: dict[str, float] | None = None) -> None:
+        """
+        Ajusta los límites del pool y cierra los clientes creados hasta ahora.
+
+        Solo los clientes que se pidan después usan la nueva configuración: los
+        componentes guardan su cliente al crearse, así que hay que llamar a este
+        método antes de crearlos (o volver a crearlos después). Los clientes
+        anteriores se cierran para liberar sus conexiones.
+        """
+        with cls._lock:
+            if max_connections is not None:
+                cls.max_connections = max_connections
+            if max_keepalive_connections is not None:
+                cls.max_keepalive_connections = max_keepalive_connections
+            if keepalive_expiry is not None:
+                cls.keepalive_expiry = keepalive_expiry
+            if stage_timeouts:
+                cls.stage_timeouts.update(stage_timeouts)
+            clients = list(cls._clients.values())
+            async_clients = list(cls._async_clients.values())
+            cls._clients.clear()
+            cls._async_clients.clear()
+        for client in clients:
+            client.close()
+        for async_client in async_clients:
+            cls._close_async(async_client)
+
+    @classmethod
+    def set_base_url(cls, api_key: str | None, base_url: str | None) -> None:
+        """
+        Dirige los clientes de una clave de API a otra URL base, por ejemplo un
+        servidor local de pruebas. Solo afecta a esa clave: sus clientes
+        actuales se cierran y los siguientes usan la nueva URL.
+
+        Args:
+            api_key (str): Clave de API cuyos clientes se redirigen.
+            base_url (str | None): URL base de la API; None vuelve a la de por defecto.
+        """
+        with cls._lock:
+            if base_url is None:
+                cls._base_urls.pop(api_key, None)
+            else:
+                cls._base_urls[api_key] = base_url
+            client = cls._clients.pop(api_key, None)
+            async_client = cls._async_clients.pop(api_key, None)
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            cls._close_async(async_client)
+
+    @staticmethod
+    def _close_async(client: AsyncOpenAI) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        try:
+            if loop is None:
+                asyncio.run(client.close())
+            else:
+                loop.create_task(client.close())
+        except Exception as e:
+            # Conexiones ligadas a un bucle ya cerrado: se liberan al recolectar el cliente
+            print(f"No se pudo cerrar un cliente asíncrono de OpenAI: {e}")
+
+    @classmethod
+    def _limits(cls) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=cls.max_connections,
+            max_keepalive_connections=cls.max_keepalive_connections,
+            keepalive_expiry=cls.keepalive_expiry
+        )
+
+    @classmethod
+    def timeout_for(cls, stage: str) -> float:
+        """Devuelve el timeout configurado para una etapa"""
+        return cls.stage_timeouts.get(stage, cls.stage_timeouts["default"])
+
+    @classmethod
+    def get_client(cls, api_key: str | None, stage: str = "default") -> OpenAI:
+        """
+        Devuelve un cliente síncrono que usa el pool compartido.
+
+        Args:
+            api_key (str): Clave de API de OpenAI.
+            stage (str): Etapa del pipeline, determina el timeout.
+
+        Returns:
+            OpenAI: Cliente configurado para la etapa.
+        """
+        with cls._lock:
+            client = cls._clients.get(api_key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=cls._base_urls.get(api_key),
+                    http_client=DefaultHttpxClient(limits=cls._limits())
+                )
+                cls._clients[api_key] = client
+        # with_options() copia la configuración pero reutiliza el mismo httpx.Client
+        return client.with_options(timeout=cls.timeout_for(stage))
+
+    @classmethod
+    def get_async_client(cls, api_key: str | None, stage: str = "default") -> AsyncOpenAI:
+        """
+        Devuelve un cliente asíncrono que usa el pool asíncrono compartido.
+
+        Args:
+            api_key (str): Clave de API de OpenAI.
+            stage (str): Etapa del pipeline, determina el timeout.
+
+        Returns:
+            AsyncOpenAI: Cliente configurado para la etapa.
+        """
+        with cls._lock:
+            client = cls._async_clients.get(api_key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=cls._base_urls.get(api_key),
+                    http_client=DefaultAsyncHttpxClient(limits=cls._limits())
+                )
+                cls._async_clients[api_key] = client
+        return client.with_options(timeout=cls.timeout_for(stage))
@@ -0,0 +1,119 @@
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken  # type: ignore
+except ImportError:  # tiktoken es opcional: sin él se usa una estimación
+    tiktoken = None
+
+# Aproximación usada cuando tiktoken no está instalado
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str | None):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """
+    Cuenta los tokens de un texto.
+
+    Usa tiktoken si está instalado y, si no, estima ~4 caracteres por token.
+
+    Args:
+        text (str): Texto a medir.
+        model (str, optional): Modelo cuyo tokenizador se usa.
+
+    Returns:
+        int: Número de tokens.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_oversized(piece: str, max_tokens: int, model: str | None) -> list[str]:
+    """Divide un bloque demasiado grande por frases y, si hace falta, por palabras."""
+    sentences = re.split(r"(?<=[.!?])\s+", piece)
+    if len(sentences) == 1:
+        sentences = piece.split(" ")
+        if len(sentences) == 1:
+            # Una sola "palabra" gigante: cortar por caracteres
+            return _split_characters(piece, max_tokens, model)
+    return _pack(sentences, max_tokens, model, " ")
+
+
+def _split_characters(piece: str, max_tokens: int, model: str | None) -> list[str]:
+    """
+    Corta un texto sin espacios en trozos de como mucho `max_tokens` tokens.
+
+    Cada trozo parte de `max_tokens * CHARS_PER_TOKEN` caracteres y se acorta
+    mientras supere el límite: con tiktoken, los textos densos (cifras, CJK,
+    base64) tienen bastante menos de 4 caracteres por token.
+    """
+    chunks = []
+    start = 0
+    while start < len(piece):
+        chunk = piece[start:start + max_tokens * CHARS_PER_TOKEN]
+        tokens = count_tokens(chunk, model)
+        while len(chunk) > 1 and tokens > max_tokens:
+            # Recortar en proporción al exceso, al menos un carácter
+            size = max(1, min(len(chunk) - 1, len(chunk) * max_tokens // tokens))
+            chunk = chunk[:size]
+            tokens = count_tokens(chunk, model)
+        chunks.append(chunk)
+        start += len(chunk)
+    return chunks
+
+
+def _pack(pieces: list[str], max_tokens: int, model: str | None, separator: str) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        tokens = count_tokens(piece, model)
+        if tokens > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(piece, max_tokens, model))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int, model: str | None = None) -> list[str]:
+    """
+    Divide un texto en fragmentos de como mucho `max_tokens` tokens.
+
+    Respeta los párrafos siempre que es posible; solo corta por frases o
+    palabras cuando un párrafo por sí solo supera el límite.
+
+    Args:
+        text (str): Texto a dividir.
+        max_tokens (int): Tamaño máximo de cada fragmento en tokens.
+        model (str, optional): Modelo cuyo tokenizador se usa.
+
+    Returns:
+        list[str]: Fragmentos en el orden original.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+    return _pack(re.split(r"\n\s*\n", text), max_tokens, model, "\n\n")
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Literal
+from utils.constants import TRANSCRIPT_STORE_DIR
+
+# Origen de la transcripción: subtítulos de YouTube o transcripción con Whisper
+TranscriptSource = Literal["captions", "whisper"]
+
+
+class TranscriptStore:
+    """
+    Almacén persistente de transcripciones de videos de YouTube.
+
+    Cada entrada se identifica por (id del video, idioma, origen), de modo que
+    un mismo enlace solo se descarga o transcribe una vez. Las transcripciones
+    no caducan: se eliminan explícitamente con `invalidate` o `clear`.
+
+    Attributes:
+        store_dir (Path): Directorio donde se guardan las transcripciones.
+    """
+
+    def __init__(self, store_dir: str | Path = TRANSCRIPT_STORE_DIR) -> None:
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _entry_path(self, video_id: str, language: str, source: TranscriptSource) -> Path:
+        # Los ids de YouTube solo contienen [A-Za-z0-9_-]
+        return self.store_dir / f"{video_id}_{language}_{source}.json"
+
+    def get(self, video_id: str, language: str, source: TranscriptSource) -> str | None:
+        """
+        Busca una transcripción guardada.
+
+        Args:
+            video_id (str): ID del video de YouTube.
+            language (str): Idioma de la transcripción ("auto" para Whisper).
+            source (str): "captions" o "whisper".
+
+        Returns:
+            str | None: Texto de la transcripción o None si no existe.
+        """
+        path = self._entry_path(video_id, language, source)
+        with self._lock:
+            try:
+                return json.loads(path.read_text(encoding="utf-8"))["text"]
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                return None
+
+    def put(self, video_id: str, language: str, source: TranscriptSource, text: str) -> None:
+        """Guarda una transcripción (escritura atómica)"""
+        path = self._entry_path(video_id, language, source)
+        entry = {
+            "video_id": video_id,
+            "language": language,
+            "source": source,
+            "created_at": time.time(),
+            "text": text
+        }
+        with self._lock:
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(path)
+
+    def invalidate(self, video_id: str, language: str | None = None,
+                   source: TranscriptSource | None = None) -> int:
+        """
+        Elimina las transcripciones de un video.
+
+        Args:
+            video_id (str): ID del video de YouTube.
+            language (str, optional): Solo este idioma (por defecto todos).
+            source (str, optional): Solo este origen (por defecto todos).
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        pattern = f"{video_id}_{language or '*'}_{source or '*'}.json"
+        removed = 0
+        with self._lock:
+            for path in self.store_dir.glob(pattern):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Elimina todas las transcripciones guardadas"""
+        with self._lock:
+            for path in self.store_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
@@ -1,65 +1,120 @@
 from pathlib import Path
 import gradio as gr  # type: ignore
 import yt_dlp  # type: ignore
+from yt_dlp.utils import download_range_func  # type: ignore
 from audio.video_processor import VideoProcessor
 import os
-import re
+import shutil
+import tempfile
 from docs.youtube_processor import YoutubeProcessor
+from utils import metrics
+from utils.transcript_store import TranscriptStore
+
+# Idiomas de subtítulos que se buscan en YouTube
+CAPTION_LANGUAGES = ["es"]
+
+# Whisper detecta el idioma por sí mismo
+WHISPER_LANGUAGE = "auto"
 
 
 class URLProcessor:
-    def __init__(self, openai_api_key: str) -> None:
+    def __init__(self, openai_api_key: str, transcript_store: TranscriptStore | None = None,
+                 download_path: str | Path = "temp/", video_processor: VideoProcessor | None = None) -> None:
         """
         Inicializa el procesador con una instancia de VideoProcessor.
 
         Args:
             openai_api_key (str): Clave de API de OpenAI para procesamiento de video.
+            transcript_store (TranscriptStore, optional): Almacén de transcripciones ya obtenidas.
+            download_path (str | Path): Directorio de los audios descargados.
+            video_processor (VideoProcessor, optional): Procesador que transcribe los audios descargados.
         """
-        self.video_processor = VideoProcessor(openai_api_key , transcript_model = "whisper-1")
-        self.download_path = Path("temp/")
+        self.video_processor = video_processor if video_processor is not None else \
+            VideoProcessor(openai_api_key , transcript_model = "whisper-1")
+        self.transcript_store = transcript_store if transcript_store is not None else TranscriptStore()
+        self.download_path = Path(download_path)
         self.download_path.mkdir(parents=True, exist_ok=True)
 
-    def download_video(self, youtube_url: str) -> str:
+    @staticmethod
+    def _progress_hook(progress):
+        """Traduce el progreso de yt-dlp al rango 0.1-0.5 de la barra de Gradio"""
+        def hook(status: dict) -> None:
+            if status.get("status") == "downloading":
+                total = status.get("total_bytes") or status.get("total_bytes_estimate")
+                if total:
+                    fraction = min(status.get("downloaded_bytes", 0) / total, 1.0)
+                    progress(0.1 + 0.4 * fraction, "Descargando audio...")
+            elif status.get("status") == "finished":
+                progress(0.5, "Audio descargado. Procesando...")
+        return hook
+
+    def download_video(self, youtube_url: str, progress=None,
+                       start_time: float | None = None, end_time: float | None = None) -> str:
         """
         Descarga solo el audio de un video de YouTube.
 
+        Los metadatos y la descarga se obtienen en una única llamada a
+        `extract_info`, sin una segunda pasada del extractor. Cada llamada
+        descarga en su propio directorio dentro de `download_path`, así dos
+        sesiones que piden el mismo video no comparten archivo.
+
         Args:
             youtube_url (str): URL del video de YouTube a descargar.
+            progress (Callable, optional): Progreso de Gradio que recibe el avance de la descarga.
+            start_time (float, optional): Segundo desde el que descargar.
+            end_time (float, optional): Segundo hasta el que descargar.
 
         Returns:
             str: Ruta al archivo de audio descargado.
         """
+        download_dir = Path(tempfile.mkdtemp(dir=self.download_path))
         try:
-            # First extract info without downloading
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                info = ydl.extract_info(youtube_url, download=False)
-                # Sanitize filename: remove special characters and spaces
-                safe_title = re.sub(r'[^\w_-]', '_', info['title'])
-
             ydl_opts = {
                 'format': 'bestaudio/best',
                 'postprocessors': [{
                     'key': 'FFmpegExtractAudio',
                     'preferredcodec': 'mp3',
                 }],
-                'outtmpl': str(self.download_path / f"{safe_title}"),
+                # El id es seguro como nombre de archivo y no depende de los metadatos
+                'outtmpl': str(download_dir / "%(id)s.%(ext)s"),
                 'quiet': True,
             }
+            if progress is not None:
+                ydl_opts['progress_hooks'] = [self._progress_hook(progress)]
+            if start_time is not None or end_time is not None:
+                # Descargar solo el tramo pedido
+                ydl_opts['download_ranges'] = download_range_func(
+                    None, [(start_time or 0, end_time if end_time is not None else float("inf"))])
+                ydl_opts['force_keyframes_at_cuts'] = True
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([youtube_url])
-                video_path = str(self.download_path / f"{safe_title}.mp3")
-                return video_path
+                info = ydl.extract_info(youtube_url, download=True)
+
+            # Ruta final tras la conversión a MP3
+            downloads = info.get('requested_downloads') or []
+            if downloads and downloads[0].get('filepath'):
+                return downloads[0]['filepath']
+            return str(download_dir / f"{info['id']}.mp3")
 
         except Exception as e:
+            shutil.rmtree(download_dir, ignore_errors=True)
             return f"Error en el procesamiento: {str(e)}"
 
+    def remove_download(self, audio_path: str) -> None:
+        """Elimina un audio descargado con `download_video` y su directorio"""
+        os.remove(audio_path)
+        download_dir = Path(audio_path).parent
+        if download_dir.parent.resolve() == self.download_path.resolve():
+            shutil.rmtree(download_dir, ignore_errors=True)
+
     def process_youtube_url(self, youtube_url: str, progress=gr.Progress()) -> str:
         """
         Procesa una URL de YouTube para obtener su transcripción.
 
-        Intenta obtener la transcripción directamente. Si no está disponible,
-        descarga y procesa el audio para generar la transcripción.
+        Antes de cualquier petición de red consulta el almacén de
+        transcripciones. Si no hay ninguna guardada, intenta obtener la
+        transcripción directamente y, si no está disponible, descarga y
+        procesa el audio para generarla. El resultado se guarda en el almacén.
 
         Args:
             youtube_url (str): URL del video de YouTube.
@@ -72,11 +127,24 @@ class URLProcessor:
         if not video_id:
             return "URL inválida"
 
+        caption_language = "+".join(CAPTION_LANGUAGES)
+        cached = self.transcript_store.get(video_id, caption_language, "captions")
+        if cached is not None:
+            metrics.cache_result("extract", True)
+            return f"Transcripción obtenida directamente:\n\n{cached}"
+        cached = self.transcript_store.get(video_id, WHISPER_LANGUAGE, "whisper")
+        metrics.cache_result("extract", cached is not None)
+        if cached is not None:
+            return f"Transcripción generada por IA:\n\n{cached}"
+
         try:
             # Primero intenta obtener la transcripción directamente
-            transcript_text = YoutubeProcessor.download_transcript(
-                video_id, language=["es"])
+            with metrics.timer("extract", "captions"):
+                transcript_text = YoutubeProcessor.download_transcript(
+                    video_id, language=CAPTION_LANGUAGES)
             if transcript_text:
+                self.transcript_store.put(
+                    video_id, caption_language, "captions", transcript_text)
                 return f"Transcripción obtenida directamente:\n\n{transcript_text}"
             else:
                 raise FileExistsError("Transcripción no disponible")
@@ -87,22 +155,41 @@ class URLProcessor:
                 # Descargar y procesar el audio si la transcripción no está disponible
                 print("Descargando audio para procesamiento...")
                 progress(0.1, "Descargando audio...")
-                audio_path = self.download_video(youtube_url)
-                progress(0.5, "Audio descargado. Procesando...")
-
-                # Procesa el audio usando VideoProcessor
-                transcript_path, transcript = self.video_processor.process_media(
-                    audio_path)
+                with metrics.timer("extract", "download") as values:
+                    audio_path = self.download_video(youtube_url, progress)
+                    values["bytes_in"] = metrics.file_size(audio_path)
+
+                try:
+                    # Procesa el audio usando VideoProcessor
+                    transcript_path, transcript = self.video_processor.process_media(
+                        audio_path)
+                finally:
+                    # Elimina el archivo de audio descargado, también si la transcripción falla
+                    self.remove_download(audio_path)
+                self.transcript_store.put(
+                    video_id, WHISPER_LANGUAGE, "whisper", transcript)
                 progress(1.0, "Procesamiento completado.")
 
-                # Elimina el archivo de audio descargado
-                os.remove(audio_path)
-
                 return f"Transcripción generada por IA:\n\nArchivo guardado en: {transcript_path}\n\n{transcript}"
 
             except Exception as e:
                 return f"Error en el procesamiento: {str(e)}"
 
+    def invalidate_transcript(self, youtube_url: str) -> int:
+        """
+        Elimina del almacén las transcripciones de un video para forzar que se vuelvan a obtener.
+
+        Args:
+            youtube_url (str): URL del video de YouTube.
+
+        Returns:
+            int: Número de transcripciones eliminadas.
+        """
+        video_id = YoutubeProcessor.get_video_id(youtube_url)
+        if not video_id:
+            return 0
+        return self.transcript_store.invalidate(video_id)
+
 
 # Propósito de desarrollo
 if __name__ == "__main__":